@@ -1,10 +1,24 @@
-from typing import Dict, Tuple, Optional
-import google.generativeai as genai
-from database import settings
+from typing import Any, AsyncIterator, Dict, List, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from analysis_cache import AnalysisCache, normalize_review_text
+from batching import MicroBatcher
+from circuit_breaker import CircuitBreaker
+from dedup import NearDuplicateIndex, jaccard, signature
+from embeddings import EmbeddingIndex, embed_texts, to_blob
+from keyphrases import extract_key_phrases, extract_key_phrases_batch
+import lexicon
+from database import settings, SessionLocal
+import models
+import asyncio
+import contextlib
 import json
 import logging
-import requests
+import httpx
 import os
+import re
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -12,36 +26,259 @@ logger = logging.getLogger(__name__)
 os.environ['HF_DATASETS_CACHE'] = os.path.expanduser('~/.cache/huggingface/datasets')
 os.environ['TRANSFORMERS_CACHE'] = os.path.expanduser('~/.cache/huggingface/models')
 
+# Local sentiment model (torch pipeline or its ONNX export)
+SENTIMENT_MODEL_NAME = "distilbert-base-uncased-finetuned-sst-2-english"
+
+# Returned when no sentiment backend produced a result (never cached)
+FALLBACK_SENTIMENT = ("neutral", 0.5)
+
 # Global pipeline - loaded lazily on first use
 sentiment_pipeline = None
+_pipeline_lock = threading.Lock()
 
-# Initialize Gemini for key points extraction
-# Support both SDK and REST API methods
-gemini_model = None
+# Bounded executor for CPU-bound local inference so torch never runs on the event loop
+inference_executor = ThreadPoolExecutor(
+    max_workers=settings.INFERENCE_MAX_WORKERS,
+    thread_name_prefix="inference"
+)
+
+# Gemini for key points extraction: REST API, with the SDK as fallback.
+# The SDK is slow to import, so it is only imported and configured on first use.
 gemini_api_key = settings.GEMINI_API_KEY
+_gemini_model = None
+_gemini_sdk_failed = False
+_gemini_model_lock = threading.Lock()
 
-if gemini_api_key:
-    try:
-        genai.configure(api_key=gemini_api_key)
-        gemini_model = genai.GenerativeModel('gemini-pro')
-        logger.info("✓ Gemini SDK initialized successfully")
-    except Exception as e:
-        logger.warning(f"⚠️  Gemini SDK initialization failed: {e}, will use REST API instead")
-else:
+if not gemini_api_key:
     logger.warning("⚠️  GEMINI_API_KEY not set, key points extraction will use REST API only")
 
+def _get_gemini_model():
+    """The Gemini SDK model, created on first call (None without an API key or if the SDK fails)"""
+    global _gemini_model, _gemini_sdk_failed
+    
+    if not gemini_api_key:
+        return None
+    with _gemini_model_lock:
+        if _gemini_model is None and not _gemini_sdk_failed:
+            try:
+                import google.generativeai as genai
+                genai.configure(api_key=gemini_api_key)
+                _gemini_model = genai.GenerativeModel('gemini-pro')
+                logger.info("✓ Gemini SDK initialized successfully")
+            except Exception as e:
+                _gemini_sdk_failed = True
+                logger.warning(f"⚠️  Gemini SDK initialization failed: {e}, will use REST API instead")
+        return _gemini_model
+
 # Gemini REST API endpoint (from environment or use default)
 GEMINI_API_URL = settings.GEMINI_API_URL
+GEMINI_STREAM_URL = GEMINI_API_URL.replace(":generateContent", ":streamGenerateContent")
+
+class ProviderClients:
+    """
+    Shared, long-lived HTTP clients for the HuggingFace and Gemini REST APIs.
+    
+    Keeps one pooled keep-alive httpx.AsyncClient per provider host so TCP+TLS
+    handshakes are paid once per connection instead of once per review. Each
+    host is capped at `max_connections_per_host`; `max_connections` caps
+    in-flight requests across all hosts. Keep `max_keepalive_per_host` equal to
+    the per-host cap: the pool closes idle connections above it even when
+    requests are queued, which defeats reuse under bursts. Counts requests and
+    newly opened connections per host so reuse can be verified.
+    """
+    
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_connections_per_host: int = 20,
+        max_keepalive_per_host: int = 20,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 30.0
+    ):
+        self.max_connections = max_connections
+        self.limits = httpx.Limits(
+            max_connections=max_connections_per_host,
+            max_keepalive_connections=max_keepalive_per_host,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = timeout
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._requests: Dict[str, int] = {}
+        self._connections_opened: Dict[str, int] = {}
+    
+    def _client_for(self, url: str) -> Tuple[str, httpx.AsyncClient]:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Pooled connections belong to the loop that opened them
+            self._clients = {}
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.max_connections)
+        
+        host = urlsplit(url).netloc
+        if host not in self._clients:
+            self._clients[host] = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+            self._requests.setdefault(host, 0)
+            self._connections_opened.setdefault(host, 0)
+        return host, self._clients[host]
+    
+    def _tracer(self, host: str):
+        async def trace(event_name: str, info: dict) -> None:
+            if event_name == "connection.connect_tcp.complete":
+                self._connections_opened[host] += 1
+        return trace
+    
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        """POST through the pooled client for the URL's host"""
+        host, client = self._client_for(url)
+        async with self._slots:
+            self._requests[host] += 1
+            return await client.post(url, extensions={"trace": self._tracer(host)}, **kwargs)
+    
+    @contextlib.asynccontextmanager
+    async def stream(self, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """Streaming POST through the pooled client; the connection is held until the block exits"""
+        host, client = self._client_for(url)
+        async with self._slots:
+            self._requests[host] += 1
+            async with client.stream("POST", url, extensions={"trace": self._tracer(host)}, **kwargs) as response:
+                yield response
+    
+    async def aclose(self) -> None:
+        """Close all pooled connections"""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients = {}
+    
+    def metrics(self) -> Dict:
+        """Per-host request and connection counters"""
+        hosts = {}
+        for host, requests in self._requests.items():
+            opened = self._connections_opened[host]
+            hosts[host] = {
+                "requests": requests,
+                "connections_opened": opened,
+                "connections_reused": max(0, requests - opened),
+                "reuse_ratio": (requests - opened) / requests if requests else 0,
+            }
+        return {
+            "max_connections": self.max_connections,
+            "max_connections_per_host": self.limits.max_connections,
+            "max_keepalive_per_host": self.limits.max_keepalive_connections,
+            "hosts": hosts,
+        }
+
+provider_clients = ProviderClients(
+    max_connections=settings.HTTP_POOL_MAX_CONNECTIONS,
+    max_connections_per_host=settings.HTTP_POOL_MAX_CONNECTIONS_PER_HOST,
+    max_keepalive_per_host=settings.HTTP_POOL_MAX_KEEPALIVE_PER_HOST,
+    keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    timeout=settings.HTTP_TIMEOUT_SECONDS
+)
 
 logger.info("✓ Analysis module initialized (models will load on first request)")
 
-def analyze_sentiment_via_hf_api(text: str) -> Tuple[str, float]:
+# Long reviews are split into overlapping token windows that fit the model
+# (512 tokens including [CLS]/[SEP]) and scored together
+WINDOW_TOKENS = 510
+
+_window_tokenizer = None
+_window_tokenizer_lock = threading.Lock()
+
+def _get_window_tokenizer():
+    """
+    Load the sentiment model's fast tokenizer (tokenizers library only, no
+    torch) once. Returns None if it can't be loaded.
+    """
+    global _window_tokenizer
+    
+    with _window_tokenizer_lock:
+        if _window_tokenizer is None:
+            try:
+                from tokenizers import Tokenizer
+                if os.path.isdir(SENTIMENT_MODEL_NAME):
+                    tokenizer = Tokenizer.from_file(os.path.join(SENTIMENT_MODEL_NAME, "tokenizer.json"))
+                else:
+                    tokenizer = Tokenizer.from_pretrained(SENTIMENT_MODEL_NAME)
+                tokenizer.no_truncation()
+                tokenizer.no_padding()
+                _window_tokenizer = tokenizer
+            except Exception as e:
+                logger.warning(f"⚠️  Could not load tokenizer for windowing, using word windows: {e}")
+                _window_tokenizer = False
+        return _window_tokenizer or None
+
+def _split_into_windows(text: str) -> List[Tuple[str, int]]:
+    """
+    Tokenize once and cut the text into overlapping windows of at most
+    WINDOW_TOKENS tokens, using token offsets to slice the original text.
+    Returns: list of (window_text, token_count)
+    """
+    overlap = min(settings.SENTIMENT_WINDOW_OVERLAP_TOKENS, WINDOW_TOKENS // 2)
+    tokenizer = _get_window_tokenizer()
+    if tokenizer:
+        offsets = tokenizer.encode(text, add_special_tokens=False).offsets
+    else:
+        # Approximation: whitespace words stand in for tokens
+        offsets = [match.span() for match in re.finditer(r"\S+", text)]
+    
+    if len(offsets) <= WINDOW_TOKENS:
+        return [(text, max(1, len(offsets)))]
+    
+    windows = []
+    step = WINDOW_TOKENS - overlap
+    for start in range(0, len(offsets), step):
+        end = min(start + WINDOW_TOKENS, len(offsets))
+        windows.append((text[offsets[start][0]:offsets[end - 1][1]], end - start))
+        if end == len(offsets):
+            break
+    return windows
+
+async def split_into_windows(text: str) -> List[Tuple[str, int]]:
+    """Async wrapper: tokenizer loading and tokenization stay off the event loop"""
+    if len(text) <= WINDOW_TOKENS:
+        # Can't exceed the window: every token covers at least one character
+        return [(text, len(text.split()) or 1)]
+    return await asyncio.to_thread(_split_into_windows, text)
+
+def _aggregate_windows(results: List[Tuple[str, float]], weights: List[int]) -> Tuple[str, float]:
+    """
+    Combine per-window predictions into one sentiment: token-weighted mean of
+    P(positive), reported as the winning label and its probability.
+    """
+    scored = [(result, weight) for result, weight in zip(results, weights) if result != FALLBACK_SENTIMENT]
+    if not scored:
+        return FALLBACK_SENTIMENT
+    if len(scored) == 1:
+        return scored[0][0]
+    
+    total = sum(weight for _, weight in scored)
+    p_positive = 0.0
+    for (sentiment, score), weight in scored:
+        if sentiment == "positive":
+            p = score
+        elif sentiment == "negative":
+            p = 1 - score
+        else:
+            p = 0.5
+        p_positive += p * weight / total
+    
+    if p_positive >= 0.5:
+        return "positive", p_positive
+    return "negative", 1 - p_positive
+
+def _hf_token() -> str:
+    return settings.HF_API_TOKEN or settings.HUGGINGFACE_API_KEY
+
+async def analyze_sentiment_via_hf_api(text: str) -> Tuple[str, float]:
     """
     Analyze sentiment using HuggingFace Inference API (cloud-based).
     No local model download needed, faster and more reliable.
+    Long reviews are sent as one request with a list of token windows.
     Returns: (sentiment: str, confidence: float)
     """
-    hf_token = settings.HF_API_TOKEN or settings.HUGGINGFACE_API_KEY
+    hf_token = _hf_token()
     
     if not hf_token:
         logger.warning("⚠️  HF_API_TOKEN not set, cannot use HuggingFace REST API")
@@ -52,15 +289,16 @@ def analyze_sentiment_via_hf_api(text: str) -> Tuple[str, float]:
             "Authorization": f"Bearer {hf_token}",
             "Content-Type": "application/json"
         }
-        payload = {"inputs": text[:512]}
+        windows = await split_into_windows(text)
+        inputs = [window for window, _ in windows]
+        payload = {"inputs": inputs[0] if len(inputs) == 1 else inputs}
         
         url = settings.HUGGINGFACE_API_URL
         logger.debug(f"Calling HuggingFace API: {url}")
-        response = requests.post(
+        response = await provider_clients.post(
             url,
             headers=headers,
-            json=payload,
-            timeout=30
+            json=payload
         )
         
         # Handle 410 Gone error - API moved, try alternative endpoint
@@ -72,11 +310,10 @@ def analyze_sentiment_via_hf_api(text: str) -> Tuple[str, float]:
             )
             if alternative_url != url:
                 try:
-                    response = requests.post(
+                    response = await provider_clients.post(
                         alternative_url,
                         headers=headers,
-                        json=payload,
-                        timeout=30
+                        json=payload
                     )
                 except Exception:
                     logger.warning("⚠️  Alternative endpoint also failed")
@@ -85,31 +322,26 @@ def analyze_sentiment_via_hf_api(text: str) -> Tuple[str, float]:
         if response.status_code == 200:
             result = response.json()
             
-            # Handle response format: [[{label, score}]]
+            # Handle response format: [[{label, score}, ...], ...] - one list per input
             if isinstance(result, list) and len(result) > 0:
-                if isinstance(result[0], list) and len(result[0]) > 0:
-                    prediction = result[0][0]
-                else:
-                    prediction = result[0]
-                
-                label = prediction.get('label', 'NEUTRAL').lower()
-                score = float(prediction.get('score', 0.5))
+                if not isinstance(result[0], list):
+                    result = [result]
+                predictions = []
+                for labels in result[:len(windows)]:
+                    prediction = labels[0] if labels else {}
+                    predictions.append(_to_sentiment(
+                        prediction.get('label', 'NEUTRAL'),
+                        float(prediction.get('score', 0.5))
+                    ))
                 
-                # Normalize label
-                if label in ['positive', 'pos']:
-                    logger.debug(f"✅ HF API Sentiment: positive ({score:.2f})")
-                    return "positive", score
-                elif label in ['negative', 'neg']:
-                    logger.debug(f"✅ HF API Sentiment: negative ({score:.2f})")
-                    return "negative", score
-                else:
-                    logger.debug(f"✅ HF API Sentiment: neutral ({score:.2f})")
-                    return "neutral", score
+                sentiment, score = _aggregate_windows(predictions, [tokens for _, tokens in windows])
+                logger.debug(f"✅ HF API Sentiment: {sentiment} ({score:.2f}, {len(windows)} windows)")
+                return sentiment, score
         else:
             logger.warning(f"⚠️  HF API error {response.status_code}: {response.text[:200]}")
             return None
             
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         logger.warning("⚠️  HuggingFace API timeout")
         return None
     except Exception as e:
@@ -118,67 +350,312 @@ def analyze_sentiment_via_hf_api(text: str) -> Tuple[str, float]:
         logger.warning(f"⚠️  HuggingFace API error: {e}")
         return None
 
-def analyze_sentiment(text: str) -> Tuple[str, float]:
+def _load_sentiment_pipeline():
     """
-    Analyze sentiment of review text.
-    Tries HuggingFace REST API first (if token available),
-    falls back to local model loading.
-    Returns: (sentiment: str, confidence: float)
+    Load the local sentiment pipeline once (thread-safe), using the backend
+    selected by SENTIMENT_BACKEND ("torch" or "onnx").
+    Returns the pipeline, or None if it could not be loaded.
     """
     global sentiment_pipeline
     
-    # Try HuggingFace REST API first (preferred - no local download)
-    hf_result = analyze_sentiment_via_hf_api(text)
-    if hf_result:
-        return hf_result
-    
-    logger.info("HF API unavailable, falling back to local model...")
-    
-    # Lazy load model if not already loaded
-    if not sentiment_pipeline:
-        logger.info("🔄 Loading sentiment model on first request (this may take a moment)...")
+    with _pipeline_lock:
+        if sentiment_pipeline:
+            return sentiment_pipeline
+        
+        backend = settings.SENTIMENT_BACKEND.lower()
+        logger.info(f"🔄 Loading {backend} sentiment model (this may take a moment)...")
         try:
-            from transformers import pipeline
             import warnings
             # Suppress warnings during model loading
             with warnings.catch_warnings():
                 warnings.simplefilter("ignore")
-                sentiment_pipeline = pipeline(
-                    "sentiment-analysis",
-                    model="distilbert-base-uncased-finetuned-sst-2-english",
-                    device=-1,  # CPU
-                    torch_dtype="auto"
-                )
+                if backend == "onnx":
+                    from onnx_sentiment import load_onnx_pipeline
+                    sentiment_pipeline = load_onnx_pipeline(
+                        SENTIMENT_MODEL_NAME,
+                        settings.ONNX_MODEL_DIR,
+                        num_threads=settings.ONNX_NUM_THREADS
+                    )
+                else:
+                    from transformers import pipeline
+                    
+                    def build(**model_kwargs):
+                        return pipeline(
+                            "sentiment-analysis",
+                            model=SENTIMENT_MODEL_NAME,
+                            device=-1,  # CPU
+                            torch_dtype="auto",
+                            model_kwargs=model_kwargs
+                        )
+                    
+                    try:
+                        # Prefer safetensors weights: memory-mapped while loading, no unpickling
+                        sentiment_pipeline = build(use_safetensors=True)
+                    except OSError:
+                        sentiment_pipeline = build()
             logger.info("✅ Sentiment model loaded successfully")
+            # Batches are bucketed by its token counts from here on
+            _get_window_tokenizer()
         except MemoryError:
             logger.error("❌ Not enough memory to load sentiment model")
-            return "neutral", 0.5
         except Exception as e:
             logger.error(f"❌ Failed to load sentiment model: {type(e).__name__}: {e}")
-            # Don't return yet - model might load next time
-            return "neutral", 0.5
+            # Don't cache the failure - model might load next time
+        return sentiment_pipeline
+
+# Torch intra-op thread count to restore in forked workers (see preload_sentiment_model)
+_torch_threads: Optional[int] = None
+
+def preload_sentiment_model(for_fork: bool = False) -> bool:
+    """
+    Load the local sentiment model and run a warmup inference, so no request
+    pays for either (PRELOAD_MODEL).
+    With for_fork=True this runs in the gunicorn master before workers are
+    forked, so the weights are shared copy-on-write. The warmup is then run
+    single-threaded, because a torch/OpenMP thread pool does not survive
+    fork; workers restore their thread count in after_fork(). The ONNX
+    backend is only exported there, since an ONNX Runtime session can't be
+    shared across fork - each worker loads the (small) int8 model itself.
+    Returns True if the model is ready (or, for ONNX in the master, exported).
+    """
+    global _torch_threads
     
-    try:
-        result = sentiment_pipeline(text[:512], truncation=True)
-        
-        label = result[0]['label'].lower()
-        score = float(result[0]['score'])
+    if for_fork and settings.SENTIMENT_BACKEND.lower() == "onnx":
+        from pathlib import Path
+        from onnx_sentiment import INT8_FILENAME, export_quantized_model
         
-        # Map labels to our enum
-        if label == 'positive':
-            logger.debug(f"Sentiment: positive ({score:.2f})")
-            return "positive", score
-        elif label == 'negative':
-            logger.debug(f"Sentiment: negative ({score:.2f})")
-            return "negative", score
-        else:
-            logger.debug(f"Sentiment: neutral ({score:.2f})")
-            return "neutral", score
+        if not (Path(settings.ONNX_MODEL_DIR).expanduser() / INT8_FILENAME).exists():
+            export_quantized_model(SENTIMENT_MODEL_NAME, settings.ONNX_MODEL_DIR)
+        return True
+    
+    start = time.monotonic()
+    pipeline = _load_sentiment_pipeline()
+    if pipeline is None:
+        return False
+    
+    if for_fork:
+        import torch
+        _torch_threads = torch.get_num_threads()
+        torch.set_num_threads(1)
+    pipeline([PROBE_TEXT], truncation=True)
+    logger.info(f"✅ Sentiment model preloaded and warmed up in {time.monotonic() - start:.1f}s")
+    return True
+
+def after_fork() -> None:
+    """Per-worker setup after forking from a preloaded master"""
+    if _torch_threads is not None:
+        import torch
+        torch.set_num_threads(_torch_threads)
+
+def model_ready() -> bool:
+    """True once the local sentiment model is loaded"""
+    return sentiment_pipeline is not None
+
+def _to_sentiment(label: str, score: float) -> Tuple[str, float]:
+    """Map a model label to our sentiment enum"""
+    label = label.lower()
+    if label in ['positive', 'pos']:
+        return "positive", score
+    elif label in ['negative', 'neg']:
+        return "negative", score
+    else:
+        return "neutral", score
+
+def _token_length(text: str) -> int:
+    """
+    Token count used to bucket batches (word count until the tokenizer is
+    loaded). Counted with the windowing tokenizer, never the pipeline's:
+    that one is reconfigured for padding by the batches running on the
+    executor, and this runs on the event loop.
+    """
+    tokenizer = _window_tokenizer
+    if tokenizer:
+        return min(len(tokenizer.encode(text).ids), WINDOW_TOKENS + 2)
+    return len(text.split())
+
+def predict_sentiment_batch(texts: List[str]) -> List[Tuple[str, float]]:
+    """
+    Run one batched forward pass of the local DistilBERT pipeline.
+    Blocking (CPU-bound) - the batcher runs it on inference_executor.
+    Returns: list of (sentiment: str, confidence: float), one per text
+    """
+    if not _load_sentiment_pipeline():
+        return [FALLBACK_SENTIMENT] * len(texts)
+    
+    results = sentiment_pipeline(
+        texts,
+        truncation=True,
+        batch_size=len(texts)
+    )
+    return [_to_sentiment(result['label'], float(result['score'])) for result in results]
+
+# Coalesces concurrent local inference requests into batched forward passes
+sentiment_batcher = MicroBatcher(
+    predict_sentiment_batch,
+    inference_executor,
+    max_batch_size=settings.SENTIMENT_BATCH_MAX_SIZE,
+    max_wait_ms=settings.SENTIMENT_BATCH_MAX_WAIT_MS,
+    max_concurrent_batches=settings.INFERENCE_MAX_WORKERS,
+    length_fn=_token_length
+)
+
+async def analyze_sentiment_locally(text: str) -> Tuple[str, float]:
+    """
+    Analyze sentiment with the local DistilBERT pipeline via the micro-batcher.
+    All token windows of a long review are submitted together, so they are
+    scored in the same batched forward pass.
+    Returns: (sentiment: str, confidence: float)
+    """
+    try:
+        windows = await split_into_windows(text)
+        results = await asyncio.gather(*(sentiment_batcher.submit(window) for window, _ in windows))
+        sentiment, score = _aggregate_windows(list(results), [tokens for _, tokens in windows])
+        logger.debug(f"Sentiment: {sentiment} ({score:.2f}, {len(windows)} windows)")
+        return sentiment, score
     except Exception as e:
         logger.error(f"❌ Sentiment analysis error: {type(e).__name__}: {e}")
-        return "neutral", 0.5
+        return FALLBACK_SENTIMENT
+
+# Short, known-good input used by half-open probes
+PROBE_TEXT = "Great product, works exactly as described."
+
+def _breaker(name: str, probe) -> CircuitBreaker:
+    return CircuitBreaker(
+        name,
+        probe,
+        window_seconds=settings.BREAKER_WINDOW_SECONDS,
+        min_requests=settings.BREAKER_MIN_REQUESTS,
+        error_rate_threshold=settings.BREAKER_ERROR_RATE,
+        slow_call_seconds=settings.BREAKER_SLOW_CALL_SECONDS,
+        open_seconds=settings.BREAKER_OPEN_SECONDS
+    )
+
+async def _probe_hf_api() -> bool:
+    return await analyze_sentiment_via_hf_api(PROBE_TEXT) is not None
 
-def extract_key_points_via_rest_api(text: str, max_points: int = 5) -> list:
+async def _probe_gemini_api() -> bool:
+    return bool(await extract_key_points_via_rest_api(PROBE_TEXT, max_points=1))
+
+# Route around unhealthy providers instead of waiting for their timeouts
+hf_breaker = _breaker("HuggingFace API", _probe_hf_api)
+gemini_breaker = _breaker("Gemini API", _probe_gemini_api)
+
+async def _call_with_breaker(breaker: CircuitBreaker, call, is_success):
+    """Call a provider through its breaker; None if the breaker is open"""
+    if not breaker.allow_request():
+        return None
+    start = time.monotonic()
+    try:
+        result = await call()
+    except asyncio.CancelledError:
+        # Given up on by a deadline or hedge: it would have taken at least this long
+        breaker.record(False, time.monotonic() - start, abandoned=True)
+        raise
+    except BaseException:
+        breaker.record(False, time.monotonic() - start)
+        raise
+    breaker.record(is_success(result), time.monotonic() - start)
+    return result
+
+# Hedging counters, reported by get_analysis_metrics
+hedge_stats = {
+    "requests": 0,
+    "hedges_fired": 0,
+    "remote_wins": 0,
+    "local_wins": 0,
+    "last_delay_ms": None,
+}
+
+def _hedge_delay() -> float:
+    """Seconds to wait for the HF API before hedging: its recent latency percentile, clamped"""
+    observed = hf_breaker.latency_percentile(settings.SENTIMENT_HEDGE_PERCENTILE)
+    delay_ms = observed * 1000 if observed is not None else settings.SENTIMENT_HEDGE_MAX_DELAY_MS
+    delay_ms = min(max(delay_ms, settings.SENTIMENT_HEDGE_MIN_DELAY_MS), settings.SENTIMENT_HEDGE_MAX_DELAY_MS)
+    hedge_stats["last_delay_ms"] = delay_ms
+    return delay_ms / 1000
+
+async def _hedged_sentiment(text: str) -> Tuple[str, float]:
+    """
+    Start the HF API call; if it hasn't answered within the hedge delay, start
+    local inference too and take whichever produces a result first, cancelling
+    the other.
+    """
+    hedge_stats["requests"] += 1
+    remote = asyncio.create_task(_call_with_breaker(
+        hf_breaker,
+        lambda: analyze_sentiment_via_hf_api(text),
+        lambda result: result is not None
+    ))
+    done, _ = await asyncio.wait({remote}, timeout=_hedge_delay())
+    if done:
+        # Answered (or failed) before the hedge delay: no hedge needed
+        return remote.result() or await analyze_sentiment_locally(text)
+    
+    hedge_stats["hedges_fired"] += 1
+    local = asyncio.create_task(analyze_sentiment_locally(text))
+    pending = {remote, local}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                if task is remote and result:
+                    hedge_stats["remote_wins"] += 1
+                    return result
+                if task is local and (result != FALLBACK_SENTIMENT or not pending):
+                    hedge_stats["local_wins"] += 1
+                    return result
+        return FALLBACK_SENTIMENT
+    finally:
+        for task in pending:
+            task.cancel()
+
+# Lexicon pre-classifier counters, reported by get_analysis_metrics
+lexicon_stats = {
+    "checked": 0,
+    "short_circuited": 0,
+}
+
+async def analyze_sentiment(text: str, hedge: Optional[bool] = None) -> Tuple[str, float]:
+    """
+    Analyze sentiment of review text.
+    If SENTIMENT_LEXICON_THRESHOLD is set, obvious reviews are classified by
+    the lexicon scorer and never reach a model.
+    Tries HuggingFace REST API first (if token available and its circuit
+    breaker is closed), falls back to batched local model inference.
+    With hedging (SENTIMENT_HEDGE_ENABLED or hedge=True), local inference is
+    started in parallel once the API is slower than its usual latency.
+    Returns: (sentiment: str, confidence: float)
+    """
+    threshold = settings.SENTIMENT_LEXICON_THRESHOLD
+    if threshold > 0:
+        lexicon_stats["checked"] += 1
+        sentiment, confidence = lexicon.classify(text)
+        if sentiment != "neutral" and confidence >= threshold:
+            lexicon_stats["short_circuited"] += 1
+            return sentiment, confidence
+    
+    if hedge is None:
+        hedge = settings.SENTIMENT_HEDGE_ENABLED
+    
+    # Try HuggingFace REST API first (preferred - no local download)
+    if _hf_token():
+        if hedge:
+            return await _hedged_sentiment(text)
+        
+        hf_result = await _call_with_breaker(
+            hf_breaker,
+            lambda: analyze_sentiment_via_hf_api(text),
+            lambda result: result is not None
+        )
+        if hf_result:
+            return hf_result
+    
+    logger.info("HF API unavailable, falling back to local model...")
+    
+    return await analyze_sentiment_locally(text)
+
+async def extract_key_points_via_rest_api(text: str, max_points: int = 5) -> list:
     """
     Extract key points using Gemini REST API directly.
     More flexible than SDK method.
@@ -209,11 +686,10 @@ JSON array format: ["point 1", "point 2", "point 3"]"""
         params = {"key": gemini_api_key}
         
         logger.info(f"Sending request to Gemini API: {GEMINI_API_URL}")
-        response = requests.post(
+        response = await provider_clients.post(
             GEMINI_API_URL,
             json=payload,
-            params=params,
-            timeout=30
+            params=params
         )
         
         if response.status_code != 200:
@@ -229,30 +705,32 @@ JSON array format: ["point 1", "point 2", "point 3"]"""
             logger.debug(f"Extracted text: {response_text}")
             
             # Parse JSON
-            key_points = json.loads(response_text)
-            if isinstance(key_points, list):
+            key_points = _clean_key_points(json.loads(response_text), max_points)
+            if key_points is not None:
                 logger.info(f"✓ Extracted {len(key_points)} key points")
                 return key_points
             else:
-                logger.error("Response is not a JSON array")
+                logger.error("Response is not a JSON array of key points")
                 return []
         except (KeyError, IndexError, json.JSONDecodeError) as e:
             logger.error(f"Failed to parse Gemini response: {e}")
             logger.error(f"Response data: {response_data}")
             return []
     
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         logger.error("Gemini API request timeout")
         return []
     except Exception as e:
         logger.error(f"Gemini REST API error: {e}")
         return []
 
-def extract_key_points_via_sdk(text: str, max_points: int = 5) -> list:
+async def extract_key_points_via_sdk(text: str, max_points: int = 5) -> list:
     """
     Extract key points using Gemini SDK.
     Fallback if REST API is not preferred.
     """
+    # First use imports the SDK, keep that off the event loop too
+    gemini_model = await asyncio.to_thread(_get_gemini_model)
     if not gemini_model:
         logger.warning("Gemini model not initialized")
         return []
@@ -265,7 +743,8 @@ Review: "{text}"
 
 Return format: ["point 1", "point 2", "point 3", ...]"""
         
-        response = gemini_model.generate_content(prompt)
+        # The SDK client is blocking, keep it off the event loop
+        response = await asyncio.to_thread(gemini_model.generate_content, prompt)
         
         # Parse JSON response
         try:
@@ -276,43 +755,548 @@ Return format: ["point 1", "point 2", "point 3", ...]"""
                 if response_text.startswith("json"):
                     response_text = response_text[4:].strip()
             
-            key_points = json.loads(response_text)
-            return key_points if isinstance(key_points, list) else []
+            return _clean_key_points(json.loads(response_text), max_points) or []
         except json.JSONDecodeError:
             logger.error(f"Failed to parse Gemini response as JSON: {response.text}")
-            # Fallback: extract sentences as key points
-            sentences = [s.strip() for s in text.split('.') if s.strip()]
-            return sentences[:max_points]
+            # Fallback: local key phrase extraction
+            return extract_key_phrases(text, max_points)
     except Exception as e:
         logger.error(f"Key points extraction via SDK error: {e}")
         return []
 
-def extract_key_points(text: str, max_points: int = 5) -> list:
+async def extract_key_points(text: str, max_points: int = 5, fallback: bool = True) -> list:
     """
-    Extract key points from review text using Gemini API.
-    Tries REST API first (more reliable), falls back to SDK if needed.
+    Extract key points from review text.
+    With KEY_POINTS_BACKEND=local, uses the in-process key phrase extractor.
+    Otherwise uses Gemini: REST API first (more reliable), then the SDK, and
+    the local extractor if both fail (unless fallback=False).
     Returns: list of key points
     """
-    # Try REST API first (preferred method)
-    key_points = extract_key_points_via_rest_api(text, max_points)
+    if settings.KEY_POINTS_BACKEND == "local":
+        return extract_key_phrases(text, max_points)
+    
+    # Try REST API first (preferred method), unless its circuit breaker is open
+    key_points = []
+    if gemini_api_key:
+        key_points = await _call_with_breaker(
+            gemini_breaker,
+            lambda: extract_key_points_via_rest_api(text, max_points),
+            bool
+        ) or []
+    
+    if not key_points:
+        key_points = await _extract_key_points_without_rest_api(text, max_points, fallback)
     
-    # If REST API fails and SDK is available, try SDK
-    if not key_points and gemini_model:
+    return key_points
+
+async def _extract_key_points_without_rest_api(text: str, max_points: int, fallback: bool) -> list:
+    """The SDK, then (if fallback) the local extractor"""
+    key_points = []
+    if gemini_api_key and not _gemini_sdk_failed:
         logger.info("REST API failed, falling back to SDK method")
-        key_points = extract_key_points_via_sdk(text, max_points)
+        key_points = await extract_key_points_via_sdk(text, max_points)
+    
+    if not key_points and fallback:
+        logger.info("Gemini unavailable, falling back to local key phrase extraction")
+        key_points = extract_key_phrases(text, max_points)
     
     return key_points
 
-def analyze_review(review_text: str) -> Dict:
+class JSONArrayStreamParser:
     """
-    Complete analysis: sentiment + key points
+    Incremental parser for a JSON array of strings that arrives in chunks:
+    each element is returned as soon as its closing quote has arrived. Text
+    before the opening bracket (such as a markdown fence) is skipped.
     """
-    sentiment, sentiment_score = analyze_sentiment(review_text)
-    key_points = extract_key_points(review_text)
     
-    return {
+    def __init__(self):
+        self._started = False
+        self._finished = False
+        self._in_string = False
+        self._escaped = False
+        self._literal: List[str] = []
+    
+    def feed(self, chunk: str) -> List[str]:
+        """Consume a chunk; returns the elements it completed"""
+        items = []
+        for char in chunk:
+            if self._finished:
+                break
+            if not self._started:
+                self._started = char == "["
+            elif self._in_string:
+                self._literal.append(char)
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    try:
+                        items.append(json.loads("".join(self._literal), strict=False))
+                    except json.JSONDecodeError:
+                        logger.warning("Skipping malformed key point in Gemini stream")
+            elif char == '"':
+                self._in_string = True
+                self._literal = [char]
+            elif char == "]":
+                self._finished = True
+        return items
+
+async def stream_key_points_via_rest_api(text: str, max_points: int = 5) -> AsyncIterator[str]:
+    """
+    Extract key points with Gemini's streamGenerateContent (SSE), yielding
+    each point as soon as it has been generated. Raises on API errors.
+    """
+    prompt = f"""Analyze the following product review and extract {max_points} key points or main topics discussed.
+Return ONLY a valid JSON array of strings with the key points. Each point should be concise (max 15 words).
+Do not include any markdown, code blocks, or additional text.
+
+Review: "{text}"
+
+JSON array format: ["point 1", "point 2", "point 3"]"""
+    
+    payload = {"contents": [{"parts": [{"text": prompt}]}]}
+    params = {"key": gemini_api_key, "alt": "sse"}
+    parser = JSONArrayStreamParser()
+    
+    async with provider_clients.stream(GEMINI_STREAM_URL, json=payload, params=params) as response:
+        if response.status_code != 200:
+            body = (await response.aread()).decode("utf-8", errors="replace")
+            raise RuntimeError(f"Gemini API error {response.status_code}: {body}")
+        
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            chunk = json.loads(line[len("data:"):])
+            for part in chunk.get("candidates", [{}])[0].get("content", {}).get("parts", []):
+                for point in parser.feed(part.get("text", "")):
+                    if isinstance(point, str) and point.strip():
+                        yield point.strip()
+
+async def stream_key_points(text: str, max_points: int = 5, fallback: bool = True) -> AsyncIterator[str]:
+    """
+    Key points as they become available. Streams from Gemini when possible;
+    if the stream fails before producing a point, falls back to the same
+    chain as extract_key_points (SDK, then the local extractor).
+    """
+    if settings.KEY_POINTS_BACKEND == "local":
+        for point in extract_key_phrases(text, max_points):
+            yield point
+        return
+    
+    produced = 0
+    if gemini_api_key and gemini_breaker.allow_request():
+        start = time.monotonic()
+        try:
+            async for point in stream_key_points_via_rest_api(text, max_points):
+                produced += 1
+                yield point
+        except Exception as e:
+            logger.error(f"Gemini streaming error: {e}")
+        except BaseException:
+            # Cancelled, or closed early by the consumer
+            gemini_breaker.record(produced > 0, time.monotonic() - start, abandoned=not produced)
+            raise
+        gemini_breaker.record(produced > 0, time.monotonic() - start)
+    
+    if not produced:
+        for point in await _extract_key_points_without_rest_api(text, max_points, fallback):
+            yield point
+
+# Rough characters-per-token ratio used to size batched prompts
+CHARS_PER_TOKEN = 4
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def _split_by_token_budget(texts: List[str], token_budget: int, max_reviews: int) -> List[List[int]]:
+    """Group text indices into batches that stay within the token budget"""
+    batches, current, used = [], [], 0
+    for index, text in enumerate(texts):
+        cost = _estimate_tokens(text)
+        if current and (used + cost > token_budget or len(current) >= max_reviews):
+            batches.append(current)
+            current, used = [], 0
+        current.append(index)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+def _clean_key_points(value, max_points: int) -> Optional[list]:
+    """Validate one item's key points; None if malformed"""
+    if not isinstance(value, list):
+        return None
+    points = [p.strip() for p in value if isinstance(p, str) and p.strip()]
+    return points[:max_points] if points else None
+
+async def _request_key_points_batch(items: Dict[int, str], max_points: int) -> Optional[Dict[int, list]]:
+    """
+    One Gemini call for several reviews.
+    Returns {id: key_points} for every well-formed item (malformed items are
+    left out), or None if the call failed or the response wasn't a JSON array.
+    Raises httpx.HTTPStatusError on non-200 responses.
+    """
+    reviews = json.dumps([{"id": i, "text": text} for i, text in items.items()], ensure_ascii=False)
+    prompt = f"""Analyze each product review in the JSON array below and extract up to {max_points} key points or main topics discussed in it.
+Each point should be concise (max 15 words).
+Return ONLY a valid JSON array with one object per review, in the form [{{"id": <review id>, "key_points": ["point 1", "point 2"]}}].
+Do not include any markdown, code blocks, or additional text.
+
+Reviews: {reviews}"""
+    
+    payload = {
+        "contents": [{"parts": [{"text": prompt}]}],
+        "generationConfig": {"responseMimeType": "application/json"}
+    }
+    
+    response = await provider_clients.post(
+        GEMINI_API_URL,
+        json=payload,
+        params={"key": gemini_api_key}
+    )
+    response.raise_for_status()
+    
+    try:
+        response_text = response.json()['candidates'][0]['content']['parts'][0]['text'].strip()
+        if response_text.startswith("```"):
+            response_text = response_text.split("```")[1].strip()
+            if response_text.startswith("json"):
+                response_text = response_text[4:].strip()
+        parsed = json.loads(response_text)
+    except (KeyError, IndexError, ValueError) as e:
+        logger.error(f"Failed to parse batched Gemini response: {e}")
+        return None
+    if not isinstance(parsed, list):
+        logger.error("Batched Gemini response is not a JSON array")
+        return None
+    
+    results = {}
+    for entry in parsed:
+        if not isinstance(entry, dict) or entry.get("id") not in items:
+            continue
+        points = _clean_key_points(entry.get("key_points"), max_points)
+        if points is not None:
+            results[entry["id"]] = points
+    return results
+
+async def _extract_batch_with_recovery(items: Dict[int, str], max_points: int, retry_missing: bool = True) -> Dict[int, list]:
+    """
+    Extract one batch; a garbled response is bisected to isolate the item that
+    broke it, and items missing from an otherwise good response are retried once.
+    HTTP errors (quota, outages) void the batch without multiplying requests.
+    """
+    try:
+        results = await _request_key_points_batch(items, max_points)
+    except httpx.HTTPStatusError as e:
+        logger.error(f"Gemini API error {e.response.status_code} for batch of {len(items)} reviews")
+        return {}
+    except Exception as e:
+        logger.error(f"Batched Gemini request failed for {len(items)} reviews: {e}")
+        return {}
+    
+    if results is None:
+        if len(items) == 1:
+            return {}
+        ids = list(items)
+        half = len(ids) // 2
+        first = await _extract_batch_with_recovery({i: items[i] for i in ids[:half]}, max_points, retry_missing)
+        second = await _extract_batch_with_recovery({i: items[i] for i in ids[half:]}, max_points, retry_missing)
+        return {**first, **second}
+    
+    missing = {i: text for i, text in items.items() if i not in results}
+    if missing and retry_missing:
+        logger.warning(f"⚠️  {len(missing)} of {len(items)} reviews missing from batched response, retrying them")
+        results.update(await _extract_batch_with_recovery(missing, max_points, retry_missing=False))
+    return results
+
+async def extract_key_points_batch(
+    texts: List[str],
+    max_points: int = 5,
+    token_budget: Optional[int] = None,
+    max_reviews: Optional[int] = None,
+    concurrency: int = 2,
+    backend: Optional[str] = None
+) -> List[list]:
+    """
+    Extract key points for many reviews, packing several into each Gemini
+    request. Batches are split by an estimated token budget; reviews whose
+    points could not be extracted get [].
+    With backend "local" (default: KEY_POINTS_BACKEND), the whole list goes
+    through the in-process key phrase extractor instead.
+    Returns: list of key point lists, aligned with `texts`
+    """
+    if (backend or settings.KEY_POINTS_BACKEND) == "local":
+        return await asyncio.to_thread(extract_key_phrases_batch, texts, max_points)
+    
+    if not gemini_api_key:
+        logger.warning("GEMINI_API_KEY not set")
+        return [[] for _ in texts]
+    
+    batches = _split_by_token_budget(
+        texts,
+        token_budget or settings.GEMINI_BATCH_TOKEN_BUDGET,
+        max_reviews or settings.GEMINI_BATCH_MAX_REVIEWS
+    )
+    slots = asyncio.Semaphore(concurrency)
+    
+    async def run(indices: List[int]) -> Dict[int, list]:
+        async with slots:
+            return await _extract_batch_with_recovery({i: texts[i] for i in indices}, max_points)
+    
+    logger.info(f"Extracting key points for {len(texts)} reviews in {len(batches)} Gemini requests")
+    merged: Dict[int, list] = {}
+    for results in await asyncio.gather(*(run(indices) for indices in batches)):
+        merged.update(results)
+    return [merged.get(i, []) for i in range(len(texts))]
+
+# Bump when prompts or result post-processing change, to invalidate cached analyses
+PROMPT_VERSION = "2"
+
+analysis_cache = AnalysisCache(
+    version=(
+        f"{settings.HUGGINGFACE_API_URL}|{GEMINI_API_URL}|prompt-{PROMPT_VERSION}"
+        f"|local-{SENTIMENT_MODEL_NAME}-{settings.SENTIMENT_BACKEND.lower()}|key-points-{settings.KEY_POINTS_BACKEND}|lexicon-{settings.SENTIMENT_LEXICON_THRESHOLD}"
+    ),
+    max_entries=settings.ANALYSIS_CACHE_MAX_ENTRIES,
+    persist=settings.ANALYSIS_CACHE_PERSIST
+)
+
+# Stored reviews by MinHash signature, loaded at app startup and extended on save
+near_duplicate_index = NearDuplicateIndex(threshold=settings.DEDUP_SIMILARITY_THRESHOLD)
+
+def _load_near_duplicate_analysis(review_id: int, review_text: str) -> Optional[Dict]:
+    """
+    Analysis of a stored review, if its text really is a near-duplicate.
+    Only the key points, unless the texts are the same once normalized: a
+    one-word edit such as a negation keeps two texts similar but flips the
+    sentiment.
+    """
+    db = SessionLocal()
+    try:
+        review = db.get(models.Review, review_id)
+        if not review or review.sentiment is None or review.analysis_degraded:
+            return None
+        if jaccard(review_text, review.review_text) < settings.DEDUP_SIMILARITY_THRESHOLD:
+            return None
+        analysis = {"key_points": review.get_key_points()}
+        if normalize_review_text(review_text) == normalize_review_text(review.review_text):
+            analysis["sentiment"] = review.sentiment.value if hasattr(review.sentiment, "value") else review.sentiment
+            analysis["sentiment_score"] = review.sentiment_score
+        return analysis
+    finally:
+        db.close()
+
+async def _previous_analysis(review_text: str, cache_key: str, fingerprint: Optional[bytes]) -> Optional[Dict]:
+    """
+    An earlier analysis of the same text (cache) or of a near-duplicate
+    stored review (key points only, unless the normalized text is the same)
+    """
+    cached = await analysis_cache.get(cache_key)
+    if cached:
+        logger.debug("✓ Analysis cache hit")
+        return cached
+    
+    if settings.DEDUP_SIMILARITY_THRESHOLD > 0 and near_duplicate_index.loaded:
+        if fingerprint is None:
+            fingerprint = await asyncio.to_thread(signature, review_text)
+        match = near_duplicate_index.find(fingerprint)
+        if match:
+            review_id, _ = match
+            previous = await asyncio.to_thread(_load_near_duplicate_analysis, review_id, review_text)
+            if previous and previous["key_points"]:
+                near_duplicate_index.record_hit()
+                logger.info(f"✓ Reusing analysis of near-duplicate review {review_id}")
+                return previous
+    return None
+
+async def analyze_review(review_text: str, fingerprint: Optional[bytes] = None) -> Dict:
+    """
+    Complete analysis: sentiment + key points, run concurrently.
+    Results are cached by normalized text; repeats skip the providers.
+    Near-duplicates of stored reviews (DEDUP_SIMILARITY_THRESHOLD) reuse
+    their key points and only score sentiment.
+    If KEY_POINTS_DEADLINE_SECONDS is set and key points miss it, the result
+    carries the sentiment only (empty key points, partial=True). If Gemini
+    fails, key points come from the local extractor. Results with fallback
+    sentiment or key points have degraded=True.
+    fingerprint is the text's MinHash signature, if the caller has it already.
+    """
+    cache_key = analysis_cache.key_for(review_text)
+    previous = await _previous_analysis(review_text, cache_key, fingerprint)
+    if previous and "sentiment" in previous:
+        return {**previous, "partial": False, "degraded": False}
+    
+    loop = asyncio.get_running_loop()
+    started_at = loop.time()
+    sentiment_task = asyncio.create_task(analyze_sentiment(review_text))
+    if previous:
+        # A near-duplicate's key points carry over
+        key_points_task = loop.create_future()
+        key_points_task.set_result(previous["key_points"])
+    else:
+        key_points_task = asyncio.create_task(extract_key_points(review_text, fallback=False))
+    partial = False
+    
+    try:
+        sentiment, sentiment_score = await sentiment_task
+        
+        deadline = settings.KEY_POINTS_DEADLINE_SECONDS
+        if deadline > 0:
+            remaining = max(0.0, started_at + deadline - loop.time())
+            try:
+                key_points = await asyncio.wait_for(key_points_task, timeout=remaining)
+            except asyncio.TimeoutError:
+                logger.warning(f"⚠️  Key points missed the {deadline}s deadline, returning sentiment only")
+                key_points = []
+                partial = True
+        else:
+            key_points = await key_points_task
+    finally:
+        # Don't leave a provider call running if we return early or fail
+        key_points_task.cancel()
+        sentiment_task.cancel()
+    
+    # Fallback key points are returned but, like other degraded answers, not cached
+    degraded = not key_points and not partial
+    if degraded:
+        key_points = extract_key_phrases(review_text)
+    
+    degraded = degraded or (sentiment, sentiment_score) == FALLBACK_SENTIMENT
+    
+    result = {
+        "sentiment": sentiment,
+        "sentiment_score": sentiment_score,
+        "key_points": key_points,
+        "partial": partial,
+        "degraded": degraded
+    }
+    
+    # Only cache complete answers - degraded ones should be retried next time
+    if not partial and not degraded:
+        await analysis_cache.set(cache_key, result)
+    
+    return result
+
+async def analyze_review_stream(review_text: str, fingerprint: Optional[bytes] = None) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Streaming variant of analyze_review. Yields ("sentiment", {...}) first,
+    then ("key_point", str) for each key point as it arrives, and finally
+    ("result", dict) with the same shape analyze_review returns. Key points
+    are extracted concurrently with sentiment and buffered until the
+    sentiment event has been sent.
+    """
+    cache_key = analysis_cache.key_for(review_text)
+    previous = await _previous_analysis(review_text, cache_key, fingerprint)
+    if previous and "sentiment" in previous:
+        yield "sentiment", {"sentiment": previous["sentiment"], "sentiment_score": previous["sentiment_score"]}
+        for point in previous["key_points"]:
+            yield "key_point", point
+        yield "result", {**previous, "partial": False, "degraded": False}
+        return
+    
+    queue: asyncio.Queue = asyncio.Queue()
+    done = object()
+    
+    async def produce_key_points():
+        try:
+            if previous:
+                # A near-duplicate's key points carry over
+                for point in previous["key_points"]:
+                    await queue.put(point)
+                return
+            async for point in stream_key_points(review_text, fallback=False):
+                await queue.put(point)
+        finally:
+            await queue.put(done)
+    
+    sentiment_task = asyncio.create_task(analyze_sentiment(review_text))
+    key_points_task = asyncio.create_task(produce_key_points())
+    key_points = []
+    
+    try:
+        sentiment, sentiment_score = await sentiment_task
+        yield "sentiment", {"sentiment": sentiment, "sentiment_score": sentiment_score}
+        
+        while True:
+            point = await queue.get()
+            if point is done:
+                break
+            key_points.append(point)
+            yield "key_point", point
+        # Surface a failure in the producer
+        await key_points_task
+    finally:
+        key_points_task.cancel()
+        sentiment_task.cancel()
+    
+    degraded = not key_points
+    if degraded:
+        key_points = extract_key_phrases(review_text)
+        for point in key_points:
+            yield "key_point", point
+    
+    degraded = degraded or (sentiment, sentiment_score) == FALLBACK_SENTIMENT
+    
+    result = {
         "sentiment": sentiment,
         "sentiment_score": sentiment_score,
-        "key_points": key_points
+        "key_points": key_points,
+        "partial": False,
+        "degraded": degraded
     }
+    if not degraded:
+        await analysis_cache.set(cache_key, result)
+    
+    yield "result", result
+
+# Review embeddings for similarity search, loaded at app startup and extended on save
+embedding_index = EmbeddingIndex(
+    settings.EMBEDDINGS_DIR,
+    nprobe=settings.EMBEDDING_SEARCH_NPROBE,
+    refresh_seconds=settings.EMBEDDING_REFRESH_SECONDS,
+    max_tail=settings.EMBEDDING_TAIL_MAX_REVIEWS
+)
+
+async def embed_text(text: str):
+    """Embedding of a text (float32 unit vector) on the inference executor"""
+    loop = asyncio.get_running_loop()
+    vectors = await loop.run_in_executor(inference_executor, embed_texts, [text])
+    return vectors[0]
+
+async def embed_review(review_text: str) -> Optional[bytes]:
+    """Packed embedding to store with a new review (None if EMBEDDINGS_ENABLED is off or embedding fails)"""
+    if not settings.EMBEDDINGS_ENABLED:
+        return None
+    try:
+        return to_blob(await embed_text(review_text))
+    except Exception as e:
+        logger.warning(f"⚠️  Review embedding failed: {type(e).__name__}: {e}")
+        return None
 
+def get_analysis_metrics() -> Dict:
+    """Runtime metrics of the analysis pipeline, for monitoring"""
+    return {
+        "sentiment_batching": sentiment_batcher.metrics(),
+        "provider_http": provider_clients.metrics(),
+        "analysis_cache": analysis_cache.metrics(),
+        "near_duplicates": near_duplicate_index.metrics(),
+        "embeddings": embedding_index.metrics(),
+        "circuit_breakers": {
+            "huggingface": hf_breaker.snapshot(),
+            "gemini": gemini_breaker.snapshot()
+        },
+        "sentiment_hedging": {
+            "enabled": settings.SENTIMENT_HEDGE_ENABLED,
+            **hedge_stats
+        },
+        "sentiment_lexicon": {
+            "threshold": settings.SENTIMENT_LEXICON_THRESHOLD,
+            **lexicon_stats,
+            "short_circuit_ratio": (
+                lexicon_stats["short_circuited"] / lexicon_stats["checked"]
+                if lexicon_stats["checked"] else 0
+            )
+        }
+    }
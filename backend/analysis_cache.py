@@ -0,0 +1,124 @@
+"""
+Content-addressed cache of review analysis results
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from cache import LRUCache
+from database import SessionLocal
+from validators import sanitize_text
+import models
+
+logger = logging.getLogger(__name__)
+
+def normalize_review_text(text: str) -> str:
+    """Normalize text for cache keys: same whitespace/character rules as sanitize_text, case-folded"""
+    return sanitize_text(text).casefold()
+
+class AnalysisCache:
+    """
+    Two-tier cache of analysis results keyed by a hash of the normalized text
+    plus the analysis version (models, endpoints, prompt).
+
+    The in-memory LRU tier answers repeats without leaving the process; the
+    database tier (analysis_results table) survives restarts and is shared by
+    all workers. Database errors are logged and treated as misses.
+    """
+
+    def __init__(self, version: str, max_entries: int = 10000, persist: bool = True):
+        self.version = version
+        self.persist = persist
+        self._memory = LRUCache(max_entries)
+        self._memory_hits = 0
+        self._db_hits = 0
+        self._misses = 0
+
+    def key_for(self, text: str) -> str:
+        """sha256 of analysis version + normalized text"""
+        normalized = normalize_review_text(text)
+        return hashlib.sha256(f"{self.version}\n{normalized}".encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict]:
+        """Look up a result in memory, then in the database"""
+        result = self._memory.get(key)
+        if result is not None:
+            self._memory_hits += 1
+            return dict(result)
+
+        if self.persist:
+            result = await asyncio.to_thread(self._load, key)
+            if result is not None:
+                self._db_hits += 1
+                self._memory.set(key, result)
+                return dict(result)
+
+        self._misses += 1
+        return None
+
+    async def set(self, key: str, result: Dict) -> None:
+        """Store a result in both tiers"""
+        entry = {
+            "sentiment": result["sentiment"],
+            "sentiment_score": result["sentiment_score"],
+            "key_points": list(result["key_points"]),
+        }
+        self._memory.set(key, entry)
+        if self.persist:
+            await asyncio.to_thread(self._store, key, entry)
+
+    def _load(self, key: str) -> Optional[Dict]:
+        db = SessionLocal()
+        try:
+            row = (
+                db.query(models.AnalysisResult)
+                .filter(models.AnalysisResult.content_hash == key)
+                .first()
+            )
+            if not row:
+                return None
+            return {
+                "sentiment": row.sentiment.value if hasattr(row.sentiment, "value") else row.sentiment,
+                "sentiment_score": row.sentiment_score,
+                "key_points": json.loads(row.key_points),
+            }
+        except Exception as e:
+            logger.warning(f"⚠️  Analysis cache lookup failed: {e}")
+            return None
+        finally:
+            db.close()
+
+    def _store(self, key: str, entry: Dict) -> None:
+        db = SessionLocal()
+        try:
+            db.add(models.AnalysisResult(
+                content_hash=key,
+                analysis_version=self.version,
+                sentiment=entry["sentiment"],
+                sentiment_score=entry["sentiment_score"],
+                key_points=json.dumps(entry["key_points"]),
+            ))
+            db.commit()
+        except IntegrityError:
+            # Another worker stored the same text first
+            db.rollback()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"⚠️  Analysis cache store failed: {e}")
+        finally:
+            db.close()
+
+    def metrics(self) -> Dict:
+        lookups = self._memory_hits + self._db_hits + self._misses
+        return {
+            "entries_in_memory": len(self._memory),
+            "max_entries": self._memory.max_entries,
+            "memory_hits": self._memory_hits,
+            "db_hits": self._db_hits,
+            "misses": self._misses,
+            "hit_ratio": (self._memory_hits + self._db_hits) / lookups if lookups else 0,
+        }
@@ -1,17 +1,32 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
-from datetime import datetime
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Session, joinedload
+from datetime import datetime, timedelta, timezone
+import asyncio
+import base64
 import logging
-from typing import List
+import math
+import threading
+from typing import List, Optional, Set, Tuple
 import json
 
 # Import database, models, schemas
-from database import engine, get_db, settings, Base
+from database import engine, get_db, settings, SessionLocal
+from db_utils import database_upgraded, schema_revision, upgrade_database
 import models
 import schemas
-from analysis import analyze_review
+from analysis import (
+    analyze_review, analyze_review_stream, embed_review, embed_text, embedding_index,
+    get_analysis_metrics, model_ready, near_duplicate_index, preload_sentiment_model,
+    provider_clients
+)
+from dedup import signature
+from embeddings import from_blob
+from sentiment_stats import BUCKET_STEPS, bucket_start, read_stats, read_trend, record_review_sentiment
+from topics import record_review_topics
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -47,14 +62,22 @@ class PrettyJSONResponse(JSONResponse):
 from fastapi.responses import ORJSONResponse
 app.default_response_class = PrettyJSONResponse
 
-# Startup event to create tables (deferred from import time)
+# Startup event to migrate the database (deferred from import time)
 @app.on_event("startup")
 def startup_event():
-    """Create database tables on startup"""
+    """Apply pending database migrations, or just check for them (RUN_MIGRATIONS_ON_STARTUP off, or applied by the gunicorn master)"""
     try:
-        logger.info("Creating database tables...")
-        Base.metadata.create_all(bind=engine)
-        logger.info("✓ Database tables created/verified")
+        if settings.RUN_MIGRATIONS_ON_STARTUP and not database_upgraded():
+            logger.info("Applying database migrations...")
+            upgrade_database()
+            logger.info("✓ Database schema up to date")
+        else:
+            with engine.connect() as connection:
+                current, head = schema_revision(connection)
+            if current != head:
+                logger.error(f"❌ Database schema is at revision {current}, expected {head} - run: alembic upgrade head")
+            else:
+                logger.info("✓ Database schema up to date")
         
         # Check API configuration
         if not settings.GEMINI_API_KEY:
@@ -63,9 +86,25 @@ def startup_event():
             logger.info("✓ Gemini API configured")
             
     except Exception as e:
-        logger.error(f"⚠️  Error creating tables: {e}")
-        # Don't fail startup if table creation fails
-        # Tables might already exist
+        logger.error(f"⚠️  Error migrating database: {e}")
+    
+    # Load the near-duplicate index in the background; lookups miss until it's ready
+    if settings.DEDUP_SIMILARITY_THRESHOLD > 0:
+        threading.Thread(target=near_duplicate_index.load_from_db, name="dedup-index", daemon=True).start()
+    if settings.EMBEDDINGS_ENABLED:
+        threading.Thread(target=embedding_index.load_from_db, name="embedding-index", daemon=True).start()
+    
+    # Under gunicorn (gunicorn.conf.py) the master has usually loaded it already
+    if settings.PRELOAD_MODEL and not model_ready():
+        preload_sentiment_model()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close pooled provider connections"""
+    await provider_clients.aclose()
+
+# Cursor of the next page of GET /api/reviews
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
 
 # Setup CORS
 app.add_middleware(
@@ -74,6 +113,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # ============ Health Check ============
@@ -82,9 +122,23 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "ok", "service": "Product Review Analyzer API"}
 
+@app.get("/health/ready", tags=["Health"])
+async def readiness_check():
+    """Readiness probe: with PRELOAD_MODEL, ready only once the sentiment model is loaded"""
+    if settings.PRELOAD_MODEL and not model_ready():
+        return JSONResponse(status_code=503, content={"status": "loading", "model_loaded": False})
+    return {"status": "ready", "model_loaded": model_ready()}
+
+@app.get("/api/metrics", tags=["Health"])
+async def analysis_metrics():
+    """Analysis pipeline runtime metrics"""
+    return get_analysis_metrics()
+
 # ============ Product Endpoints ============
+# Endpoints doing only blocking DB work are plain `def` so FastAPI runs them
+# in its threadpool instead of on the event loop.
 @app.post("/api/products", response_model=schemas.ProductResponse, status_code=201, tags=["Products"])
-async def create_product(product: schemas.ProductCreate, db: Session = Depends(get_db)):
+def create_product(product: schemas.ProductCreate, db: Session = Depends(get_db)):
     """Create a new product"""
     try:
         db_product = models.Product(
@@ -102,20 +156,163 @@ async def create_product(product: schemas.ProductCreate, db: Session = Depends(g
         raise HTTPException(status_code=400, detail=error_msg)
 
 @app.get("/api/products", response_model=List[schemas.ProductResponse], tags=["Products"])
-async def get_products(db: Session = Depends(get_db)):
+def get_products(db: Session = Depends(get_db)):
     """Get all products"""
     products = db.query(models.Product).all()
     return products
 
 @app.get("/api/products/{product_id}", response_model=schemas.ProductResponse, tags=["Products"])
-async def get_product(product_id: int, db: Session = Depends(get_db)):
+def get_product(product_id: int, db: Session = Depends(get_db)):
     """Get a specific product"""
     product = db.query(models.Product).filter(models.Product.id == product_id).first()
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     return product
 
+MAX_PRODUCT_TOPICS = 100
+
+@app.get("/api/products/{product_id}/topics", response_model=schemas.ProductTopicsResponse, tags=["Products"])
+def get_product_topics(product_id: int, limit: int = 20, db: Session = Depends(get_db)):
+    """
+    What reviewers say about a product: its most mentioned key point topics
+    with their sentiment mix, read from the incrementally maintained
+    product_topics table
+    Query params:
+    - limit: Number of topics (1-100, default 20)
+    """
+    if not 1 <= limit <= MAX_PRODUCT_TOPICS:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PRODUCT_TOPICS}")
+    if not db.query(models.Product.id).filter(models.Product.id == product_id).first():
+        raise HTTPException(status_code=404, detail="Product not found")
+    
+    topics = (
+        db.query(models.ProductTopic)
+        .filter(models.ProductTopic.product_id == product_id)
+        .order_by(models.ProductTopic.mention_count.desc())
+        .limit(limit)
+        .all()
+    )
+    return {
+        "product_id": product_id,
+        "topics": [
+            {
+                "topic": topic.label,
+                "mentions": topic.mention_count,
+                "sentiment_distribution": {
+                    "positive": topic.positive_count,
+                    "negative": topic.negative_count,
+                    "neutral": topic.neutral_count
+                },
+                "last_mentioned_at": topic.last_mentioned_at
+            }
+            for topic in topics
+        ]
+    }
+
+# Default time range per granularity, and the most buckets one request may span
+TREND_WINDOWS = {"hour": timedelta(days=2), "day": timedelta(days=90), "week": timedelta(weeks=52)}
+MAX_TREND_BUCKETS = 1000
+
+def _utc(moment: Optional[datetime]) -> Optional[datetime]:
+    """Naive UTC, like the stored timestamps"""
+    if moment is None or moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+@app.get("/api/products/{product_id}/trend", response_model=schemas.ProductTrendResponse, tags=["Products"])
+def get_product_trend(
+    product_id: int,
+    granularity: str = "day",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    A product's review count and sentiment over time, per UTC hour, day or
+    week, read from pre-aggregated buckets (sentiment_stats.py). Every
+    bucket in the range is returned, including empty ones.
+    Query params:
+    - granularity: hour, day (default) or week (starting Monday)
+    - since: Start of the range (default: 2 days, 90 days or 52 weeks before until)
+    - until: End of the range, exclusive (default: now)
+    """
+    if granularity not in BUCKET_STEPS:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of {list(BUCKET_STEPS)}")
+    until = _utc(until) or datetime.utcnow()
+    since = _utc(since) or until - TREND_WINDOWS[granularity]
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    if (until - bucket_start(since, granularity)) / BUCKET_STEPS[granularity] > MAX_TREND_BUCKETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range spans more than {MAX_TREND_BUCKETS} buckets; use a coarser granularity"
+        )
+    if not db.query(models.Product.id).filter(models.Product.id == product_id).first():
+        raise HTTPException(status_code=404, detail="Product not found")
+
+    return {
+        "product_id": product_id,
+        "granularity": granularity,
+        "buckets": [
+            {
+                "start": bucket["bucket_start"],
+                "total_reviews": bucket["review_count"],
+                "sentiment_distribution": {
+                    "positive": bucket["positive_count"],
+                    "negative": bucket["negative_count"],
+                    "neutral": bucket["neutral_count"]
+                },
+                "average_sentiment_score": (
+                    bucket["score_sum"] / bucket["scored_count"] if bucket["scored_count"] else 0
+                )
+            }
+            for bucket in read_trend(db, product_id, granularity, since, until)
+        ]
+    }
+
 # ============ Review Analysis Endpoint ============
+def _product_exists(db: Session, product_id: int) -> bool:
+    exists = db.query(models.Product.id).filter(models.Product.id == product_id).first() is not None
+    # Return the connection to the pool so it isn't held during the provider calls
+    db.close()
+    return exists
+
+def _save_review(
+    db: Session,
+    request: schemas.ReviewAnalyzeRequest,
+    analysis_result: dict,
+    embedding: Optional[bytes] = None,
+    fingerprint: Optional[bytes] = None
+) -> models.Review:
+    if fingerprint is None:
+        # Not computed by the caller (or too short to have one, which is cheap to find out)
+        fingerprint = signature(request.review_text)
+    now = datetime.utcnow()
+    db_review = models.Review(
+        product_id=request.product_id,
+        review_text=request.review_text,
+        sentiment=analysis_result["sentiment"],
+        sentiment_score=analysis_result["sentiment_score"],
+        key_points=analysis_result["key_points"],
+        created_at=now,
+        analyzed_at=now,
+        analysis_degraded=analysis_result.get("degraded", False)
+    )
+    if fingerprint is not None:
+        db_review.fingerprint = models.ReviewFingerprint(minhash=fingerprint)
+    if embedding is not None:
+        db_review.embedding = models.ReviewEmbedding(vector=embedding)
+    db.add(db_review)
+    # Product topic and sentiment counts change in the same transaction as the review
+    record_review_topics(db, request.product_id, analysis_result["key_points"], analysis_result["sentiment"], now)
+    record_review_sentiment(db, request.product_id, analysis_result["sentiment"], analysis_result["sentiment_score"], now)
+    db.commit()
+    db.refresh(db_review)
+    if not db_review.analysis_degraded:
+        near_duplicate_index.add(db_review.id, fingerprint)
+    embedding_index.add(db_review.id, embedding)
+    return db_review
+
 @app.post("/api/analyze-review", response_model=schemas.ReviewAnalysisResult, status_code=201, tags=["Reviews"])
 async def analyze_review_endpoint(
     request: schemas.ReviewAnalyzeRequest,
@@ -123,72 +320,185 @@ async def analyze_review_endpoint(
 ):
     """
     Analyze a product review: sentiment analysis + key points extraction
+    
+    Provider calls are awaited and blocking database work runs in the
+    threadpool, so slow analyses never stall other requests on this worker.
     """
     try:
         # Verify product exists
-        product = db.query(models.Product).filter(models.Product.id == request.product_id).first()
-        if not product:
+        if not await run_in_threadpool(_product_exists, db, request.product_id):
             raise HTTPException(status_code=404, detail="Product not found")
         
         logger.info(f"Analyzing review for product {request.product_id}")
         
-        # Perform analysis
-        analysis_result = analyze_review(request.review_text)
+        # Perform analysis, embedding the review for similarity search meanwhile
+        embedding_task = asyncio.create_task(embed_review(request.review_text))
+        try:
+            # MinHash is pure Python: off the event loop, once for the lookup and the save
+            fingerprint = await run_in_threadpool(signature, request.review_text)
+            analysis_result = await analyze_review(request.review_text, fingerprint)
+            embedding = await embedding_task
+        finally:
+            embedding_task.cancel()
         
         # Create review record
-        db_review = models.Review(
-            product_id=request.product_id,
-            review_text=request.review_text,
-            sentiment=analysis_result["sentiment"],
-            sentiment_score=analysis_result["sentiment_score"],
-            key_points=",".join(analysis_result["key_points"]),
-            analyzed_at=datetime.utcnow()
-        )
-        db.add(db_review)
-        db.commit()
-        db.refresh(db_review)
+        db_review = await run_in_threadpool(_save_review, db, request, analysis_result, embedding, fingerprint)
         
         logger.info(f"Review analyzed and saved with ID {db_review.id}")
         
         return schemas.ReviewAnalysisResult(
             sentiment=analysis_result["sentiment"],
             sentiment_score=analysis_result["sentiment_score"],
-            key_points=analysis_result["key_points"]
+            key_points=analysis_result["key_points"],
+            partial=analysis_result["partial"]
         )
     
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await run_in_threadpool(db.rollback)
         logger.error(f"Error analyzing review: {e}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+def _sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/api/analyze-review/stream", tags=["Reviews"])
+async def analyze_review_stream_endpoint(
+    request: schemas.ReviewAnalyzeRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Streaming variant of /api/analyze-review using Server-Sent Events
+    
+    Events, in order:
+    - sentiment: {"sentiment", "sentiment_score"}
+    - key_point: {"key_point"}, once per key point as soon as it is extracted
+    - saved: the full analysis result plus "review_id"
+    - error: {"detail"} if the analysis or save fails (ends the stream)
+    """
+    # Verify product exists before the stream starts, so a bad id is still a 404
+    if not await run_in_threadpool(_product_exists, db, request.product_id):
+        raise HTTPException(status_code=404, detail="Product not found")
+    
+    logger.info(f"Streaming analysis of review for product {request.product_id}")
+    
+    async def events():
+        # The response outlives the request-scoped session, use a dedicated one
+        stream_db = SessionLocal()
+        embedding_task = asyncio.create_task(embed_review(request.review_text))
+        try:
+            fingerprint = await run_in_threadpool(signature, request.review_text)
+            async for event, data in analyze_review_stream(request.review_text, fingerprint):
+                if event == "sentiment":
+                    yield _sse_event("sentiment", data)
+                elif event == "key_point":
+                    yield _sse_event("key_point", {"key_point": data})
+                else:
+                    embedding = await embedding_task
+                    db_review = await run_in_threadpool(_save_review, stream_db, request, data, embedding, fingerprint)
+                    logger.info(f"Review analyzed and saved with ID {db_review.id}")
+                    yield _sse_event("saved", {**data, "review_id": db_review.id})
+        except Exception as e:
+            await run_in_threadpool(stream_db.rollback)
+            logger.error(f"Error streaming review analysis: {e}")
+            yield _sse_event("error", {"detail": f"Analysis failed: {str(e)}"})
+        finally:
+            embedding_task.cancel()
+            await run_in_threadpool(stream_db.close)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Disable proxy buffering so events reach the client as they are sent
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # ============ Reviews Retrieval Endpoint ============
+# Newest first; matches the ix_reviews_*_created indexes (migration 0005)
+REVIEW_LISTING_ORDER = (models.Review.created_at.desc(), models.Review.id.desc())
+
+# Review responses nest the product: load it in the same query instead of
+# lazily, one SELECT per review, while the response is serialized
+WITH_PRODUCT = joinedload(models.Review.product, innerjoin=True)
+
+def _reviews_query(db: Session, product_id: Optional[int] = None, sentiment: Optional[str] = None):
+    """Reviews matching the listing and stats filters"""
+    query = db.query(models.Review)
+    if product_id:
+        query = query.filter(models.Review.product_id == product_id)
+    if sentiment:
+        query = query.filter(models.Review.sentiment == sentiment)
+    return query
+
+REVIEWS_PAGE_SIZE = 50
+MAX_REVIEWS_PAGE_SIZE = 200
+
+def encode_review_cursor(review: models.Review) -> str:
+    """Opaque cursor pointing just past a review in listing order"""
+    position = json.dumps([review.created_at.isoformat(), review.id])
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip("=")
+
+def decode_review_cursor(cursor: str) -> Tuple[datetime, int]:
+    """(created_at, id) of the last review of the previous page"""
+    try:
+        position = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, review_id = json.loads(position)
+        return datetime.fromisoformat(created_at), int(review_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _reviews_page_query(
+    db: Session,
+    product_id: Optional[int] = None,
+    sentiment: Optional[str] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    limit: int = REVIEWS_PAGE_SIZE
+):
+    """
+    One page of the review listing, starting after the (created_at, id) of
+    the previous page's last review. Seeking on the index instead of OFFSET
+    keeps every page as cheap as the first.
+    """
+    query = _reviews_query(db, product_id, sentiment)
+    if after is not None:
+        query = query.filter(tuple_(models.Review.created_at, models.Review.id) < after)
+    return query.options(WITH_PRODUCT).order_by(*REVIEW_LISTING_ORDER).limit(limit)
+
 @app.get("/api/reviews", response_model=List[schemas.ReviewWithProductResponse], tags=["Reviews"])
-async def get_reviews(
+def get_reviews(
+    response: Response,
     product_id: int = None,
     sentiment: str = None,
+    cursor: Optional[str] = None,
+    limit: int = REVIEWS_PAGE_SIZE,
     db: Session = Depends(get_db)
 ):
     """
-    Get all reviews with optional filtering by product or sentiment
+    Get reviews, newest first, with optional filtering by product or sentiment
     Query params:
     - product_id: Filter by product ID
     - sentiment: Filter by sentiment (positive/negative/neutral)
+    - limit: Page size (default 50, max 200)
+    - cursor: Value of the X-Next-Cursor header of the previous page
+
+    X-Next-Cursor is only set when there are more reviews.
     """
     try:
-        query = db.query(models.Review)
-        
-        if product_id:
-            query = query.filter(models.Review.product_id == product_id)
-        
         if sentiment:
             valid_sentiments = ["positive", "negative", "neutral"]
             if sentiment.lower() not in valid_sentiments:
                 raise HTTPException(status_code=400, detail=f"Invalid sentiment. Must be one of {valid_sentiments}")
-            query = query.filter(models.Review.sentiment == sentiment.lower())
-        
-        reviews = query.order_by(models.Review.created_at.desc()).all()
+            sentiment = sentiment.lower()
+        if not 1 <= limit <= MAX_REVIEWS_PAGE_SIZE:
+            raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_REVIEWS_PAGE_SIZE}")
+        after = decode_review_cursor(cursor) if cursor else None
+
+        # One extra row tells whether there is a next page
+        reviews = _reviews_page_query(db, product_id, sentiment, after, limit + 1).all()
+        if len(reviews) > limit:
+            reviews = reviews[:limit]
+            response.headers[NEXT_CURSOR_HEADER] = encode_review_cursor(reviews[-1])
         return reviews
     
     except HTTPException:
@@ -197,49 +507,130 @@ async def get_reviews(
         logger.error(f"Error fetching reviews: {e}")
         raise HTTPException(status_code=500, detail="Error fetching reviews. Please try again.")
 
+# ============ Similarity Search Endpoints ============
+# Declared before /api/reviews/{review_id} so "search" isn't taken for an id
+MAX_SIMILAR_REVIEWS = 100
+
+def _check_similarity_request(limit: int) -> None:
+    if not settings.EMBEDDINGS_ENABLED:
+        raise HTTPException(status_code=503, detail="Similarity search is disabled (EMBEDDINGS_ENABLED)")
+    if not 1 <= limit <= MAX_SIMILAR_REVIEWS:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_SIMILAR_REVIEWS}")
+
+def _similar_reviews(db: Session, vector, limit: int, exclude: Set[int] = frozenset()) -> List[dict]:
+    embedding_index.refresh()
+    matches = embedding_index.search(vector, limit, exclude)
+    reviews = {
+        review.id: review
+        for review in (
+            db.query(models.Review)
+            .options(WITH_PRODUCT)
+            .filter(models.Review.id.in_([review_id for review_id, _ in matches]))
+        )
+    }
+    # Reviews deleted since the snapshot was written are skipped
+    return [
+        {"review": reviews[review_id], "similarity": similarity}
+        for review_id, similarity in matches if review_id in reviews
+    ]
+
+@app.get("/api/reviews/search", response_model=List[schemas.SimilarReviewResponse], tags=["Reviews"])
+async def search_reviews(q: str, limit: int = 10, db: Session = Depends(get_db)):
+    """
+    Reviews most similar in meaning to a free-text query
+    Query params:
+    - q: Search text
+    - limit: Number of results (1-100, default 10)
+    """
+    _check_similarity_request(limit)
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Query must not be empty")
+    vector = await embed_text(q)
+    return await run_in_threadpool(_similar_reviews, db, vector, limit)
+
+def _review_with_embedding(db: Session, review_id: int):
+    review = db.query(models.Review).filter(models.Review.id == review_id).first()
+    if not review:
+        return None, None
+    return review, from_blob(review.embedding.vector) if review.embedding else None
+
+@app.get("/api/reviews/{review_id}/similar", response_model=List[schemas.SimilarReviewResponse], tags=["Reviews"])
+async def get_similar_reviews(review_id: int, limit: int = 10, db: Session = Depends(get_db)):
+    """Reviews most similar to a stored review (limit: 1-100, default 10)"""
+    _check_similarity_request(limit)
+    review, vector = await run_in_threadpool(_review_with_embedding, db, review_id)
+    if not review:
+        raise HTTPException(status_code=404, detail="Review not found")
+    if vector is None:
+        # Saved before embeddings were enabled and not backfilled yet
+        vector = await embed_text(review.review_text)
+    return await run_in_threadpool(_similar_reviews, db, vector, limit, {review_id})
+
 @app.get("/api/reviews/{review_id}", response_model=schemas.ReviewWithProductResponse, tags=["Reviews"])
-async def get_review(review_id: int, db: Session = Depends(get_db)):
+def get_review(review_id: int, db: Session = Depends(get_db)):
     """Get a specific review by ID"""
-    review = db.query(models.Review).filter(models.Review.id == review_id).first()
+    review = db.query(models.Review).options(WITH_PRODUCT).filter(models.Review.id == review_id).first()
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
     return review
 
 # ============ Statistics Endpoint ============
+STATS_PERCENTILES = (50, 90, 99)
+
+def _score_percentiles(db: Session, product_id: Optional[int], scored: int) -> dict:
+    """Nearest-rank STATS_PERCENTILES of the scores that count toward the average"""
+    if not scored:
+        return {}
+    score = models.Review.sentiment_score
+    query = _reviews_query(db, product_id).filter(score.isnot(None), score != 0)
+    if db.get_bind().dialect.name == "postgresql":
+        values = query.with_entities(
+            *[func.percentile_disc(p / 100).within_group(score) for p in STATS_PERCENTILES]
+        ).one()
+        return {f"p{p}": value for p, value in zip(STATS_PERCENTILES, values)}
+    # No ordered-set aggregates (SQLite): read the value at each rank
+    ranked = query.with_entities(score).order_by(score)
+    return {
+        f"p{p}": ranked.offset(max(math.ceil(p / 100 * scored) - 1, 0)).limit(1).scalar()
+        for p in STATS_PERCENTILES
+    }
+
 @app.get("/api/stats", tags=["Stats"])
-async def get_statistics(product_id: int = None, db: Session = Depends(get_db)):
-    """Get statistics about reviews and sentiment distribution"""
+def get_statistics(product_id: int = None, percentiles: bool = False, db: Session = Depends(get_db)):
+    """
+    Get statistics about reviews and sentiment distribution
+    Query params:
+    - product_id: Filter by product ID
+    - percentiles: Also return p50/p90/p99 of sentiment_score (these are
+      computed from the reviews, not the rollup)
+    """
     try:
-        query = db.query(models.Review)
-        
-        if product_id:
-            query = query.filter(models.Review.product_id == product_id)
-        
-        reviews = query.all()
-        
-        if not reviews:
-            return {
+        # Counters maintained as reviews are saved (sentiment_stats.py), not a scan of reviews
+        counters = read_stats(db, product_id)
+        total = counters["review_count"]
+        scored = counters["scored_count"]
+
+        if not total:
+            stats = {
                 "total_reviews": 0,
                 "sentiment_distribution": {},
                 "average_sentiment_score": 0
             }
-        
-        sentiment_count = {"positive": 0, "negative": 0, "neutral": 0}
-        total_score = 0
-        count_with_score = 0
-        
-        for review in reviews:
-            if review.sentiment:
-                sentiment_count[review.sentiment] += 1
-            if review.sentiment_score:
-                total_score += review.sentiment_score
-                count_with_score += 1
-        
-        return {
-            "total_reviews": len(reviews),
-            "sentiment_distribution": sentiment_count,
-            "average_sentiment_score": total_score / count_with_score if count_with_score > 0 else 0
-        }
+        else:
+            stats = {
+                "total_reviews": total,
+                "sentiment_distribution": {
+                    "positive": counters["positive_count"],
+                    "negative": counters["negative_count"],
+                    "neutral": counters["neutral_count"]
+                },
+                "average_sentiment_score": counters["score_sum"] / scored if scored > 0 else 0,
+                "last_review_at": counters["last_review_at"]
+            }
+
+        if percentiles:
+            stats["sentiment_score_percentiles"] = _score_percentiles(db, product_id, scored)
+        return stats
     except Exception as e:
         logger.error(f"Error fetching statistics: {e}")
         raise HTTPException(status_code=500, detail="Error fetching statistics. Please try again.")
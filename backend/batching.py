@@ -0,0 +1,138 @@
+"""
+Dynamic micro-batching for local model inference
+"""
+import asyncio
+import logging
+from collections import Counter
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class MicroBatcher:
+    """
+    Collect concurrent inference requests into batched forward passes.
+
+    Requests are queued and drained by a single collector task, which waits for
+    a free executor slot, then takes up to `max_batch_size` items, waiting at most
+    `max_wait_ms` for the batch to fill. The batch is bucketed by token length
+    (power-of-two buckets from 64 tokens up) so short texts aren't padded to the
+    longest one, and each bucket runs as one call to `predict_batch` on the
+    executor.
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[List[str]], List[Any]],
+        executor: Executor,
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10,
+        max_concurrent_batches: int = 1,
+        length_fn: Optional[Callable[[str], int]] = None
+    ):
+        self.predict_batch = predict_batch
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_concurrent_batches = max(1, max_concurrent_batches)
+        self.length_fn = length_fn or (lambda text: len(text.split()))
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._collector: Optional[asyncio.Task] = None
+
+        self._batches = 0
+        self._items = 0
+        self._passes = 0
+        self._batch_sizes: Counter = Counter()
+
+    async def submit(self, text: str) -> Any:
+        """Queue one text and wait for its prediction"""
+        self._ensure_collector()
+        future = self._loop.create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    def _ensure_collector(self) -> None:
+        """Start the collector on the running loop (restarting it if the loop changed)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._collector and not self._collector.done():
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+        self._collector = loop.create_task(self._collect())
+
+    async def _collect(self) -> None:
+        while True:
+            # Wait for capacity first: while every slot is busy, requests pile up
+            # in the queue and the next batch fills immediately.
+            await self._slots.acquire()
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self._loop.create_task(self._run(batch))
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        try:
+            batch = [(text, future) for text, future in batch if not future.done()]
+            if not batch:
+                return
+            self._batches += 1
+            self._items += len(batch)
+            self._batch_sizes[len(batch)] += 1
+
+            for bucket in self._bucket_by_length(batch):
+                texts = [text for text, _ in bucket]
+                self._passes += 1
+                try:
+                    results = await self._loop.run_in_executor(self.executor, self.predict_batch, texts)
+                except Exception as e:
+                    logger.error(f"❌ Batched inference failed for {len(texts)} items: {type(e).__name__}: {e}")
+                    for _, future in bucket:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                for (_, future), result in zip(bucket, results):
+                    if not future.done():
+                        future.set_result(result)
+        finally:
+            self._slots.release()
+
+    def _bucket_by_length(self, batch: List[Tuple[str, asyncio.Future]]) -> List[List[Tuple[str, asyncio.Future]]]:
+        """Group items into power-of-two token-length buckets, shortest first"""
+        # Padding below 64 tokens costs less than an extra forward pass
+        min_bucket_bits = 6
+        buckets: Dict[int, list] = {}
+        for item in batch:
+            try:
+                length = self.length_fn(item[0])
+            except Exception:
+                length = len(item[0].split())
+            bits = max(min_bucket_bits, (max(1, length) - 1).bit_length())
+            buckets.setdefault(bits, []).append(item)
+        return [buckets[key] for key in sorted(buckets)]
+
+    def metrics(self) -> Dict[str, Any]:
+        """Achieved batching statistics"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": self._batches,
+            "items": self._items,
+            "forward_passes": self._passes,
+            "average_batch_size": self._items / self._batches if self._batches else 0,
+            "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+        }
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""
+Benchmark: similarity search latency over the memory-mapped embedding index.
+
+Writes snapshots of synthetic review embeddings (unit vectors clustered
+around random "topics", like real sentence embeddings) with the same code
+as `manage.py rebuild-embedding-index`, then measures per-query latency of
+a full float16 scan and of the IVF index at several nprobe values, with
+IVF recall@k against the full scan. Query time excludes embedding the query
+text; --with-model reports that separately (EMBEDDING_MODEL_NAME).
+
+    python benchmarks/embedding_search.py [--sizes 100000 1000000] [--dim 384] [--queries 50]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+NPROBES = [4, 16, 64]
+
+CHUNK = 100_000
+
+def synthetic_rows(n, dim, topics, rng, keep):
+    """(review_id, blob) rows generated chunk by chunk; vectors of the ids in keep are collected"""
+    from embeddings import to_blob
+
+    centers = rng.standard_normal((topics, dim)).astype(np.float32)
+    for start in range(0, n, CHUNK):
+        count = min(CHUNK, n - start)
+        vectors = centers[rng.integers(0, topics, count)] + 0.8 * rng.standard_normal((count, dim)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        for i, vector in enumerate(vectors, start + 1):
+            if i in keep:
+                keep[i] = vector
+            yield i, to_blob(vector)
+
+def percentile(samples, p):
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+def run(size, args, directory):
+    from embeddings import _Snapshot, _scan, write_snapshot
+
+    rng = np.random.default_rng(size)
+    keep = dict.fromkeys(rng.integers(1, size + 1, args.queries).tolist())
+
+    start = time.perf_counter()
+    meta = write_snapshot(directory, synthetic_rows(size, args.dim, args.topics, rng, keep), size, args.dim)
+    build_seconds = time.perf_counter() - start
+
+    # Queries: noisy copies of stored reviews (cosine ~0.9 to the original)
+    queries = np.stack(list(keep.values()))
+    queries += 0.5 / np.sqrt(args.dim) * rng.standard_normal(queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    current = open(os.path.join(directory, "CURRENT")).read().strip()
+    snapshot = _Snapshot(Path(directory) / current)
+    size_mb = os.path.getsize(os.path.join(directory, current, "vectors.npy")) / 2**20
+
+    print(f"\n   {size:,} reviews: snapshot {size_mb:.0f}MB float16, built in {build_seconds:.1f}s ({meta['nlist']} IVF clusters)")
+    print(f"   {'method':>12}  {'p50':>9}  {'p95':>9}  {f'recall@{args.k}':>10}")
+
+    exact, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        _, ids = _scan(snapshot.vectors, snapshot.ids, query, args.k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        exact.append(set(ids.tolist()))
+    print(f"   {'full scan':>12}  {statistics.median(latencies):>7.1f}ms  {percentile(latencies, 95):>7.1f}ms  {'1.000':>10}")
+
+    if snapshot.centroids is None:
+        return
+    for nprobe in NPROBES:
+        latencies, recall = [], []
+        for query, truth in zip(queries, exact):
+            start = time.perf_counter()
+            _, ids = snapshot.search(query, args.k, nprobe)
+            latencies.append((time.perf_counter() - start) * 1000)
+            recall.append(len(truth & set(ids.tolist())) / args.k)
+        print(
+            f"   {f'ivf/{nprobe}':>12}  {statistics.median(latencies):>7.1f}ms  "
+            f"{percentile(latencies, 95):>7.1f}ms  {statistics.mean(recall):>10.3f}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=384, help="all-MiniLM-L6-v2 embeddings have 384 dimensions")
+    parser.add_argument("--topics", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--with-model", action="store_true", help="also time embedding the query text")
+    args = parser.parse_args()
+
+    print("\n" + "=" * 60)
+    print(f"Embedding similarity search (dim {args.dim}, top {args.k})")
+    print("=" * 60)
+
+    if args.with_model:
+        from embeddings import embed_texts
+
+        embed_texts(["warmup"])
+        latencies = []
+        for _ in range(args.queries):
+            start = time.perf_counter()
+            embed_texts(["battery drains overnight even when the phone is idle"])
+            latencies.append((time.perf_counter() - start) * 1000)
+        print(f"   query embedding p50={statistics.median(latencies):.1f}ms")
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            run(size, args, directory)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Import-time profile of the backend (`python -X importtime -c "import app"`).
+
+Reports the wall-clock time of `import app` (best of N fresh interpreters),
+the slowest modules by cumulative and by self time, and whether any of the
+heavy provider/model libraries got imported - they should all be deferred
+until first use.
+
+    python benchmarks/import_time.py [--module app] [--top 15] [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Must not be imported by `import app`
+DEFERRED_MODULES = ["google.generativeai", "transformers", "torch", "onnxruntime", "tokenizers"]
+
+def run_python(code, *flags):
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+def wall_time(module, runs):
+    """Best-of-N seconds for importing the module in a fresh interpreter, plus deferred modules loaded"""
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {DEFERRED_MODULES!r} if m in sys.modules]}}))\n"
+    )
+    samples = [json.loads(run_python(code).stdout.strip().splitlines()[-1]) for _ in range(runs)]
+    return min(s["seconds"] for s in samples), samples[0]["loaded"]
+
+def profile(module):
+    """Parse -X importtime output into (name, self_us, cumulative_us, depth) rows"""
+    stderr = run_python(f"import {module}", "-X", "importtime").stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    seconds, loaded = wall_time(args.module, args.runs)
+    rows = profile(args.module)
+
+    print("\n" + "=" * 60)
+    print(f"Import time of `{args.module}`")
+    print("=" * 60)
+    print(f"   wall clock (best of {args.runs}): {seconds * 1000:.0f}ms")
+    print(f"   modules imported: {len(rows)}")
+
+    # Direct imports of the top-level module, by cumulative time
+    top_level = min((depth for *_, depth in rows), default=0)
+    direct = sorted((r for r in rows if r[3] == top_level + 1), key=lambda r: -r[2])
+    print(f"\n   slowest direct imports of {args.module} (cumulative):")
+    for name, _, cumulative_us, _ in direct[:args.top]:
+        print(f"      {cumulative_us / 1000:8.1f}ms  {name}")
+
+    print("\n   slowest modules (self):")
+    for name, self_us, _, _ in sorted(rows, key=lambda r: -r[1])[:args.top]:
+        print(f"      {self_us / 1000:8.1f}ms  {name}")
+
+    print("\n   deferred modules:")
+    for module in DEFERRED_MODULES:
+        print(f"      {'❌ imported' if module in loaded else '✅ not imported'}  {module}")
+    return 1 if loaded else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+"""
+Benchmark: listing reviews with key_points as comma-joined text vs native JSON.
+
+Creates two copies of the same synthetic reviews - one with key_points in a
+Text column, written as ",".join(points) and read back through the old
+JSON-then-comma-split validator, one in the JSON column - and times
+loading, validating and serializing all of them the way GET /api/reviews
+does. Also counts key points the text format corrupts (points containing
+commas come back split).
+
+    python benchmarks/key_points_listing.py [--reviews 10000] [--database-url sqlite://]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from pydantic import field_validator
+from sqlalchemy import Column, DateTime, Float, Integer, String, Text, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from models import JSONList
+from schemas import ReviewResponse
+
+Base = declarative_base()
+
+class TextReview(Base):
+    __tablename__ = "bench_reviews_text"
+
+    id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, nullable=False)
+    review_text = Column(Text, nullable=False)
+    sentiment = Column(String(8))
+    sentiment_score = Column(Float)
+    key_points = Column(Text)
+    created_at = Column(DateTime)
+    analyzed_at = Column(DateTime)
+
+class JSONReview(Base):
+    __tablename__ = "bench_reviews_json"
+
+    id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, nullable=False)
+    review_text = Column(Text, nullable=False)
+    sentiment = Column(String(8))
+    sentiment_score = Column(Float)
+    key_points = Column(JSONList)
+    created_at = Column(DateTime)
+    analyzed_at = Column(DateTime)
+
+class TextReviewResponse(ReviewResponse):
+    """ReviewResponse with the validator used before key_points was a JSON column"""
+
+    @field_validator('key_points', mode='before')
+    @classmethod
+    def parse_key_points(cls, v):
+        if v is None:
+            return []
+        if isinstance(v, list):
+            return v
+        if isinstance(v, str):
+            if not v:
+                return []
+            try:
+                return json.loads(v)
+            except:
+                return [p.strip() for p in v.split(",") if p.strip()]
+        return v
+
+POINTS = [
+    "battery lasts two days", "slow charger", "bright, sharp screen", "comfortable fit",
+    "camera struggles in low light", "fast shipping", "cheap plastic case", "loud, clear speakers",
+]
+
+def seed(session, count):
+    rng = random.Random(0)
+    start = datetime(2024, 1, 1)
+    rows = []
+    for i in range(count):
+        points = rng.sample(POINTS, rng.randint(2, 5))
+        common = {
+            "id": i + 1,
+            "product_id": rng.randint(1, 20),
+            "review_text": "The battery easily lasts two days, but the charger that ships in the box is painfully slow.",
+            "sentiment": rng.choice(["positive", "negative", "neutral"]),
+            "sentiment_score": rng.random(),
+            "created_at": start + timedelta(minutes=i),
+            "analyzed_at": start + timedelta(minutes=i),
+        }
+        rows.append((TextReview(**common, key_points=",".join(points)), JSONReview(**common, key_points=points), points))
+    session.add_all(r for row in rows for r in row[:2])
+    session.commit()
+    return {i + 1: points for i, (_, _, points) in enumerate(rows)}
+
+def list_reviews(session, model, schema):
+    """Same work as GET /api/reviews: load, validate, serialize. Returns (seconds, payload)"""
+    start = time.perf_counter()
+    rows = session.query(model).order_by(model.created_at.desc()).all()
+    payload = [schema.model_validate(row).model_dump(mode="json") for row in rows]
+    body = json.dumps(payload)
+    elapsed = time.perf_counter() - start
+    session.expunge_all()
+    return elapsed, payload, len(body)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reviews", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--database-url", default="sqlite://", help="scratch database (tables are dropped afterwards)")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        expected = seed(session, args.reviews)
+
+        print("\n" + "=" * 60)
+        print(f"Listing {args.reviews:,} reviews: key_points as text vs JSON ({engine.dialect.name})")
+        print("=" * 60)
+        for label, model, schema in [("text", TextReview, TextReviewResponse), ("json", JSONReview, ReviewResponse)]:
+            list_reviews(session, model, schema)  # warm up
+            samples = []
+            for _ in range(args.runs):
+                seconds, payload, size = list_reviews(session, model, schema)
+                samples.append(seconds * 1000)
+            corrupted = sum(review["key_points"] != expected[review["id"]] for review in payload)
+            print(
+                f"   {label:>5}  p50={statistics.median(samples):8.1f}ms  min={min(samples):8.1f}ms  "
+                f"body={size / 1024:.0f}KB  corrupted={corrupted}"
+            )
+    finally:
+        session.close()
+        Base.metadata.drop_all(engine)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
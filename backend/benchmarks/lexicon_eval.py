@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+Evaluate the lexicon pre-classifier against the sentiment model.
+
+For a range of SENTIMENT_LEXICON_THRESHOLD values, reports the fraction of
+reviews the lexicon would answer on its own (short-circuited) and how often
+those answers agree with the model. Reference labels come from the local
+model, or from the sentiment already stored with each review (--reference db).
+
+    python benchmarks/lexicon_eval.py [--input reviews.txt | --from-db] [--reference model|db]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from onnx_vs_torch import SAMPLE_REVIEWS
+
+THRESHOLDS = [0.6, 0.65, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95]
+
+def load_from_db(limit):
+    """(text, stored sentiment) pairs from the reviews table"""
+    from database import SessionLocal
+    import models
+
+    db = SessionLocal()
+    try:
+        query = db.query(models.Review.review_text, models.Review.sentiment).order_by(models.Review.id)
+        if limit:
+            query = query.limit(limit)
+        return [
+            (text, sentiment.value if hasattr(sentiment, "value") else sentiment)
+            for text, sentiment in query
+        ]
+    finally:
+        db.close()
+
+def model_labels(texts, batch_size):
+    """Labels from the local sentiment model (the path analyze_sentiment escalates to)"""
+    import analysis
+
+    if analysis._load_sentiment_pipeline() is None:
+        raise SystemExit("❌ Local sentiment model failed to load")
+    labels = []
+    for start in range(0, len(texts), batch_size):
+        labels.extend(sentiment for sentiment, _ in analysis.predict_sentiment_batch(texts[start:start + batch_size]))
+    return labels
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--input", help="file with one review per line")
+    source.add_argument("--from-db", action="store_true", help="use review texts from the database")
+    parser.add_argument("--limit", type=int, default=None, help="maximum reviews loaded from the database")
+    parser.add_argument("--reference", choices=["model", "db"], default="model")
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    stored = None
+    if args.from_db or args.reference == "db":
+        rows = load_from_db(args.limit)
+        texts = [text for text, _ in rows]
+        stored = [sentiment for _, sentiment in rows]
+    elif args.input:
+        with open(args.input, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+    else:
+        texts = SAMPLE_REVIEWS
+    if not texts:
+        print("❌ No reviews to evaluate")
+        return 1
+
+    import lexicon
+
+    start = time.perf_counter()
+    predictions = [lexicon.classify(text) for text in texts]
+    lexicon_ms = (time.perf_counter() - start) * 1000 / len(texts)
+
+    reference = stored if args.reference == "db" else model_labels(texts, args.batch_size)
+
+    print("\n" + "=" * 60)
+    print(f"Lexicon pre-classifier vs {args.reference} ({len(texts)} reviews)")
+    print("=" * 60)
+    print(f"   lexicon latency: {lexicon_ms:.3f}ms/review")
+    polar = [(p, r) for p, r in zip(predictions, reference) if p[0] != "neutral"]
+    if polar:
+        agree = sum(p[0] == r for p, r in polar)
+        print(f"   agreement at any confidence: {agree}/{len(polar)} ({agree / len(polar):.1%})")
+        print(f"   median confidence: {statistics.median(p[1] for p, _ in polar):.3f}")
+
+    print(f"\n   {'threshold':>9}  {'short-circuited':>16}  {'agreement':>10}  {'overall':>8}")
+    for threshold in THRESHOLDS:
+        answered = [
+            (sentiment, label) for (sentiment, confidence), label in zip(predictions, reference)
+            if sentiment != "neutral" and confidence >= threshold
+        ]
+        disagreements = sum(sentiment != label for sentiment, label in answered)
+        agreement = f"{1 - disagreements / len(answered):.1%}" if answered else "-"
+        # Escalated reviews get the reference label, so overall agreement only loses the disagreements
+        overall = 1 - disagreements / len(texts)
+        print(
+            f"   {threshold:>9.2f}  {len(answered):>6} ({len(answered) / len(texts):>6.1%})  "
+            f"{agreement:>10}  {overall:>8.1%}"
+        )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
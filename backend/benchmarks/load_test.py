@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+"""
+Load test: /health and GET /api/reviews latency while analyses are in flight.
+
+Fires N concurrent POST /api/analyze-review requests against a running backend
+and keeps probing /health and /api/reviews until they finish. If the analysis
+path blocks the event loop, probe latency grows with the slowest provider call;
+if it is non-blocking, probe latency stays flat.
+
+Run with the backend up:
+    python benchmarks/load_test.py --product-id 1 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+PROBE_PATHS = ["/health", "/api/reviews"]
+
+SAMPLE_REVIEW = (
+    "The battery easily lasts two days and the screen is bright outdoors, "
+    "but the charger that ships in the box is painfully slow."
+)
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of floats"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def summarize(label, samples):
+    """Print p50/p95/max in milliseconds"""
+    ms = [s * 1000 for s in samples]
+    print(
+        f"   {label:<28} n={len(ms):<4} "
+        f"p50={statistics.median(ms):7.1f}ms  "
+        f"p95={percentile(ms, 95):7.1f}ms  "
+        f"max={max(ms):7.1f}ms"
+    )
+
+async def timed_get(client, path):
+    start = time.perf_counter()
+    response = await client.get(path)
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+async def measure_baseline(client, rounds):
+    """Probe latency with no analyses running"""
+    samples = {path: [] for path in PROBE_PATHS}
+    for _ in range(rounds):
+        for path in PROBE_PATHS:
+            samples[path].append(await timed_get(client, path))
+    return samples
+
+async def probe_until(client, done: asyncio.Event, interval):
+    """Probe continuously until every analysis has completed"""
+    samples = {path: [] for path in PROBE_PATHS}
+    while not done.is_set():
+        for path in PROBE_PATHS:
+            samples[path].append(await timed_get(client, path))
+        await asyncio.sleep(interval)
+    return samples
+
+async def run_analyses(client, product_id, concurrency, done: asyncio.Event):
+    """Fire all analyses at once and record their latency and status"""
+    async def one():
+        start = time.perf_counter()
+        response = await client.post(
+            "/api/analyze-review",
+            json={"product_id": product_id, "review_text": SAMPLE_REVIEW},
+        )
+        return response.status_code, time.perf_counter() - start
+
+    try:
+        return await asyncio.gather(*(one() for _ in range(concurrency)))
+    finally:
+        done.set()
+
+async def main_async(args):
+    limits = httpx.Limits(max_connections=args.concurrency + len(PROBE_PATHS) + 2)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        print("\n" + "=" * 60)
+        print("Baseline (no analyses in flight)")
+        print("=" * 60)
+        baseline = await measure_baseline(client, args.baseline_rounds)
+        for path in PROBE_PATHS:
+            summarize(path, baseline[path])
+
+        print("\n" + "=" * 60)
+        print(f"Under load ({args.concurrency} concurrent analyses)")
+        print("=" * 60)
+        done = asyncio.Event()
+        analyses, under_load = await asyncio.gather(
+            run_analyses(client, args.product_id, args.concurrency, done),
+            probe_until(client, done, args.probe_interval),
+        )
+        for path in PROBE_PATHS:
+            summarize(path, under_load[path])
+
+        statuses = [status for status, _ in analyses]
+        summarize("POST /api/analyze-review", [latency for _, latency in analyses])
+        print(f"   analysis status codes: { {s: statuses.count(s) for s in set(statuses)} }")
+
+    # Latency is "flat" if the loaded p95 stays within the allowed factor of the baseline p95,
+    # with an absolute floor so sub-millisecond baselines don't make the check flaky.
+    print("\n" + "=" * 60)
+    print("RESULT")
+    print("=" * 60)
+    passed = True
+    for path in PROBE_PATHS:
+        base_p95 = percentile(baseline[path], 95)
+        load_p95 = percentile(under_load[path], 95) if under_load[path] else 0.0
+        allowed = max(base_p95 * args.max_slowdown, args.min_allowed_ms / 1000)
+        ok = load_p95 <= allowed
+        passed = passed and ok
+        status = "✅ FLAT" if ok else "❌ DEGRADED"
+        print(f"{status} - {path}: p95 {base_p95 * 1000:.1f}ms -> {load_p95 * 1000:.1f}ms (allowed {allowed * 1000:.1f}ms)")
+
+    return 0 if passed else 1
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--product-id", type=int, required=True)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--baseline-rounds", type=int, default=20)
+    parser.add_argument("--probe-interval", type=float, default=0.05, help="seconds between probe rounds")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--max-slowdown", type=float, default=5.0, help="allowed p95 ratio loaded/baseline")
+    parser.add_argument("--min-allowed-ms", type=float, default=100.0, help="absolute p95 allowance floor")
+    args = parser.parse_args()
+    return asyncio.run(main_async(args))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+"""
+Benchmark: torch pipeline vs quantized ONNX Runtime for local sentiment.
+
+Each backend is loaded through analysis._load_sentiment_pipeline in its own
+process, so resident memory is measured in isolation (the ONNX export, if
+needed, runs beforehand in a separate process). Reports load time,
+single-review latency, batched throughput, peak RSS and label agreement.
+
+    python benchmarks/onnx_vs_torch.py [--input reviews.txt] [--batch-size 16]
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+BACKENDS = ["torch", "onnx"]
+
+SAMPLE_REVIEWS = [
+    "Absolutely love this blender, it crushes ice in seconds.",
+    "Broke after two days. Complete waste of money.",
+    "It's fine. Does what it says, nothing more.",
+    "The battery life is outstanding and the screen is gorgeous.",
+    "Customer support never answered my emails about the missing parts.",
+    "Comfortable headphones but the noise cancelling is weaker than advertised.",
+    "Shipping was fast and the packaging was very secure.",
+    "The zipper snapped the first time I used the bag.",
+    "Great value for the price, would buy again.",
+    "Instructions were confusing and two screws were missing from the box.",
+    "My kids use it every day and it still looks brand new after a year.",
+    "Smells like cheap plastic and the color is nothing like the photos.",
+    "Setup took five minutes and the app works flawlessly with my phone.",
+    "The fan is so loud I can't sleep with it on.",
+    "Not bad, but I expected better build quality at this price point.",
+    "This is the best coffee grinder I have ever owned, consistent grind every time.",
+    (
+        "I wanted to like this laptop. The keyboard is pleasant and the screen is sharp, "
+        "but the fans spin up constantly, the battery barely lasts three hours of light browsing, "
+        "and the trackpad randomly stops responding. Support suggested a factory reset, which "
+        "did nothing. After a month of frustration I returned it."
+    ),
+    (
+        "We have been using this vacuum for six months in a house with two dogs. It picks up "
+        "hair from carpet and hardwood without clogging, the bin is easy to empty, and the "
+        "battery comfortably covers the whole ground floor. The attachments are genuinely useful "
+        "and it is light enough to carry upstairs. Highly recommended."
+    ),
+]
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def export_onnx(model):
+    """Runs in a child process: export the ONNX model up front so export cost isn't measured"""
+    from pathlib import Path
+    from database import settings
+    from onnx_sentiment import INT8_FILENAME, export_quantized_model
+    import analysis
+
+    if not (Path(settings.ONNX_MODEL_DIR).expanduser() / INT8_FILENAME).exists():
+        export_quantized_model(model or analysis.SENTIMENT_MODEL_NAME, settings.ONNX_MODEL_DIR)
+
+def measure(backend, texts, batch_size, runs, model, results):
+    """Runs in a child process: load one backend and measure it"""
+    from database import settings
+    settings.SENTIMENT_BACKEND = backend
+    import analysis
+    if model:
+        analysis.SENTIMENT_MODEL_NAME = model
+
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    pipeline = analysis._load_sentiment_pipeline()
+    load_seconds = time.perf_counter() - start
+    if pipeline is None:
+        results.put({"backend": backend, "error": "model failed to load"})
+        return
+
+    pipeline(texts[:1], truncation=True)  # warmup
+
+    latencies = []
+    for _ in range(runs):
+        for text in texts:
+            start = time.perf_counter()
+            pipeline([text], truncation=True)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        outputs = pipeline(texts, truncation=True, batch_size=batch_size)
+    batched_seconds = time.perf_counter() - start
+
+    results.put({
+        "backend": backend,
+        "load_seconds": load_seconds,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "throughput": len(texts) * runs / batched_seconds,
+        "rss_before_mb": rss_before,
+        "peak_rss_mb": peak_rss_mb(),
+        "labels": [output["label"].lower() for output in outputs],
+        "scores": [float(output["score"]) for output in outputs],
+    })
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", help="file with one review per line (default: built-in sample)")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--model", default=None, help="override the model name or path")
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+    else:
+        texts = SAMPLE_REVIEWS
+
+    context = multiprocessing.get_context("spawn")
+    exporter = context.Process(target=export_onnx, args=(args.model,))
+    exporter.start()
+    exporter.join()
+
+    measurements = {}
+    for backend in BACKENDS:
+        results = context.Queue()
+        process = context.Process(target=measure, args=(backend, texts, args.batch_size, args.runs, args.model, results))
+        process.start()
+        measurements[backend] = results.get()
+        process.join()
+
+    print("\n" + "=" * 60)
+    print(f"Local sentiment backends ({len(texts)} reviews x {args.runs} runs)")
+    print("=" * 60)
+    for backend, m in measurements.items():
+        if "error" in m:
+            print(f"❌ {backend}: {m['error']}")
+            continue
+        print(
+            f"   {backend:<6} load={m['load_seconds']:6.2f}s  "
+            f"p50={m['p50_ms']:7.1f}ms  p95={m['p95_ms']:7.1f}ms  "
+            f"throughput={m['throughput']:7.1f}/s  "
+            f"peak RSS={m['peak_rss_mb']:7.1f}MB (+{m['peak_rss_mb'] - m['rss_before_mb']:.1f})"
+        )
+
+    torch_m, onnx_m = measurements["torch"], measurements["onnx"]
+    if "error" in torch_m or "error" in onnx_m:
+        return 1
+
+    agree = sum(a == b for a, b in zip(torch_m["labels"], onnx_m["labels"]))
+    score_diff = statistics.mean(abs(a - b) for a, b in zip(torch_m["scores"], onnx_m["scores"]))
+    print(f"\n   label agreement: {agree}/{len(texts)} ({agree / len(texts):.1%})")
+    print(f"   mean |score difference|: {score_diff:.4f}")
+    print(f"   speedup p50: {torch_m['p50_ms'] / onnx_m['p50_ms']:.2f}x  throughput: {onnx_m['throughput'] / torch_m['throughput']:.2f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
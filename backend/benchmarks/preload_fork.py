@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""
+Benchmark: per-worker memory and first-request latency, lazy vs preloaded model.
+
+Reproduces what gunicorn does with gunicorn.conf.py: a master process
+imports the analysis module (and, in "preload" mode, loads and warms up the
+model via preload_sentiment_model(for_fork=True) followed by gc.freeze()),
+then forks N workers that each serve one review through the local model.
+For each worker it reports first-request latency, RSS, and the memory that
+is really its own (USS) or its proportional share (PSS) - with a shared
+preloaded model, RSS stays high but USS/PSS drop.
+
+    python benchmarks/preload_fork.py [--workers 4] [--model path-or-name]
+
+Linux only (os.fork, /proc smaps).
+"""
+
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+MODES = ["lazy", "preload"]
+
+REVIEW = "The battery easily lasts two days, but the charger that ships in the box is painfully slow."
+
+def memory_mb(pid):
+    import psutil
+
+    info = psutil.Process(pid).memory_full_info()
+    return {"rss": info.rss / 2**20, "uss": info.uss / 2**20, "pss": info.pss / 2**20}
+
+def worker(analysis, write_fd):
+    """Forked worker: serve one review and report latency + memory"""
+    analysis.after_fork()
+    start = time.perf_counter()
+    result = analysis.predict_sentiment_batch([REVIEW])
+    latency = time.perf_counter() - start
+    report = {"latency_ms": latency * 1000, "ok": result[0] != analysis.FALLBACK_SENTIMENT}
+    report.update(memory_mb(os.getpid()))
+    with os.fdopen(write_fd, "w") as pipe:
+        pipe.write(json.dumps(report))
+
+def master(mode, workers, model, results):
+    """Runs in a fresh (spawned) process: optionally preload, then fork workers"""
+    import analysis
+    if model:
+        analysis.SENTIMENT_MODEL_NAME = model
+
+    preload_seconds = None
+    if mode == "preload":
+        start = time.perf_counter()
+        if not analysis.preload_sentiment_model(for_fork=True):
+            results.put({"mode": mode, "error": "model failed to load"})
+            return
+        preload_seconds = time.perf_counter() - start
+        gc.freeze()
+
+    children = []
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            try:
+                worker(analysis, write_fd)
+            finally:
+                os._exit(0)
+        os.close(write_fd)
+        children.append((pid, read_fd))
+
+    reports = []
+    for pid, read_fd in children:
+        with os.fdopen(read_fd) as pipe:
+            report = json.loads(pipe.read() or "{}")
+        os.waitpid(pid, 0)
+        reports.append(report)
+
+    results.put({
+        "mode": mode,
+        "preload_seconds": preload_seconds,
+        "master": memory_mb(os.getpid()),
+        "workers": reports,
+    })
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--model", default=None, help="override the model name or path")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    measurements = []
+    for mode in MODES:
+        results = context.Queue()
+        process = context.Process(target=master, args=(mode, args.workers, args.model, results))
+        process.start()
+        measurements.append(results.get())
+        process.join()
+
+    print("\n" + "=" * 60)
+    print(f"Model preload vs lazy loading ({args.workers} forked workers)")
+    print("=" * 60)
+    for m in measurements:
+        if "error" in m:
+            print(f"❌ {m['mode']}: {m['error']}")
+            continue
+        reports = [r for r in m["workers"] if r.get("ok")]
+        if len(reports) != len(m["workers"]):
+            print(f"❌ {m['mode']}: {len(m['workers']) - len(reports)} workers failed to serve a review")
+        if not reports:
+            continue
+        preload = f"  (master preload {m['preload_seconds']:.1f}s)" if m["preload_seconds"] else ""
+        print(f"\n   {m['mode']}{preload}")
+        print(
+            f"   first request  p50={statistics.median(r['latency_ms'] for r in reports):8.1f}ms  "
+            f"max={max(r['latency_ms'] for r in reports):8.1f}ms"
+        )
+        total_pss = m["master"]["pss"] + sum(r["pss"] for r in reports)
+        print(
+            f"   per worker     RSS={statistics.mean(r['rss'] for r in reports):7.1f}MB  "
+            f"USS={statistics.mean(r['uss'] for r in reports):7.1f}MB  "
+            f"PSS={statistics.mean(r['pss'] for r in reports):7.1f}MB"
+        )
+        print(f"   master + workers total PSS={total_pss:7.1f}MB")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""
+Benchmark: GET /api/reviews page latency by depth, keyset cursor vs OFFSET.
+
+Migrates a scratch database, seeds it with synthetic reviews, then times
+fetching one page at increasing depths two ways: the keyset query the
+endpoint runs (seek past the previous page's (created_at, id) on the
+index) and the same query with OFFSET. Both are timed for the unfiltered
+listing and for one product's reviews.
+
+    python benchmarks/review_pagination.py [--reviews 200000] [--database-url postgresql://...]
+
+The database must be empty; its tables are dropped afterwards.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sqlalchemy import create_engine, inspect, insert, text
+from sqlalchemy.orm import Session
+
+from app import REVIEW_LISTING_ORDER, _reviews_page_query, _reviews_query
+from database import Base
+from db_utils import upgrade_database
+import models
+
+PRODUCTS = 20
+CHUNK = 10_000
+
+def seed(engine, count):
+    rng = random.Random(0)
+    start = datetime(2024, 1, 1)
+    with engine.begin() as connection:
+        connection.execute(insert(models.Product), [
+            {"id": i, "name": f"Product {i}", "created_at": start} for i in range(1, PRODUCTS + 1)
+        ])
+        for chunk_start in range(0, count, CHUNK):
+            connection.execute(insert(models.Review), [
+                {
+                    "product_id": rng.randint(1, PRODUCTS),
+                    "review_text": "The battery easily lasts two days, but the charger is painfully slow.",
+                    "sentiment": rng.choice(list(models.SentimentEnum)),
+                    "sentiment_score": rng.random(),
+                    "key_points": ["battery lasts", "slow charger"],
+                    "created_at": start + timedelta(seconds=rng.randint(0, 365 * 86400)),
+                }
+                for _ in range(chunk_start, min(chunk_start + CHUNK, count))
+            ])
+        connection.execute(text("ANALYZE"))
+
+def time_page(session, make_query, runs):
+    """Median milliseconds to load one page"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        make_query().all()
+        samples.append((time.perf_counter() - start) * 1000)
+        session.expunge_all()
+    return statistics.median(samples)
+
+def run(session, label, product_id, total, depths, args):
+    print(f"\n   {label} ({total:,} reviews, pages of {args.limit})")
+    print(f"   {'depth':>9}  {'keyset':>9}  {'offset':>9}")
+    for depth in sorted(d for d in set(depths) if 0 <= d < total):
+        # Cursor a client would hold after paging down to depth (not timed)
+        after = None
+        if depth:
+            previous = (
+                _reviews_query(session, product_id).order_by(*REVIEW_LISTING_ORDER)
+                .offset(depth - 1).limit(1).one()
+            )
+            after = (previous.created_at, previous.id)
+
+        keyset_ms = time_page(session, lambda: _reviews_page_query(session, product_id, after=after, limit=args.limit), args.runs)
+        offset_ms = time_page(
+            session,
+            lambda: _reviews_query(session, product_id).order_by(*REVIEW_LISTING_ORDER).offset(depth).limit(args.limit),
+            args.runs
+        )
+        print(f"   {depth:>9,}  {keyset_ms:>7.2f}ms  {offset_ms:>7.2f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reviews", type=int, default=200_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--database-url", help="empty scratch database (default: a temporary SQLite file)")
+    args = parser.parse_args()
+
+    scratch_dir = None
+    url = args.database_url
+    if not url:
+        scratch_dir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(scratch_dir.name, 'pagination.db')}"
+    engine = create_engine(url)
+    if inspect(engine).get_table_names():
+        parser.error("--database-url must point at an empty scratch database")
+
+    try:
+        with engine.connect() as connection:
+            upgrade_database(connection)
+            connection.commit()
+        print(f"Seeding {args.reviews:,} reviews ({engine.dialect.name})...")
+        seed(engine, args.reviews)
+
+        print("\n" + "=" * 60)
+        print("Review listing: page latency by depth")
+        print("=" * 60)
+        depths = [0, 1_000, 10_000, 100_000, 1_000_000]
+        with Session(engine) as session:
+            run(session, "all reviews", None, args.reviews, depths + [args.reviews - args.limit], args)
+            per_product = _reviews_query(session, 1).count()
+            run(session, "one product", 1, per_product, depths + [per_product - args.limit], args)
+    finally:
+        Base.metadata.drop_all(engine)
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
+        engine.dispose()
+        if scratch_dir:
+            scratch_dir.cleanup()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
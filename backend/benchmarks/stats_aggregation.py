@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+"""
+Benchmark: GET /api/stats computed in Python, in SQL, and from the rollup.
+
+Migrates a scratch database, seeds it with synthetic reviews, then times
+the statistics of all reviews and of one product: loading every Review and
+looping over them (the original implementation), a GROUP BY sentiment
+aggregate over reviews, and the endpoint itself, which reads the
+product_sentiment_stats rollup (with and without score percentiles, which
+still scan reviews). Peak Python memory is measured in a separate
+tracemalloc run, so tracing doesn't skew timings.
+
+    python benchmarks/stats_aggregation.py [--reviews 1000000] [--database-url postgresql://...]
+
+The database must be empty; its tables are dropped afterwards.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sqlalchemy import create_engine, func, inspect, insert, text
+from sqlalchemy.orm import Session
+
+from app import _reviews_query, get_statistics
+from database import Base
+from db_utils import upgrade_database
+from sentiment_stats import rebuild_stats
+import models
+
+PRODUCTS = 20
+CHUNK = 10_000
+
+def seed(engine, count):
+    rng = random.Random(0)
+    start = datetime(2024, 1, 1)
+    with engine.begin() as connection:
+        connection.execute(insert(models.Product), [
+            {"id": i, "name": f"Product {i}", "created_at": start} for i in range(1, PRODUCTS + 1)
+        ])
+        for chunk_start in range(0, count, CHUNK):
+            connection.execute(insert(models.Review), [
+                {
+                    "product_id": rng.randint(1, PRODUCTS),
+                    "review_text": "The battery easily lasts two days, but the charger is painfully slow.",
+                    "sentiment": rng.choice(list(models.SentimentEnum)),
+                    "sentiment_score": rng.random(),
+                    "key_points": ["battery lasts", "slow charger"],
+                    "created_at": start + timedelta(seconds=rng.randint(0, 365 * 86400)),
+                }
+                for _ in range(chunk_start, min(chunk_start + CHUNK, count))
+            ])
+    with Session(engine) as session:
+        rebuild_stats(session)
+        session.commit()
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE"))
+
+def python_statistics(db, product_id=None):
+    """GET /api/stats before the aggregation moved into SQL"""
+    reviews = _reviews_query(db, product_id).all()
+    if not reviews:
+        return {"total_reviews": 0, "sentiment_distribution": {}, "average_sentiment_score": 0}
+    sentiment_count = {"positive": 0, "negative": 0, "neutral": 0}
+    total_score = 0
+    count_with_score = 0
+    for review in reviews:
+        if review.sentiment:
+            sentiment_count[review.sentiment] += 1
+        if review.sentiment_score:
+            total_score += review.sentiment_score
+            count_with_score += 1
+    return {
+        "total_reviews": len(reviews),
+        "sentiment_distribution": sentiment_count,
+        "average_sentiment_score": total_score / count_with_score if count_with_score > 0 else 0
+    }
+
+def group_by_statistics(db, product_id=None):
+    """GET /api/stats as one GROUP BY sentiment query over reviews, before the rollup"""
+    score = func.nullif(models.Review.sentiment_score, 0)
+    rows = (
+        _reviews_query(db, product_id)
+        .with_entities(models.Review.sentiment, func.count(), func.count(score), func.sum(score))
+        .group_by(models.Review.sentiment)
+        .all()
+    )
+    total = sum(count for _, count, _, _ in rows)
+    scored = sum(count for _, _, count, _ in rows)
+    if not total:
+        return {"total_reviews": 0, "sentiment_distribution": {}, "average_sentiment_score": 0}
+    sentiment_count = {"positive": 0, "negative": 0, "neutral": 0}
+    for sentiment, count, _, _ in rows:
+        if sentiment:
+            sentiment_count[sentiment.value] += count
+    score_sum = sum(total_score or 0 for _, _, _, total_score in rows)
+    return {
+        "total_reviews": total,
+        "sentiment_distribution": sentiment_count,
+        "average_sentiment_score": score_sum / scored if scored > 0 else 0
+    }
+
+def measure(engine, compute, runs):
+    """(median ms, peak traced MB) of compute(session) in fresh sessions"""
+    samples = []
+    for _ in range(runs):
+        with Session(engine) as session:
+            start = time.perf_counter()
+            compute(session)
+            samples.append((time.perf_counter() - start) * 1000)
+    with Session(engine) as session:
+        tracemalloc.start()
+        compute(session)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return statistics.median(samples), peak / 2**20
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reviews", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--database-url", help="empty scratch database (default: a temporary SQLite file)")
+    args = parser.parse_args()
+
+    scratch_dir = None
+    url = args.database_url
+    if not url:
+        scratch_dir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(scratch_dir.name, 'stats.db')}"
+    engine = create_engine(url)
+    if inspect(engine).get_table_names():
+        parser.error("--database-url must point at an empty scratch database")
+
+    try:
+        with engine.connect() as connection:
+            upgrade_database(connection)
+            connection.commit()
+        print(f"Seeding {args.reviews:,} reviews ({engine.dialect.name})...")
+        seed(engine, args.reviews)
+
+        print("\n" + "=" * 60)
+        print(f"Review statistics over {args.reviews:,} reviews")
+        print("=" * 60)
+        print(f"   {'':>16}  {'method':>20}  {'p50':>10}  {'peak memory':>11}")
+        for label, product_id in [("all reviews", None), ("one product", 1)]:
+            methods = [
+                ("python loop", lambda db: python_statistics(db, product_id)),
+                ("sql group by", lambda db: group_by_statistics(db, product_id)),
+                ("rollup", lambda db: get_statistics(product_id, False, db)),
+                ("rollup + percentiles", lambda db: get_statistics(product_id, True, db)),
+            ]
+            expected = None
+            for name, compute in methods:
+                milliseconds, peak_mb = measure(engine, compute, args.runs)
+                with Session(engine) as session:
+                    result = compute(session)
+                expected = expected or result
+                assert result["total_reviews"] == expected["total_reviews"]
+                assert result["sentiment_distribution"] == expected["sentiment_distribution"]
+                print(f"   {label:>16}  {name:>20}  {milliseconds:>8.1f}ms  {peak_mb:>9.1f}MB")
+    finally:
+        Base.metadata.drop_all(engine)
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
+        engine.dispose()
+        if scratch_dir:
+            scratch_dir.cleanup()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,8 +2,10 @@
 Cache management for API responses
 """
 from typing import Any, Optional, Dict
+from collections import OrderedDict
 from datetime import datetime, timedelta
 import json
+import threading
 
 class CacheEntry:
     def __init__(self, data: Any, ttl_seconds: int = 300):
@@ -53,5 +55,37 @@ class APICache:
             del self._cache[key]
         return len(expired_keys)
 
+class LRUCache:
+    """Bounded, thread-safe least-recently-used cache"""
+    
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Get value and mark it most recently used"""
+        with self._lock:
+            if key not in self._cache:
+                return None
+            self._cache.move_to_end(key)
+            return self._cache[key]
+    
+    def set(self, key: str, data: Any) -> None:
+        """Set value, evicting the least recently used entry when full"""
+        with self._lock:
+            self._cache[key] = data
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Clear entire cache"""
+        with self._lock:
+            self._cache.clear()
+    
+    def __len__(self) -> int:
+        return len(self._cache)
+
 # Global cache instance
 cache = APICache()
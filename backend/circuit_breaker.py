@@ -0,0 +1,144 @@
+"""
+Circuit breaker for remote analysis providers
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class CircuitState:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker over a rolling window of calls.
+
+    Closed: calls go through and their outcome and latency are recorded. Once
+    the window holds `min_requests` calls and either the error rate reaches
+    `error_rate_threshold` or the p95 latency reaches `slow_call_seconds`, the
+    breaker opens and callers are routed to their fallback. After
+    `open_seconds` it goes half-open and runs a single `probe` in the
+    background; success closes it, failure re-opens it. Callers never wait for
+    the probe.
+
+    Calls the caller gave up on (cancelled by a hedge or deadline) are
+    recorded as abandoned: they count as failures, and their elapsed time is
+    a latency sample too, since the call would have taken at least that long.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        probe: Callable[[], Awaitable[bool]],
+        window_seconds: float = 60.0,
+        min_requests: int = 10,
+        error_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 5.0,
+        open_seconds: float = 30.0
+    ):
+        self.name = name
+        self.probe = probe
+        self.window_seconds = window_seconds
+        self.min_requests = min_requests
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+
+        self.state = CircuitState.CLOSED
+        self._calls: deque = deque()  # (timestamp, success, latency, abandoned)
+        self._opened_at: Optional[float] = None
+        self._probe_task: Optional[asyncio.Task] = None
+        self._transitions = 0
+        self._rejected = 0
+
+    def allow_request(self) -> bool:
+        """True if the provider should be called; schedules the half-open probe when due"""
+        if self.state == CircuitState.CLOSED:
+            return True
+        if self.state == CircuitState.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._transition(CircuitState.HALF_OPEN)
+            self._probe_task = asyncio.get_running_loop().create_task(self._run_probe())
+        self._rejected += 1
+        return False
+
+    def record(self, success: bool, latency: float, abandoned: bool = False) -> None:
+        """Record one call made while closed and open the breaker if the window is unhealthy"""
+        now = time.monotonic()
+        self._calls.append((now, success and not abandoned, latency, abandoned))
+        self._prune(now)
+        if self.state == CircuitState.CLOSED and self._unhealthy():
+            self._open()
+
+    def latency_percentile(self, pct: float) -> Optional[float]:
+        """Latency percentile of successful and abandoned calls in the window (None if there are none)"""
+        self._prune(time.monotonic())
+        latencies = sorted(latency for _, success, latency, abandoned in self._calls if success or abandoned)
+        if not latencies:
+            return None
+        index = max(0, min(len(latencies) - 1, round(pct / 100 * len(latencies)) - 1))
+        return latencies[index]
+
+    def _unhealthy(self) -> bool:
+        if len(self._calls) < self.min_requests:
+            return False
+        errors = sum(1 for _, success, _, _ in self._calls if not success)
+        if errors / len(self._calls) >= self.error_rate_threshold:
+            return True
+        latencies = sorted(latency for _, _, latency, _ in self._calls)
+        p95 = latencies[max(0, round(0.95 * len(latencies)) - 1)]
+        return p95 >= self.slow_call_seconds
+
+    def _prune(self, now: float) -> None:
+        while self._calls and now - self._calls[0][0] > self.window_seconds:
+            self._calls.popleft()
+
+    def _open(self) -> None:
+        self._opened_at = time.monotonic()
+        self._transition(CircuitState.OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state != self.state:
+            logger.warning(f"⚠️  {self.name} circuit breaker: {self.state} -> {state}")
+            self.state = state
+            self._transitions += 1
+
+    async def _run_probe(self) -> None:
+        start = time.monotonic()
+        try:
+            success = bool(await self.probe())
+        except Exception as e:
+            logger.warning(f"⚠️  {self.name} probe failed: {e}")
+            success = False
+        latency = time.monotonic() - start
+
+        if success and latency < self.slow_call_seconds:
+            # Start the closed state with a clean window
+            self._calls.clear()
+            self._transition(CircuitState.CLOSED)
+        else:
+            self._open()
+
+    def snapshot(self) -> Dict:
+        """Breaker state for monitoring"""
+        self._prune(time.monotonic())
+        calls = len(self._calls)
+        errors = sum(1 for _, success, _, _ in self._calls if not success)
+        p95 = self.latency_percentile(95)
+        return {
+            "state": self.state,
+            "window_calls": calls,
+            "window_error_rate": errors / calls if calls else 0,
+            "window_abandoned_calls": sum(1 for call in self._calls if call[3]),
+            "window_p95_latency_ms": p95 * 1000 if p95 is not None else None,
+            "rejected_calls": self._rejected,
+            "transitions": self._transitions,
+            "seconds_until_probe": (
+                max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+                if self.state == CircuitState.OPEN else None
+            ),
+        }
@@ -10,6 +10,43 @@ class Settings(BaseSettings):
     HUGGINGFACE_API_URL: str = "https://api-inference.huggingface.co/models/distilbert-base-uncased-finetuned-sst-2-english"
     GEMINI_API_KEY: str = ""
     GEMINI_API_URL: str = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
+    HTTP_TIMEOUT_SECONDS: float = 30.0
+    HTTP_POOL_MAX_CONNECTIONS: int = 100  # In-flight provider requests, all hosts
+    HTTP_POOL_MAX_CONNECTIONS_PER_HOST: int = 20
+    HTTP_POOL_MAX_KEEPALIVE_PER_HOST: int = 20  # Keep equal to per-host cap to avoid churn
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    BREAKER_WINDOW_SECONDS: float = 60.0  # Rolling window for provider health
+    BREAKER_MIN_REQUESTS: int = 10  # Calls in window before the breaker can open
+    BREAKER_ERROR_RATE: float = 0.5
+    BREAKER_SLOW_CALL_SECONDS: float = 5.0  # Open when window p95 latency reaches this
+    BREAKER_OPEN_SECONDS: float = 30.0  # Time before a half-open probe
+    INFERENCE_MAX_WORKERS: int = 2  # Threads for local model inference
+    SENTIMENT_BACKEND: str = "torch"  # Local model backend: "torch" or "onnx" (int8 quantized)
+    PRELOAD_MODEL: bool = False  # Load + warm up the local model at startup (in the gunicorn master)
+    ONNX_MODEL_DIR: str = "~/.cache/huggingface/onnx/distilbert-sst2"
+    ONNX_NUM_THREADS: int = 0  # 0 = ONNX Runtime default
+    SENTIMENT_BATCH_MAX_SIZE: int = 16
+    SENTIMENT_BATCH_MAX_WAIT_MS: float = 10.0
+    SENTIMENT_WINDOW_OVERLAP_TOKENS: int = 64  # Overlap between long-review windows
+    SENTIMENT_HEDGE_ENABLED: bool = False  # Race local inference against a slow HF API call
+    SENTIMENT_HEDGE_PERCENTILE: float = 95  # Hedge after this percentile of recent HF latency
+    SENTIMENT_HEDGE_MIN_DELAY_MS: float = 50
+    SENTIMENT_HEDGE_MAX_DELAY_MS: float = 2000  # Also used until latency samples exist
+    SENTIMENT_LEXICON_THRESHOLD: float = 0  # Lexicon confidence to skip the model (0 = disabled)
+    KEY_POINTS_DEADLINE_SECONDS: float = 0  # 0 = wait for key points
+    DEDUP_SIMILARITY_THRESHOLD: float = 0.7  # Word-bigram Jaccard to reuse a stored review's key points (0 = disabled)
+    EMBEDDINGS_ENABLED: bool = False  # Embed reviews on save for similarity search
+    EMBEDDING_MODEL_NAME: str = "sentence-transformers/all-MiniLM-L6-v2"
+    EMBEDDINGS_DIR: str = "~/.cache/product-review-analyzer/embeddings"  # Memory-mapped index snapshots
+    EMBEDDING_SEARCH_NPROBE: int = 16  # IVF clusters scanned per query (large snapshots only)
+    EMBEDDING_REFRESH_SECONDS: float = 5.0  # How often workers pick up reviews saved elsewhere
+    EMBEDDING_TAIL_MAX_REVIEWS: int = 20000  # Reviews held in memory past the snapshot before writing a new one
+    ANALYSIS_CACHE_MAX_ENTRIES: int = 10000  # In-memory LRU tier
+    ANALYSIS_CACHE_PERSIST: bool = True  # Database tier (analysis_results)
+    KEY_POINTS_BACKEND: str = "gemini"  # "gemini" or "local" (in-process key phrase extraction)
+    GEMINI_BATCH_TOKEN_BUDGET: int = 8000  # Estimated input tokens per batched request
+    GEMINI_BATCH_MAX_REVIEWS: int = 50
+    RUN_MIGRATIONS_ON_STARTUP: bool = True  # alembic upgrade head at startup (else only check)
     DEBUG: bool = True
     BACKEND_PORT: int = 8000
     BACKEND_HOST: str = "0.0.0.0"
@@ -2,9 +2,59 @@
 Database utility functions
 """
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import Session
 from sqlalchemy.pool import StaticPool
-from typing import Optional
+from typing import Dict, List, Optional, Sequence, Tuple
+import os
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+
+# Set once this process has upgraded DATABASE_URL; workers forked afterwards inherit it
+_database_upgraded = False
+
+def enum_value(value) -> Optional[str]:
+    """Value of an enum member, or the value itself if it is already plain"""
+    return value.value if hasattr(value, "value") else value
+
+def increment_counters(
+    db: Session,
+    model,
+    rows: List[Dict],
+    keys: Sequence[str],
+    counters: Sequence[str],
+    replace: Sequence[str] = ()
+) -> None:
+    """
+    Upsert rows into model's table: the counters of rows are added to the
+    existing row with the same keys, replace columns are overwritten, other
+    columns are only written when the row is inserted. Rows should come in
+    a consistent order so concurrent transactions lock them alike.
+    """
+    table = model.__table__
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        statement = upsert(table).values(rows)
+        updates = {column: table.c[column] + statement.excluded[column] for column in counters}
+        updates.update({column: statement.excluded[column] for column in replace})
+        db.execute(statement.on_conflict_do_update(index_elements=[table.c[key] for key in keys], set_=updates))
+        return
+
+    # Other databases: read-modify-write under row locks
+    for row in rows:
+        existing = db.query(model).filter_by(**{key: row[key] for key in keys}).with_for_update().first()
+        if existing is None:
+            db.add(model(**row))
+            continue
+        for column in counters:
+            setattr(existing, column, getattr(existing, column) + row[column])
+        for column in replace:
+            setattr(existing, column, row[column])
 
 def execute_raw_query(db: Session, query: str, params: Optional[dict] = None) -> list:
     """Execute a raw SQL query"""
@@ -44,3 +94,34 @@ def reset_table_sequence(db: Session, table_name: str, column_name: str = "id")
         db.commit()
     except Exception as e:
         print(f"Error resetting sequence: {str(e)}")
+
+def _alembic_config(connection: Optional[Connection] = None):
+    from alembic.config import Config
+
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(os.path.dirname(ALEMBIC_INI), "migrations"))
+    config.attributes["configure_logger"] = False
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+def upgrade_database(connection: Optional[Connection] = None) -> None:
+    """Apply pending migrations (alembic upgrade head) to DATABASE_URL or the given connection"""
+    global _database_upgraded
+    from alembic import command
+
+    command.upgrade(_alembic_config(connection), "head")
+    if connection is None:
+        _database_upgraded = True
+
+def database_upgraded() -> bool:
+    """True if this process (or the gunicorn master it was forked from) upgraded DATABASE_URL"""
+    return _database_upgraded
+
+def schema_revision(connection: Connection) -> Tuple[Optional[str], str]:
+    """(current, head) migration revisions of the database"""
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    head = ScriptDirectory.from_config(_alembic_config()).get_current_head()
+    return MigrationContext.configure(connection).get_current_revision(), head
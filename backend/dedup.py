@@ -0,0 +1,185 @@
+"""
+Near-duplicate review detection with MinHash and LSH banding
+
+Reviews are compared by Jaccard similarity of their word-bigram sets, so
+copy-pasted and lightly edited reviews (spam campaigns, the same review
+posted on several products) score high while unrelated reviews score close
+to 0. Each review gets a MinHash signature; the index splits signatures
+into bands and only compares reviews that agree exactly on at least one
+band. With 16 bands of 4 rows, pairs at Jaccard 0.7 become candidates
+~99% of the time and unrelated pairs almost never. The best candidate is
+then checked against the exact Jaccard of the two texts.
+"""
+import hashlib
+import logging
+import random
+import re
+import struct
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from analysis_cache import normalize_review_text
+from database import SessionLocal
+import models
+
+logger = logging.getLogger(__name__)
+
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+# Below this many words there are too few bigrams to call two reviews duplicates
+MIN_TOKENS = 8
+# Signature estimates are noisy (~0.06 std. dev. at 64 permutations); candidates
+# this far below the threshold are still returned for exact verification
+ESTIMATE_MARGIN = 0.1
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# Fixed seed: signatures are stored, so the permutations must never change
+_rng = random.Random(20240601)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+_SIGNATURE_FORMAT = f"<{NUM_PERMUTATIONS}I"
+
+_WORD_RE = re.compile(r"\w+")
+
+def shingles(text: str) -> Set[str]:
+    """Word bigrams of the normalized text (empty for texts too short to compare)"""
+    words = _WORD_RE.findall(normalize_review_text(text))
+    if len(words) < MIN_TOKENS:
+        return set()
+    return {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+def jaccard(a: str, b: str) -> float:
+    """Exact Jaccard similarity of two texts' shingle sets"""
+    shingles_a, shingles_b = shingles(a), shingles(b)
+    if not shingles_a or not shingles_b:
+        return 0.0
+    return len(shingles_a & shingles_b) / len(shingles_a | shingles_b)
+
+def signature(text: str) -> Optional[bytes]:
+    """MinHash signature of the text, packed for storage (None if too short)"""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for shingle in shingles(text)
+    ]
+    if not hashes:
+        return None
+    return struct.pack(_SIGNATURE_FORMAT, *(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes) & _MAX_HASH
+        for a, b in _PERMUTATIONS
+    ))
+
+def estimated_similarity(a: bytes, b: bytes) -> float:
+    """Jaccard estimate from two signatures: fraction of equal MinHash values"""
+    values_a = struct.unpack(_SIGNATURE_FORMAT, a)
+    values_b = struct.unpack(_SIGNATURE_FORMAT, b)
+    return sum(x == y for x, y in zip(values_a, values_b)) / NUM_PERMUTATIONS
+
+def _band_keys(sig: bytes) -> List[int]:
+    width = ROWS_PER_BAND * 4
+    return [hash(sig[band * width:(band + 1) * width]) for band in range(BANDS)]
+
+class NearDuplicateIndex:
+    """
+    In-memory MinHash/LSH index of stored reviews (review id -> signature).
+    Built from the review_fingerprints table at startup and extended as
+    reviews are saved; lookups miss until the initial load has finished.
+    Reviews with a degraded analysis are left out, since it isn't reused.
+    """
+
+    def __init__(self, threshold: float = 0.7):
+        self.threshold = threshold
+        self._signatures: Dict[int, bytes] = {}
+        self._buckets: List[Dict[int, List[int]]] = [defaultdict(list) for _ in range(BANDS)]
+        self._lock = threading.Lock()
+        self.loaded = False
+        self._lookups = 0
+        self._hits = 0
+        self._candidates_checked = 0
+
+    def add(self, review_id: int, sig: Optional[bytes]) -> None:
+        if sig is None:
+            return
+        with self._lock:
+            self._add(self._signatures, self._buckets, review_id, sig)
+
+    @staticmethod
+    def _add(signatures: Dict[int, bytes], buckets: List[Dict[int, List[int]]],
+             review_id: int, sig: bytes) -> None:
+        if review_id in signatures:
+            return
+        signatures[review_id] = sig
+        for band_buckets, key in zip(buckets, _band_keys(sig)):
+            band_buckets[key].append(review_id)
+
+    def load(self, rows: Iterable[Tuple[int, bytes]]) -> None:
+        """
+        Replace the index contents with (review_id, signature) rows. The new
+        index is built aside; reviews added meanwhile are carried over.
+        """
+        signatures: Dict[int, bytes] = {}
+        buckets: List[Dict[int, List[int]]] = [defaultdict(list) for _ in range(BANDS)]
+        for review_id, sig in rows:
+            self._add(signatures, buckets, review_id, sig)
+        with self._lock:
+            for review_id, sig in self._signatures.items():
+                self._add(signatures, buckets, review_id, sig)
+            self._signatures, self._buckets = signatures, buckets
+            self.loaded = True
+        logger.info(f"✓ Near-duplicate index loaded ({len(signatures)} reviews)")
+
+    def load_from_db(self, chunk_size: int = 10000) -> None:
+        """(Re)load the index from the review_fingerprints table"""
+        db = SessionLocal()
+        try:
+            rows = (
+                db.query(models.ReviewFingerprint.review_id, models.ReviewFingerprint.minhash)
+                .join(models.Review, models.Review.id == models.ReviewFingerprint.review_id)
+                .filter(models.Review.analysis_degraded.is_(False))
+                .yield_per(chunk_size)
+            )
+            self.load((review_id, bytes(sig)) for review_id, sig in rows)
+        except Exception as e:
+            logger.error(f"❌ Failed to load near-duplicate index: {e}")
+        finally:
+            db.close()
+
+    def find(self, sig: Optional[bytes]) -> Optional[Tuple[int, float]]:
+        """
+        Indexed review with the highest estimated similarity, if within
+        ESTIMATE_MARGIN of the threshold: (review_id, estimate). Callers
+        confirm with jaccard().
+        """
+        if sig is None or not self.loaded:
+            return None
+        self._lookups += 1
+        with self._lock:
+            candidates = set()
+            for band_buckets, key in zip(self._buckets, _band_keys(sig)):
+                candidates.update(band_buckets.get(key, ()))
+            signatures = [(review_id, self._signatures[review_id]) for review_id in candidates]
+        self._candidates_checked += len(signatures)
+
+        best = None
+        for review_id, other in signatures:
+            score = estimated_similarity(sig, other)
+            if score >= self.threshold - ESTIMATE_MARGIN and (best is None or score > best[1]):
+                best = (review_id, score)
+        return best
+
+    def record_hit(self) -> None:
+        self._hits += 1
+
+    def metrics(self) -> Dict:
+        return {
+            "loaded": self.loaded,
+            "indexed_reviews": len(self._signatures),
+            "threshold": self.threshold,
+            "lookups": self._lookups,
+            "hits": self._hits,
+            "avg_candidates_per_lookup": self._candidates_checked / self._lookups if self._lookups else 0,
+        }
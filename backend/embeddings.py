@@ -0,0 +1,463 @@
+"""
+Review embeddings and similarity search
+
+Reviews are embedded with a small sentence-transformer (mean pooling, L2
+normalized, so cosine similarity is a dot product) and stored as float16 in
+the review_embeddings table. Searches run over a memory-mapped snapshot of
+that table, written by `python manage.py rebuild-embedding-index`, plus an
+in-memory tail of the reviews saved since. Once the tail reaches
+max_tail reviews, a worker writes a new snapshot in the background (one
+worker at a time) and every worker switches to it. Snapshots of IVF_MIN_VECTORS or
+more are partitioned into k-means clusters (an IVF index, stored in cluster
+order) and a query only scans the nprobe clusters nearest to it; smaller
+snapshots are scanned in full. Every worker maps the same files, so the OS
+page cache holds one copy of the vectors.
+"""
+import contextlib
+import fcntl
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import func
+
+from database import settings, SessionLocal
+import models
+
+logger = logging.getLogger(__name__)
+
+MAX_TOKENS = 256
+# Below this many vectors a full scan is fast enough and IVF only costs recall
+IVF_MIN_VECTORS = 50_000
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_PER_CLUSTER = 64
+# Rows converted to float32 at a time while scanning
+SCAN_CHUNK_ROWS = 65_536
+
+CURRENT_FILENAME = "CURRENT"
+# Held while a snapshot is written, so workers and manage.py don't write one at the same time
+LOCK_FILENAME = "snapshot.lock"
+TAIL_INITIAL_CAPACITY = 1024
+
+_tokenizer = None
+_model = None
+_model_lock = threading.Lock()
+
+def _load_model():
+    global _tokenizer, _model
+
+    with _model_lock:
+        if _model is None:
+            logger.info(f"🔄 Loading embedding model {settings.EMBEDDING_MODEL_NAME}...")
+            from transformers import AutoModel, AutoTokenizer
+
+            _tokenizer = AutoTokenizer.from_pretrained(settings.EMBEDDING_MODEL_NAME)
+            model = AutoModel.from_pretrained(settings.EMBEDDING_MODEL_NAME)
+            model.eval()
+            _model = model
+            logger.info("✅ Embedding model loaded")
+    return _tokenizer, _model
+
+def embed_texts(texts: List[str]) -> np.ndarray:
+    """
+    Unit-length embeddings, shape (len(texts), dim), float32.
+    Blocking (CPU-bound) - run it on the inference executor.
+    """
+    import torch
+
+    tokenizer, model = _load_model()
+    batch = tokenizer(texts, padding=True, truncation=True, max_length=MAX_TOKENS, return_tensors="pt")
+    with torch.inference_mode():
+        hidden = model(**batch).last_hidden_state
+    mask = batch["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+    pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+    return torch.nn.functional.normalize(pooled, dim=1).numpy().astype(np.float32)
+
+def to_blob(vector: np.ndarray) -> bytes:
+    """Pack an embedding for storage (little-endian float16)"""
+    return np.asarray(vector, dtype="<f2").tobytes()
+
+def from_blob(blob: bytes) -> np.ndarray:
+    return np.frombuffer(blob, dtype="<f2")
+
+def _top_k(scores: np.ndarray, ids: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    if len(scores) > k:
+        keep = np.argpartition(-scores, k)[:k]
+        scores, ids = scores[keep], ids[keep]
+    return scores, ids
+
+def _scan(vectors: np.ndarray, ids: np.ndarray, query: np.ndarray, k: int,
+          start: int = 0, stop: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Best k (scores, ids) among rows [start, stop), converted to float32 chunk by chunk"""
+    stop = len(vectors) if stop is None else stop
+    best_scores, best_ids = [np.empty(0, np.float32)], [np.empty(0, np.int64)]
+    for chunk_start in range(start, stop, SCAN_CHUNK_ROWS):
+        chunk_stop = min(chunk_start + SCAN_CHUNK_ROWS, stop)
+        scores = vectors[chunk_start:chunk_stop].astype(np.float32) @ query
+        scores, chunk_ids = _top_k(scores, ids[chunk_start:chunk_stop], k)
+        best_scores.append(scores)
+        best_ids.append(chunk_ids)
+    return _top_k(np.concatenate(best_scores), np.concatenate(best_ids), k)
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Nearest centroid (by dot product) of each row"""
+    labels = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), SCAN_CHUNK_ROWS // 4):
+        chunk = vectors[start:start + SCAN_CHUNK_ROWS // 4].astype(np.float32)
+        labels[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return labels
+
+def _train_centroids(vectors: np.ndarray, nlist: int, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on a sample of the vectors"""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), nlist * KMEANS_SAMPLE_PER_CLUSTER)
+    sample = vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))].astype(np.float32)
+    centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        labels = _assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        # Empty clusters keep their previous centroid
+        centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+    return centroids
+
+def write_snapshot(directory: str, rows: Iterable[Tuple[int, bytes]], count: int, dim: int) -> Dict:
+    """
+    Write a new snapshot of (review_id, embedding blob) rows - at most count -
+    and make it current. Workers pick it up on their next refresh; older
+    snapshots are removed (open memory maps of them stay valid).
+    """
+    root = Path(directory).expanduser()
+    name = f"snapshot-{time.time_ns()}"
+    path = root / name
+    path.mkdir(parents=True)
+
+    raw = np.lib.format.open_memmap(path / "raw.npy", mode="w+", dtype="<f2", shape=(max(count, 1), dim))
+    ids = np.empty(count, dtype=np.int64)
+    n = 0
+    for review_id, blob in rows:
+        if n == count:
+            break
+        raw[n] = from_blob(blob)
+        ids[n] = review_id
+        n += 1
+    raw.flush()
+    ids = ids[:n]
+
+    meta = {
+        "model": settings.EMBEDDING_MODEL_NAME,
+        "dim": dim,
+        "count": n,
+        "max_review_id": int(ids.max()) if n else 0,
+        "nlist": 0,
+    }
+    if n >= IVF_MIN_VECTORS:
+        nlist = int(np.sqrt(n))
+        centroids = _train_centroids(raw[:n], nlist)
+        labels = _assign(raw[:n], centroids)
+        order = np.argsort(labels, kind="stable")
+        vectors = np.lib.format.open_memmap(path / "vectors.npy", mode="w+", dtype="<f2", shape=(n, dim))
+        for start in range(0, n, SCAN_CHUNK_ROWS):
+            vectors[start:start + SCAN_CHUNK_ROWS] = raw[order[start:start + SCAN_CHUNK_ROWS]]
+        vectors.flush()
+        del vectors, raw
+        os.remove(path / "raw.npy")
+        ids = ids[order]
+        offsets = np.searchsorted(labels[order], np.arange(nlist + 1)).astype(np.int64)
+        np.save(path / "centroids.npy", centroids)
+        np.save(path / "offsets.npy", offsets)
+        meta["nlist"] = nlist
+    else:
+        del raw
+        if n == 0:
+            os.remove(path / "raw.npy")
+            np.save(path / "vectors.npy", np.empty((0, dim), dtype="<f2"))
+        else:
+            os.replace(path / "raw.npy", path / "vectors.npy")
+    np.save(path / "ids.npy", ids)
+    (path / "meta.json").write_text(json.dumps(meta))
+
+    pointer = root / f"{CURRENT_FILENAME}.tmp"
+    pointer.write_text(name)
+    os.replace(pointer, root / CURRENT_FILENAME)
+    for old in root.glob("snapshot-*"):
+        if old.name != name:
+            shutil.rmtree(old, ignore_errors=True)
+    return meta
+
+@contextlib.contextmanager
+def snapshot_lock(directory: str):
+    """Exclusive lock on writing snapshots in directory, across processes (waits for it)"""
+    root = Path(directory).expanduser()
+    root.mkdir(parents=True, exist_ok=True)
+    with open(root / LOCK_FILENAME, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def write_snapshot_from_db(directory: str) -> Optional[Dict]:
+    """
+    Write a snapshot of every stored review embedding (caller holds
+    snapshot_lock). Returns its meta, or None if there are no embeddings.
+    """
+    db = SessionLocal()
+    try:
+        count = db.query(func.count(models.ReviewEmbedding.review_id)).scalar()
+        if not count:
+            return None
+        dim = len(from_blob(db.query(models.ReviewEmbedding.vector).limit(1).scalar()))
+        rows = (
+            db.query(models.ReviewEmbedding.review_id, models.ReviewEmbedding.vector)
+            .order_by(models.ReviewEmbedding.review_id)
+            .yield_per(10000)
+        )
+        return write_snapshot(directory, ((review_id, bytes(vector)) for review_id, vector in rows), count, dim)
+    finally:
+        db.close()
+
+class _Snapshot:
+    """A memory-mapped snapshot directory written by write_snapshot()"""
+
+    def __init__(self, path: Path):
+        self.name = path.name
+        self.meta = json.loads((path / "meta.json").read_text())
+        self.vectors = np.load(path / "vectors.npy", mmap_mode="r")
+        self.ids = np.load(path / "ids.npy", mmap_mode="r")
+        self.centroids = self.offsets = None
+        if self.meta["nlist"]:
+            self.centroids = np.load(path / "centroids.npy")
+            self.offsets = np.load(path / "offsets.npy")
+
+    def search(self, query: np.ndarray, k: int, nprobe: int) -> Tuple[np.ndarray, np.ndarray]:
+        if self.centroids is None:
+            return _scan(self.vectors, self.ids, query, k)
+        probes = np.argsort(-(self.centroids @ query))[:nprobe]
+        best_scores, best_ids = [], []
+        for cluster in probes:
+            scores, ids = _scan(self.vectors, self.ids, query, k, self.offsets[cluster], self.offsets[cluster + 1])
+            best_scores.append(scores)
+            best_ids.append(ids)
+        return _top_k(np.concatenate(best_scores), np.concatenate(best_ids), k)
+
+class EmbeddingIndex:
+    """
+    Similarity search over stored review embeddings: the current snapshot
+    plus reviews embedded since (added by this worker, or picked up from the
+    review_embeddings table every refresh_seconds). Searches return nothing
+    until load_from_db() has run.
+
+    The tail is an append-only buffer that doubles when full, so adding a
+    review never copies it and searches scan it in place. At max_tail
+    reviews it stops growing from the database and a new snapshot is
+    written in the background; reviews past it are searchable again once
+    the worker has switched to that snapshot.
+    """
+
+    def __init__(self, directory: str, nprobe: int = 16, refresh_seconds: float = 5.0, max_tail: int = 20_000):
+        self.directory = Path(directory).expanduser()
+        self.nprobe = nprobe
+        self.refresh_seconds = refresh_seconds
+        self.max_tail = max(1, max_tail)
+        self._snapshot: Optional[_Snapshot] = None
+        self._snapshot_name: Optional[str] = None  # CURRENT at the last load, even if it couldn't be opened
+        self._tail_vectors: Optional[np.ndarray] = None  # (capacity, dim) float16, rows [0, _tail_size) used
+        self._tail_ids = np.empty(0, dtype=np.int64)
+        self._tail_size = 0
+        self._tail_members: Set[int] = set()
+        self._last_review_id = 0
+        self._last_refresh = 0.0
+        self._lock = threading.Lock()
+        self._compacting = False
+        self.loaded = False
+        self._searches = 0
+        self._search_seconds = 0.0
+        self._snapshots_written = 0
+
+    def _current_snapshot_name(self) -> Optional[str]:
+        try:
+            return (self.directory / CURRENT_FILENAME).read_text().strip()
+        except FileNotFoundError:
+            return None
+
+    def _open_snapshot(self, name: str) -> Optional[_Snapshot]:
+        try:
+            snapshot = _Snapshot(self.directory / name)
+        except Exception as e:
+            logger.error(f"❌ Failed to open embedding snapshot {name}: {e}")
+            return None
+        if snapshot.meta["model"] != settings.EMBEDDING_MODEL_NAME:
+            logger.warning(
+                f"⚠️  Embedding snapshot was built with {snapshot.meta['model']}, ignoring it "
+                "(run: python manage.py rebuild-embedding-index --all)"
+            )
+            return None
+        return snapshot
+
+    def add(self, review_id: int, blob: Optional[bytes]) -> None:
+        if blob is None:
+            return
+        with self._lock:
+            self._append(review_id, from_blob(blob))
+        self._compact_if_full()
+
+    def _append(self, review_id: int, vector: np.ndarray) -> None:
+        """Add one vector to the tail (caller holds _lock)"""
+        if review_id in self._tail_members:
+            return
+        if self._tail_vectors is not None and self._tail_vectors.shape[1] != len(vector):
+            # Embedded with another model; never matches a query of the current one
+            return
+        if self._tail_vectors is None or self._tail_size == len(self._tail_vectors):
+            # Grow by copying into a new buffer; searches keep scanning the old one
+            capacity = max(TAIL_INITIAL_CAPACITY, 2 * self._tail_size)
+            vectors = np.empty((capacity, len(vector)), dtype="<f2")
+            ids = np.empty(capacity, dtype=np.int64)
+            if self._tail_size:
+                vectors[:self._tail_size] = self._tail_vectors[:self._tail_size]
+                ids[:self._tail_size] = self._tail_ids[:self._tail_size]
+            self._tail_vectors, self._tail_ids = vectors, ids
+        self._tail_vectors[self._tail_size] = vector
+        self._tail_ids[self._tail_size] = review_id
+        self._tail_size += 1
+        self._tail_members.add(review_id)
+        self._last_review_id = max(self._last_review_id, review_id)
+
+    def _reset_tail(self) -> None:
+        """Empty the tail (caller holds _lock)"""
+        self._tail_vectors = None
+        self._tail_ids = np.empty(0, dtype=np.int64)
+        self._tail_size = 0
+        self._tail_members = set()
+
+    def load_from_db(self) -> None:
+        """Open the current snapshot and catch up on reviews embedded after it"""
+        name = self._current_snapshot_name()
+        snapshot = self._open_snapshot(name) if name else None
+        with self._lock:
+            self._snapshot = snapshot
+            self._snapshot_name = name
+            self._reset_tail()
+            self._last_review_id = snapshot.meta["max_review_id"] if snapshot else 0
+        self._catch_up()
+        self.loaded = True
+        logger.info(
+            f"✓ Embedding index loaded ({snapshot.meta['count'] if snapshot else 0} in snapshot, "
+            f"{self._tail_size} since)"
+        )
+
+    def _catch_up(self) -> None:
+        db = SessionLocal()
+        try:
+            rows = (
+                db.query(models.ReviewEmbedding.review_id, models.ReviewEmbedding.vector)
+                .filter(models.ReviewEmbedding.review_id > self._last_review_id)
+                .order_by(models.ReviewEmbedding.review_id)
+                .yield_per(10000)
+            )
+            for review_id, blob in rows:
+                # The rest is left for the snapshot that a full tail triggers
+                if self._tail_size >= self.max_tail:
+                    break
+                with self._lock:
+                    self._append(review_id, from_blob(bytes(blob)))
+        except Exception as e:
+            logger.error(f"❌ Failed to load review embeddings: {e}")
+        finally:
+            db.close()
+        self._last_refresh = time.monotonic()
+        self._compact_if_full()
+
+    def _compact_if_full(self) -> None:
+        """Start writing a new snapshot in the background once the tail is full"""
+        with self._lock:
+            if self._compacting or self._tail_size < self.max_tail:
+                return
+            self._compacting = True
+        threading.Thread(target=self._compact, name="embedding-snapshot", daemon=True).start()
+
+    def _compact(self) -> None:
+        try:
+            with snapshot_lock(self.directory):
+                # Another worker (or manage.py) may have written one while we waited for the lock
+                if self._current_snapshot_name() == self._snapshot_name:
+                    meta = write_snapshot_from_db(str(self.directory))
+                    if meta:
+                        self._snapshots_written += 1
+                        logger.info(f"✓ Wrote embedding snapshot of {meta['count']} reviews (tail was full)")
+            self.load_from_db()
+        except Exception as e:
+            logger.error(f"❌ Failed to write embedding snapshot: {e}")
+        finally:
+            self._compacting = False
+
+    def refresh(self) -> None:
+        """
+        Switch to a newer snapshot and pick up reviews other workers saved,
+        at most every refresh_seconds. Reviews committed out of id order by
+        another worker can be missed until the next snapshot.
+        """
+        if not self.loaded or time.monotonic() - self._last_refresh < self.refresh_seconds:
+            return
+        name = self._current_snapshot_name()
+        if name and name != self._snapshot_name:
+            self.load_from_db()
+        else:
+            self._catch_up()
+
+    def search(self, query: np.ndarray, k: int = 10, exclude: Set[int] = frozenset()) -> List[Tuple[int, float]]:
+        """Up to k (review_id, cosine similarity) pairs, most similar first"""
+        if not self.loaded:
+            return []
+        start = time.perf_counter()
+        query = np.asarray(query, dtype=np.float32)
+        wanted = k + len(exclude)
+
+        with self._lock:
+            snapshot = self._snapshot
+            # Views of the used rows; appends only write past them
+            tail = (self._tail_vectors[:self._tail_size], self._tail_ids[:self._tail_size]) if self._tail_size else None
+
+        scores, ids = [np.empty(0, np.float32)], [np.empty(0, np.int64)]
+        if snapshot is not None and snapshot.meta["count"] and snapshot.meta["dim"] == len(query):
+            found = snapshot.search(query, wanted, self.nprobe)
+            scores.append(found[0])
+            ids.append(found[1])
+        if tail is not None and tail[0].shape[1] == len(query):
+            found = _scan(tail[0], tail[1], query, wanted)
+            scores.append(found[0])
+            ids.append(found[1])
+        scores, ids = np.concatenate(scores), np.concatenate(ids)
+
+        results, seen = [], set(exclude)
+        for i in np.argsort(-scores):
+            review_id = int(ids[i])
+            if review_id not in seen:
+                seen.add(review_id)
+                results.append((review_id, float(scores[i])))
+                if len(results) == k:
+                    break
+        self._searches += 1
+        self._search_seconds += time.perf_counter() - start
+        return results
+
+    def metrics(self) -> Dict:
+        snapshot = self._snapshot
+        return {
+            "loaded": self.loaded,
+            "snapshot_reviews": snapshot.meta["count"] if snapshot else 0,
+            "ivf_clusters": snapshot.meta["nlist"] if snapshot else 0,
+            "tail_reviews": self._tail_size,
+            "max_tail_reviews": self.max_tail,
+            "snapshots_written": self._snapshots_written,
+            "searches": self._searches,
+            "avg_search_ms": self._search_seconds * 1000 / self._searches if self._searches else 0,
+        }
@@ -0,0 +1,43 @@
+"""
+Gunicorn configuration for running the backend with several uvicorn workers
+
+    gunicorn -c gunicorn.conf.py app:app
+
+The app is imported in the master before workers are forked. With
+RUN_MIGRATIONS_ON_STARTUP=true the master applies pending migrations once,
+before any worker starts, and workers only check the schema revision. With
+PRELOAD_MODEL=true the master also loads and warms up the sentiment model,
+so every worker starts with the weights already in (copy-on-write shared)
+memory instead of loading its own copy on first request.
+Worker count comes from WEB_CONCURRENCY (gunicorn's default).
+"""
+import gc
+
+from database import settings
+
+bind = f"{settings.BACKEND_HOST}:{settings.BACKEND_PORT}"
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+# Model loading in a worker (PRELOAD_MODEL=false) can exceed the default 30s
+timeout = 120
+
+def when_ready(server):
+    """Runs in the master, after the app is imported and before workers are forked"""
+    if settings.RUN_MIGRATIONS_ON_STARTUP:
+        from database import engine
+        from db_utils import upgrade_database
+        upgrade_database()
+        # Workers must not inherit the master's pooled connections
+        engine.dispose()
+    if not settings.PRELOAD_MODEL:
+        return
+    import analysis
+    if not analysis.preload_sentiment_model(for_fork=True):
+        server.log.warning("Sentiment model preload failed, workers will load it themselves")
+    # Exclude everything allocated so far from garbage collection: collections
+    # in the workers would otherwise write to these objects and un-share their pages
+    gc.freeze()
+
+def post_fork(server, worker):
+    import analysis
+    analysis.after_fork()
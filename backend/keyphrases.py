@@ -0,0 +1,122 @@
+"""
+Local key phrase extraction (RAKE-style statistical scoring)
+
+Candidate phrases are runs of content words between stopwords and
+punctuation. Each word is scored by degree/frequency within its review
+(RAKE); when a batch of reviews is processed together, word scores are
+also weighted by their inverse document frequency across the batch, so
+phrases common to every review ("this product") rank below the ones that
+make a review distinctive. Pure Python, no model to load.
+"""
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+MAX_PHRASE_WORDS = 4
+
+# Negations are deliberately not stopwords, so "not comfortable" stays one phrase
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each even every few for from
+further get got had has have having he her here hers herself him himself his how i if in into is it
+its itself just me more most my myself of off on once only or other our ours ourselves out over own
+really same she should so some such than that the their theirs them themselves then there these
+they this those through to too under until up us very was we were what when where which while who
+whom why will with would you your yours yourself yourselves im ive its dont didnt doesnt isnt wasnt
+one thing things lot bit much many well still way quite pretty actually definitely overall
+product item bought buy purchased purchase
+""".split())
+
+_TOKEN_RE = re.compile(r"[A-Za-z0-9]+(?:'[A-Za-z]+)?|[^\sA-Za-z0-9]")
+
+Phrase = Tuple[Tuple[str, ...], str]  # (normalized words, original text span)
+
+def _candidate_phrases(text: str) -> List[Phrase]:
+    """Split text into candidate phrases at stopwords and punctuation"""
+    phrases: List[Phrase] = []
+    words: List[str] = []
+    start = end = 0
+
+    def flush():
+        if words and not all(w.isdigit() for w in words) and max(len(w) for w in words) > 2:
+            phrases.append((tuple(words), text[start:end]))
+        words.clear()
+
+    for match in _TOKEN_RE.finditer(text):
+        token = match.group()
+        normalized = token.lower().replace("'", "")
+        if not token[0].isalnum() or normalized in STOPWORDS:
+            flush()
+            continue
+        if len(words) == MAX_PHRASE_WORDS:
+            flush()
+        if not words:
+            start = match.start()
+        words.append(normalized)
+        end = match.end()
+    flush()
+    return phrases
+
+def _word_scores(phrases: List[Phrase]) -> Dict[str, float]:
+    """RAKE word score: degree (co-occurring words in phrases) over frequency"""
+    frequency: Counter = Counter()
+    degree: Counter = Counter()
+    for words, _ in phrases:
+        for word in words:
+            frequency[word] += 1
+            degree[word] += len(words)
+    return {word: degree[word] / frequency[word] for word in frequency}
+
+def _format(span: str) -> str:
+    return span[0].upper() + span[1:]
+
+def _rank(phrases: List[Phrase], idf: Optional[Dict[str, float]], max_points: int) -> List[str]:
+    scores = _word_scores(phrases)
+    best: Dict[Tuple[str, ...], Tuple[float, int, str]] = {}
+    for position, (words, span) in enumerate(phrases):
+        score = sum(scores[w] * (idf[w] if idf else 1.0) for w in words)
+        if words not in best:
+            best[words] = (score, position, span)
+        else:
+            # Repeated phrases count once more, keep the first occurrence's text
+            previous = best[words]
+            best[words] = (previous[0] + score / len(words), previous[1], previous[2])
+
+    ranked = sorted(best.values(), key=lambda entry: (-entry[0], entry[1]))
+    selected: List[str] = []
+    seen_words: set = set()
+    for _, _, span in ranked:
+        words = set(span.lower().split())
+        # Skip phrases already contained in a better one ("battery" after "battery life")
+        if words <= seen_words:
+            continue
+        seen_words |= words
+        selected.append(_format(span))
+        if len(selected) == max_points:
+            break
+    return selected
+
+def extract_key_phrases(text: str, max_points: int = 5) -> List[str]:
+    """Key phrases of one review, best first"""
+    return _rank(_candidate_phrases(text), None, max_points)
+
+def extract_key_phrases_batch(texts: List[str], max_points: int = 5) -> List[List[str]]:
+    """
+    Key phrases for many reviews, with word scores weighted by inverse
+    document frequency across the batch.
+    Returns: list of phrase lists, aligned with `texts`
+    """
+    candidates = [_candidate_phrases(text) for text in texts]
+    if len(texts) < 2:
+        return [_rank(phrases, None, max_points) for phrases in candidates]
+
+    document_frequency: Counter = Counter()
+    for phrases in candidates:
+        document_frequency.update({word for words, _ in phrases for word in words})
+    total = len(texts)
+    idf = {
+        word: math.log((1 + total) / (1 + count)) + 1
+        for word, count in document_frequency.items()
+    }
+    return [_rank(phrases, idf, max_points) for phrases in candidates]
@@ -0,0 +1,155 @@
+"""
+Lexicon/rule-based sentiment scorer used to short-circuit obvious reviews
+
+Word valences come from a small product-review lexicon and are adjusted by
+the usual rules: a preceding negation flips and dampens a word, intensifiers
+and downtoners scale it, clauses after "but"/"however" outweigh the ones
+before, and exclamation marks add emphasis. Confidence is high only when the
+text is strongly and consistently one-sided; mixed or sparse reviews score
+close to 0.5 and are left to the model.
+"""
+import math
+import re
+from typing import Tuple
+
+POSITIVE_WORDS = {
+    # strong
+    "love": 3.0, "loved": 3.0, "loves": 3.0, "amazing": 3.0, "awesome": 3.0, "excellent": 3.0,
+    "outstanding": 3.0, "perfect": 3.0, "perfectly": 3.0, "fantastic": 3.0, "superb": 3.0,
+    "wonderful": 3.0, "incredible": 3.0, "flawless": 3.0, "flawlessly": 3.0, "brilliant": 3.0,
+    "best": 3.0, "exceptional": 3.0, "phenomenal": 3.0, "delighted": 3.0,
+    # moderate
+    "great": 2.5, "happy": 2.2, "impressed": 2.3, "impressive": 2.3, "recommend": 2.2,
+    "recommended": 2.2, "beautiful": 2.3, "gorgeous": 2.5, "favorite": 2.3, "pleased": 2.2,
+    "satisfied": 2.0, "reliable": 2.0, "sturdy": 1.8, "solid": 1.7, "comfortable": 1.9,
+    "durable": 1.9, "fast": 1.4, "quick": 1.3, "quickly": 1.2, "easy": 1.6, "easily": 1.3,
+    "smooth": 1.6, "quiet": 1.3, "bright": 1.2, "sharp": 1.2, "crisp": 1.5, "responsive": 1.6,
+    "intuitive": 1.8, "worth": 1.8, "value": 1.2, "bargain": 1.8, "glad": 2.0, "enjoy": 2.0,
+    "enjoyed": 2.0, "works": 1.2, "worked": 1.0, "useful": 1.6, "helpful": 1.8, "nice": 1.8,
+    "good": 1.9, "lovely": 2.3, "pleasant": 1.8, "sleek": 1.7, "stylish": 1.7, "premium": 1.5,
+    "efficient": 1.6, "powerful": 1.6, "accurate": 1.6, "secure": 1.2, "clean": 1.1,
+    "convenient": 1.7, "fun": 1.9, "superior": 2.1, "thrilled": 2.8, "exceeded": 2.3,
+    "upgrade": 1.2, "improved": 1.3, "fine": 0.8, "decent": 0.9, "ok": 0.6, "okay": 0.6,
+}
+
+NEGATIVE_WORDS = {
+    # strong
+    "hate": -3.0, "hated": -3.0, "terrible": -3.0, "horrible": -3.0, "awful": -3.0,
+    "worst": -3.0, "useless": -2.8, "garbage": -3.0, "junk": -2.8, "trash": -2.8,
+    "disgusting": -3.0, "scam": -3.0, "fraud": -3.0, "dangerous": -2.6, "pathetic": -2.8,
+    "unusable": -2.8, "nightmare": -2.8, "rubbish": -2.7, "furious": -2.8,
+    # moderate
+    "bad": -2.2, "poor": -2.2, "poorly": -2.0, "broke": -2.3, "broken": -2.3, "breaks": -2.0,
+    "defective": -2.5, "faulty": -2.4, "waste": -2.5, "wasted": -2.4, "disappointed": -2.4,
+    "disappointing": -2.4, "disappointment": -2.4, "refund": -1.8, "return": -1.0,
+    "returned": -1.6, "returning": -1.6, "cheap": -1.2, "flimsy": -2.0, "fragile": -1.4,
+    "slow": -1.5, "loud": -1.2, "noisy": -1.5, "uncomfortable": -1.9, "difficult": -1.4,
+    "confusing": -1.6, "frustrating": -2.1, "frustration": -2.1, "annoying": -2.0,
+    "missing": -1.5, "damaged": -2.2, "leaks": -1.9, "leaking": -1.9, "cracked": -2.0,
+    "scratched": -1.6, "scratches": -1.4, "snapped": -1.8, "failed": -2.1, "fails": -2.0,
+    "stopped": -1.4, "dead": -2.0, "died": -2.1, "overpriced": -2.0, "expensive": -1.0,
+    "mediocre": -1.5, "meh": -1.0, "unreliable": -2.1, "inaccurate": -1.7, "weak": -1.4,
+    "weaker": -1.3,
+    "worse": -2.1, "ugly": -2.0, "smells": -1.4, "stinks": -2.2, "regret": -2.3,
+    "avoid": -2.3, "problem": -1.4, "problems": -1.4, "issue": -1.2, "issues": -1.2,
+    "complaint": -1.5, "unhappy": -2.2, "sad": -1.8, "wrong": -1.6, "error": -1.3,
+    "errors": -1.3, "crash": -1.8, "crashes": -1.8, "lag": -1.4, "laggy": -1.6,
+    "overheats": -2.0, "hot": -0.6, "rude": -2.0, "late": -1.1, "delayed": -1.2,
+}
+
+LEXICON = {**POSITIVE_WORDS, **NEGATIVE_WORDS}
+
+NEGATIONS = frozenset({
+    "not", "no", "never", "none", "nothing", "neither", "nor", "without", "hardly", "barely",
+    "dont", "doesnt", "didnt", "isnt", "wasnt", "arent", "werent", "wont", "cant", "cannot",
+    "couldnt", "wouldnt", "shouldnt", "aint",
+})
+
+INTENSIFIERS = {
+    "very": 0.3, "really": 0.3, "so": 0.25, "extremely": 0.4, "super": 0.35, "incredibly": 0.4,
+    "absolutely": 0.4, "totally": 0.35, "completely": 0.35, "highly": 0.35, "truly": 0.3,
+    "utterly": 0.4, "seriously": 0.3, "most": 0.25, "too": 0.2,
+    "slightly": -0.3, "somewhat": -0.3, "fairly": -0.2, "kinda": -0.3, "kind": -0.2,
+    "sort": -0.2, "little": -0.2, "bit": -0.2, "mostly": -0.15, "almost": -0.2,
+}
+
+CONTRASTS = frozenset({"but", "however", "although", "though", "yet"})
+
+# A negation affects sentiment words up to this many tokens after it
+NEGATION_WINDOW = 3
+NEGATION_SCALAR = -0.74
+EXCLAMATION_BOOST = 0.3
+# Normalization constant for the compound score (same role as in VADER)
+ALPHA = 15.0
+
+_TOKEN_RE = re.compile(r"[a-z]+(?:'[a-z]+)?|[.!?;]")
+
+def score_text(text: str) -> Tuple[float, float]:
+    """
+    Sum of adjusted positive and (absolute) negative valences in the text.
+    Returns: (positive, negative)
+    """
+    positive = negative = 0.0
+    clause_scores = []  # (valence, clause index)
+    clause = 0
+    since_negation = NEGATION_WINDOW + 1
+    boost = 0.0
+
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in ".!?;":
+            since_negation = NEGATION_WINDOW + 1
+            boost = 0.0
+            continue
+        token = token.replace("'", "")
+        if token in CONTRASTS:
+            clause += 1
+            since_negation = NEGATION_WINDOW + 1
+            boost = 0.0
+            continue
+        if token in NEGATIONS:
+            since_negation = 0
+            continue
+        if token in INTENSIFIERS:
+            boost += INTENSIFIERS[token]
+            continue
+
+        since_negation += 1
+        valence = LEXICON.get(token)
+        if valence is None:
+            continue
+        valence += math.copysign(boost, valence)
+        boost = 0.0
+        if since_negation <= NEGATION_WINDOW:
+            valence *= NEGATION_SCALAR
+        clause_scores.append((valence, clause))
+
+    # The last clause of a contrast ("fine, but it broke") carries the verdict
+    for valence, index in clause_scores:
+        weight = 1.0 if clause == 0 else (1.5 if index == clause else 0.5)
+        if valence > 0:
+            positive += valence * weight
+        else:
+            negative -= valence * weight
+
+    exclamations = min(text.count("!"), 3) * EXCLAMATION_BOOST
+    if positive > negative:
+        positive += exclamations
+    elif negative > positive:
+        negative += exclamations
+    return positive, negative
+
+def classify(text: str) -> Tuple[str, float]:
+    """
+    Lexicon sentiment with a confidence in [0.5, 1): strong, one-sided
+    texts score high; mixed, neutral or sparse ones stay near 0.5.
+    Returns: (sentiment: str, confidence: float)
+    """
+    positive, negative = score_text(text)
+    total = positive + negative
+    if total == 0:
+        return "neutral", 0.5
+    net = positive - negative
+    compound = net / math.sqrt(net * net + ALPHA)
+    agreement = abs(net) / total
+    confidence = 0.5 + 0.5 * abs(compound) * agreement
+    return ("positive" if net > 0 else "negative" if net < 0 else "neutral"), confidence
@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+"""
+Maintenance commands for the Product Review Analyzer backend
+Run from the backend directory: python manage.py <command> [options]
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+
+from sqlalchemy import Text, cast, or_
+
+from database import SessionLocal
+import models
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def backfill_key_points(args) -> int:
+    """Extract key points for reviews that have none, many reviews per Gemini request (or locally)"""
+    from analysis import extract_key_points_batch, provider_clients
+    from topics import record_review_topics
+
+    async def run(db) -> int:
+        query = (
+            db.query(models.Review)
+            .filter(or_(models.Review.key_points.is_(None), cast(models.Review.key_points, Text) == "[]"))
+            .order_by(models.Review.id)
+        )
+        total = query.count()
+        if args.limit:
+            total = min(total, args.limit)
+        logger.info(f"Found {total} reviews without key points")
+
+        processed = filled = last_id = 0
+        try:
+            # Paged by id, so only one chunk of reviews is in memory at a time
+            while processed < total:
+                chunk = query.filter(models.Review.id > last_id).limit(min(args.chunk_size, total - processed)).all()
+                if not chunk:
+                    break
+                results = await extract_key_points_batch(
+                    [review.review_text for review in chunk],
+                    token_budget=args.token_budget,
+                    max_reviews=args.max_reviews,
+                    backend=args.backend
+                )
+                for review, key_points in zip(chunk, results):
+                    if key_points:
+                        review.key_points = key_points
+                        record_review_topics(db, review.product_id, key_points, review.sentiment, review.created_at)
+                        filled += 1
+                db.commit()
+                processed += len(chunk)
+                last_id = chunk[-1].id
+                db.expunge_all()
+                logger.info(f"✓ Processed {processed}/{total} reviews")
+        finally:
+            await provider_clients.aclose()
+
+        logger.info(f"✓ Backfilled key points for {filled}/{processed} reviews")
+        return 0 if filled == processed else 1
+
+    db = SessionLocal()
+    try:
+        return asyncio.run(run(db))
+    finally:
+        db.close()
+
+def rebuild_dedup_index(args) -> int:
+    """Compute MinHash signatures of stored reviews for near-duplicate lookups"""
+    from dedup import signature
+
+    db = SessionLocal()
+    try:
+        if args.all:
+            deleted = db.query(models.ReviewFingerprint).delete()
+            db.commit()
+            logger.info(f"Deleted {deleted} existing fingerprints")
+
+        query = (
+            db.query(models.Review.id, models.Review.review_text)
+            .outerjoin(models.ReviewFingerprint, models.ReviewFingerprint.review_id == models.Review.id)
+            .filter(models.ReviewFingerprint.review_id.is_(None))
+            .order_by(models.Review.id)
+        )
+        processed = fingerprinted = last_id = 0
+        while True:
+            rows = query.filter(models.Review.id > last_id).limit(args.chunk_size).all()
+            if not rows:
+                break
+            for review_id, review_text in rows:
+                fingerprint = signature(review_text)
+                # Reviews too short to fingerprint are skipped (and never matched)
+                if fingerprint is not None:
+                    db.add(models.ReviewFingerprint(review_id=review_id, minhash=fingerprint))
+                    fingerprinted += 1
+            db.commit()
+            processed += len(rows)
+            last_id = rows[-1][0]
+            logger.info(f"✓ Processed {processed} reviews")
+
+        logger.info(f"✓ Fingerprinted {fingerprinted}/{processed} reviews; restart the API to reload the index")
+        return 0
+    finally:
+        db.close()
+
+def rebuild_embedding_index(args) -> int:
+    """Embed reviews that have no embedding, then write the memory-mapped similarity search index"""
+    from database import settings
+    from embeddings import embed_texts, snapshot_lock, to_blob, write_snapshot_from_db
+
+    db = SessionLocal()
+    try:
+        if args.all:
+            deleted = db.query(models.ReviewEmbedding).delete()
+            db.commit()
+            logger.info(f"Deleted {deleted} existing embeddings")
+
+        if not args.snapshot_only:
+            query = (
+                db.query(models.Review.id, models.Review.review_text)
+                .outerjoin(models.ReviewEmbedding, models.ReviewEmbedding.review_id == models.Review.id)
+                .filter(models.ReviewEmbedding.review_id.is_(None))
+                .order_by(models.Review.id)
+            )
+            processed = last_id = 0
+            while True:
+                rows = query.filter(models.Review.id > last_id).limit(args.chunk_size).all()
+                if not rows:
+                    break
+                for start in range(0, len(rows), args.batch_size):
+                    batch = rows[start:start + args.batch_size]
+                    vectors = embed_texts([review_text for _, review_text in batch])
+                    for (review_id, _), vector in zip(batch, vectors):
+                        db.add(models.ReviewEmbedding(review_id=review_id, vector=to_blob(vector)))
+                db.commit()
+                processed += len(rows)
+                last_id = rows[-1][0]
+                logger.info(f"✓ Embedded {processed} reviews")
+
+        # Waits for an API worker that is writing one because its tail filled up
+        with snapshot_lock(settings.EMBEDDINGS_DIR):
+            meta = write_snapshot_from_db(settings.EMBEDDINGS_DIR)
+        if meta is None:
+            logger.info("No review embeddings, nothing to index")
+            return 0
+        index = f"IVF, {meta['nlist']} clusters" if meta["nlist"] else "flat"
+        logger.info(f"✓ Wrote embedding index of {meta['count']} reviews ({index}); API workers pick it up on their next refresh")
+        return 0
+    finally:
+        db.close()
+
+def rebuild_topics(args) -> int:
+    """Recompute the product_topics aggregation from stored reviews (backfill or drift repair)"""
+    from topics import aggregate_topics
+
+    db = SessionLocal()
+    try:
+        query = db.query(models.Review).order_by(models.Review.id)
+        if args.product_id:
+            query = query.filter(models.Review.product_id == args.product_id)
+
+        def reviews():
+            last_id = 0
+            while True:
+                chunk = query.filter(models.Review.id > last_id).limit(args.chunk_size).all()
+                if not chunk:
+                    return
+                for review in chunk:
+                    yield review.product_id, review.get_key_points(), review.sentiment, review.created_at
+                last_id = chunk[-1].id
+                db.expunge_all()
+
+        topics = aggregate_topics(reviews())
+
+        # Swap in one transaction, so the API never serves a half-built aggregation
+        deleted = db.query(models.ProductTopic)
+        if args.product_id:
+            deleted = deleted.filter(models.ProductTopic.product_id == args.product_id)
+        deleted.delete(synchronize_session=False)
+        for start in range(0, len(topics), args.chunk_size):
+            db.execute(models.ProductTopic.__table__.insert(), topics[start:start + args.chunk_size])
+        db.commit()
+        logger.info(f"✓ Rebuilt {len(topics)} product topics")
+        return 0
+    finally:
+        db.close()
+
+def rebuild_stats(args) -> int:
+    """Recompute the sentiment rollup and trend buckets from stored reviews (drift repair)"""
+    from sentiment_stats import rebuild_stats as rebuild
+
+    db = SessionLocal()
+    try:
+        # Swapped in a single transaction, so the API never serves half-built stats
+        products, buckets = rebuild(db, args.product_id, args.chunk_size)
+        db.commit()
+        logger.info(f"✓ Rebuilt sentiment stats of {products} products ({buckets} trend buckets)")
+        return 0
+    finally:
+        db.close()
+
+def export_onnx(args) -> int:
+    """Export the local sentiment model to ONNX with int8 dynamic quantization"""
+    from analysis import SENTIMENT_MODEL_NAME
+    from database import settings
+    from onnx_sentiment import export_quantized_model
+
+    export_quantized_model(args.model or SENTIMENT_MODEL_NAME, args.output_dir or settings.ONNX_MODEL_DIR)
+    return 0
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backfill = commands.add_parser("backfill-key-points", help=backfill_key_points.__doc__)
+    backfill.add_argument("--limit", type=int, default=None, help="maximum number of reviews to process")
+    backfill.add_argument("--chunk-size", type=int, default=500, help="reviews loaded and committed per round")
+    backfill.add_argument("--token-budget", type=int, default=None, help="estimated input tokens per Gemini request")
+    backfill.add_argument("--max-reviews", type=int, default=None, help="maximum reviews per Gemini request")
+    backfill.add_argument("--backend", choices=["gemini", "local"], default=None, help="default: KEY_POINTS_BACKEND")
+    backfill.set_defaults(handler=backfill_key_points)
+
+    dedup = commands.add_parser("rebuild-dedup-index", help=rebuild_dedup_index.__doc__)
+    dedup.add_argument("--all", action="store_true", help="recompute every signature, not only missing ones")
+    dedup.add_argument("--chunk-size", type=int, default=1000, help="reviews processed and committed per round")
+    dedup.set_defaults(handler=rebuild_dedup_index)
+
+    embeddings = commands.add_parser("rebuild-embedding-index", help=rebuild_embedding_index.__doc__)
+    embeddings.add_argument("--all", action="store_true", help="re-embed every review (after changing EMBEDDING_MODEL_NAME)")
+    embeddings.add_argument("--snapshot-only", action="store_true", help="only rewrite the index from stored embeddings")
+    embeddings.add_argument("--chunk-size", type=int, default=1000, help="reviews loaded and committed per round")
+    embeddings.add_argument("--batch-size", type=int, default=64, help="reviews per model forward pass")
+    embeddings.set_defaults(handler=rebuild_embedding_index)
+
+    topics = commands.add_parser("rebuild-topics", help=rebuild_topics.__doc__)
+    topics.add_argument("--product-id", type=int, default=None, help="only rebuild this product's topics")
+    topics.add_argument("--chunk-size", type=int, default=1000, help="reviews loaded per round")
+    topics.set_defaults(handler=rebuild_topics)
+
+    stats = commands.add_parser("rebuild-stats", help=rebuild_stats.__doc__)
+    stats.add_argument("--product-id", type=int, default=None, help="only rebuild this product's stats")
+    stats.add_argument("--chunk-size", type=int, default=10000, help="reviews loaded per round")
+    stats.set_defaults(handler=rebuild_stats)
+
+    export = commands.add_parser("export-onnx", help=export_onnx.__doc__)
+    export.add_argument("--model", default=None, help="model name or path (default: the local sentiment model)")
+    export.add_argument("--output-dir", default=None, help="default: ONNX_MODEL_DIR")
+    export.set_defaults(handler=export_onnx)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+Alembic environment: migrates the database in DATABASE_URL, or the
+connection passed in config.attributes["connection"] (db_utils.upgrade_database)
+"""
+from logging.config import fileConfig
+
+from alembic import context
+
+from database import Base, engine
+import models  # noqa: F401 - registers the tables on Base.metadata
+
+config = context.config
+
+# Programmatic callers (db_utils) keep their own logging setup
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+def _configure(**kwargs):
+    context.configure(
+        target_metadata=target_metadata,
+        compare_type=True,
+        **kwargs
+    )
+
+def run_migrations_offline():
+    """Emit the migration SQL instead of running it (alembic upgrade head --sql)"""
+    _configure(url=engine.url.render_as_string(hide_password=False), literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    with engine.connect() as connection:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,80 @@
+"""Baseline schema: products, reviews, analysis_results
+
+Databases created by Base.metadata.create_all before migrations existed
+already have some or all of these tables; existing tables are left as they
+are and brought up to date by the later revisions.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 07:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Created once up front: on PostgreSQL two tables share the type
+sentiment_enum = postgresql.ENUM("POSITIVE", "NEGATIVE", "NEUTRAL", name="sentimentenum", create_type=False)
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if bind.dialect.name == "postgresql":
+        sentiment_enum.create(bind, checkfirst=True)
+
+    if not inspector.has_table("products"):
+        op.create_table(
+            "products",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(length=255), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("id")
+        )
+        op.create_index("ix_products_id", "products", ["id"])
+        op.create_index("ix_products_name", "products", ["name"], unique=True)
+
+    if not inspector.has_table("reviews"):
+        op.create_table(
+            "reviews",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("product_id", sa.Integer(), nullable=False),
+            sa.Column("review_text", sa.Text(), nullable=False),
+            sa.Column("sentiment", sentiment_enum, nullable=True),
+            sa.Column("sentiment_score", sa.Float(), nullable=True),
+            sa.Column("key_points", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("analyzed_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["product_id"], ["products.id"]),
+            sa.PrimaryKeyConstraint("id")
+        )
+        op.create_index("ix_reviews_id", "reviews", ["id"])
+
+    if not inspector.has_table("analysis_results"):
+        op.create_table(
+            "analysis_results",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("review_id", sa.Integer(), nullable=False),
+            sa.Column("sentiment", sentiment_enum, nullable=False),
+            sa.Column("sentiment_score", sa.Float(), nullable=False),
+            sa.Column("key_points", sa.Text(), nullable=False),
+            sa.Column("raw_sentiment_output", sa.Text(), nullable=True),
+            sa.Column("raw_gemini_output", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["review_id"], ["reviews.id"]),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("review_id")
+        )
+        op.create_index("ix_analysis_results_id", "analysis_results", ["id"])
+
+def downgrade():
+    op.drop_table("analysis_results")
+    op.drop_table("reviews")
+    op.drop_table("products")
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        sentiment_enum.drop(bind, checkfirst=True)
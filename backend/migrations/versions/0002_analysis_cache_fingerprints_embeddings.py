@@ -0,0 +1,60 @@
+"""Analysis cache columns, review fingerprints and review embeddings
+
+analysis_results becomes the persistent analysis cache tier (keyed by
+content hash, review_id optional); review_fingerprints holds MinHash
+signatures for near-duplicate lookups and review_embeddings the vectors
+for similarity search.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 07:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    columns = {c["name"] for c in inspector.get_columns("analysis_results")}
+    with op.batch_alter_table("analysis_results") as batch:
+        if "content_hash" not in columns:
+            batch.add_column(sa.Column("content_hash", sa.String(length=64), nullable=True))
+        if "analysis_version" not in columns:
+            batch.add_column(sa.Column("analysis_version", sa.String(length=255), nullable=True))
+        batch.alter_column("review_id", existing_type=sa.Integer(), nullable=True)
+    if "ix_analysis_results_content_hash" not in {i["name"] for i in inspector.get_indexes("analysis_results")}:
+        op.create_index("ix_analysis_results_content_hash", "analysis_results", ["content_hash"], unique=True)
+
+    if not inspector.has_table("review_fingerprints"):
+        op.create_table(
+            "review_fingerprints",
+            sa.Column("review_id", sa.Integer(), nullable=False),
+            sa.Column("minhash", sa.LargeBinary(), nullable=False),
+            sa.ForeignKeyConstraint(["review_id"], ["reviews.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("review_id")
+        )
+
+    if not inspector.has_table("review_embeddings"):
+        op.create_table(
+            "review_embeddings",
+            sa.Column("review_id", sa.Integer(), nullable=False),
+            sa.Column("vector", sa.LargeBinary(), nullable=False),
+            sa.ForeignKeyConstraint(["review_id"], ["reviews.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("review_id")
+        )
+
+def downgrade():
+    op.drop_table("review_embeddings")
+    op.drop_table("review_fingerprints")
+    op.drop_index("ix_analysis_results_content_hash", table_name="analysis_results")
+    # Cache rows without a review can't satisfy the old NOT NULL
+    op.execute("DELETE FROM analysis_results WHERE review_id IS NULL")
+    with op.batch_alter_table("analysis_results") as batch:
+        batch.alter_column("review_id", existing_type=sa.Integer(), nullable=False)
+        batch.drop_column("analysis_version")
+        batch.drop_column("content_hash")
@@ -0,0 +1,37 @@
+"""Per-product key point topics (see topics.py)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 07:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table("product_topics"):
+        return
+    op.create_table(
+        "product_topics",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("topic_key", sa.String(length=255), nullable=False),
+        sa.Column("label", sa.String(length=255), nullable=False),
+        sa.Column("mention_count", sa.Integer(), nullable=False),
+        sa.Column("positive_count", sa.Integer(), nullable=False),
+        sa.Column("negative_count", sa.Integer(), nullable=False),
+        sa.Column("neutral_count", sa.Integer(), nullable=False),
+        sa.Column("last_mentioned_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("product_id", "topic_key", name="uq_product_topics_product_topic")
+    )
+    op.create_index("ix_product_topics_id", "product_topics", ["id"])
+    op.create_index("ix_product_topics_product_mentions", "product_topics", ["product_id", "mention_count"])
+
+def downgrade():
+    op.drop_table("product_topics")
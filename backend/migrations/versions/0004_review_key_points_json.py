@@ -0,0 +1,75 @@
+"""Store reviews.key_points as native JSON (JSONB on PostgreSQL)
+
+Rows written before were comma-joined text (or, rarely, JSON text); they
+are converted in id-ordered chunks inside the migration's transaction.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 07:00:00
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+CHUNK_SIZE = 1000
+
+json_list = sa.JSON(none_as_null=True).with_variant(postgresql.JSONB(none_as_null=True), "postgresql")
+
+def _parse_text(value):
+    """key_points as stored in the Text column: JSON or comma-separated"""
+    if not value:
+        return None
+    try:
+        points = json.loads(value)
+        if isinstance(points, list):
+            return [str(p) for p in points] or None
+    except ValueError:
+        pass
+    return [p.strip() for p in value.split(",") if p.strip()] or None
+
+def _copy_column(source_type, target_type, convert):
+    """Copy reviews.key_points into a new column through convert(), then swap the columns"""
+    bind = op.get_bind()
+    op.add_column("reviews", sa.Column("key_points_new", target_type, nullable=True))
+    reviews = sa.table(
+        "reviews",
+        sa.column("id", sa.Integer),
+        sa.column("key_points", source_type),
+        sa.column("key_points_new", target_type)
+    )
+    update = (
+        reviews.update()
+        .where(reviews.c.id == sa.bindparam("review_id"))
+        .values(key_points_new=sa.bindparam("points"))
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(reviews.c.id, reviews.c.key_points)
+            .where(reviews.c.id > last_id)
+            .order_by(reviews.c.id)
+            .limit(CHUNK_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(update, [{"review_id": review_id, "points": convert(value)} for review_id, value in rows])
+        last_id = rows[-1][0]
+    with op.batch_alter_table("reviews") as batch:
+        batch.drop_column("key_points")
+        batch.alter_column("key_points_new", new_column_name="key_points")
+
+def upgrade():
+    columns = {c["name"]: c["type"] for c in sa.inspect(op.get_bind()).get_columns("reviews")}
+    if isinstance(columns["key_points"], sa.JSON):
+        return
+    _copy_column(sa.Text(), json_list, _parse_text)
+
+def downgrade():
+    _copy_column(json_list, sa.Text(), lambda points: json.dumps(points) if points else None)
@@ -0,0 +1,42 @@
+"""Composite indexes for review listings and stats
+
+GET /api/reviews filters on product_id or sentiment and orders by
+created_at DESC, id DESC; /api/stats filters on product_id. Each index
+serves one of those filters already sorted, so neither needs a full scan
+or a sort. On PostgreSQL they are built CONCURRENTLY, without blocking
+writes to reviews.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 07:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_reviews_product_created": ["product_id", sa.text("created_at DESC"), sa.text("id DESC")],
+    "ix_reviews_sentiment_created": ["sentiment", sa.text("created_at DESC"), sa.text("id DESC")],
+    "ix_reviews_created": [sa.text("created_at DESC"), sa.text("id DESC")],
+}
+
+def upgrade():
+    existing = {i["name"] for i in sa.inspect(op.get_bind()).get_indexes("reviews")}
+    missing = {name: columns for name, columns in INDEXES.items() if name not in existing}
+    if not missing:
+        return
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, columns in missing.items():
+                op.create_index(name, "reviews", columns, postgresql_concurrently=True)
+    else:
+        for name, columns in missing.items():
+            op.create_index(name, "reviews", columns)
+
+def downgrade():
+    for name in INDEXES:
+        op.drop_index(name, table_name="reviews")
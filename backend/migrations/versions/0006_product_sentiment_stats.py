@@ -0,0 +1,60 @@
+"""Per-product sentiment rollup (see sentiment_stats.py)
+
+The table is filled from existing reviews, so /api/stats reports the same
+numbers before and after the upgrade. Reviews saved by an older app
+version while this runs are not counted; `manage.py rebuild-stats` fixes
+that.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table("product_sentiment_stats"):
+        return
+    stats = op.create_table(
+        "product_sentiment_stats",
+        sa.Column("product_id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("review_count", sa.Integer(), nullable=False),
+        sa.Column("positive_count", sa.Integer(), nullable=False),
+        sa.Column("negative_count", sa.Integer(), nullable=False),
+        sa.Column("neutral_count", sa.Integer(), nullable=False),
+        sa.Column("score_sum", sa.Float(), nullable=False),
+        sa.Column("scored_count", sa.Integer(), nullable=False),
+        sa.Column("last_review_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("product_id")
+    )
+
+    reviews = sa.table(
+        "reviews",
+        sa.column("product_id", sa.Integer()),
+        sa.column("sentiment", sa.String()),
+        sa.column("sentiment_score", sa.Float()),
+        sa.column("created_at", sa.DateTime())
+    )
+    score = sa.func.nullif(reviews.c.sentiment_score, 0)
+    # The sentiment enum is stored by name
+    counts = [sa.func.count(sa.case((reviews.c.sentiment == name, 1))) for name in ("POSITIVE", "NEGATIVE", "NEUTRAL")]
+    op.execute(stats.insert().from_select(
+        [c.name for c in stats.c],
+        sa.select(
+            reviews.c.product_id,
+            sa.func.count(),
+            *counts,
+            sa.func.coalesce(sa.func.sum(score), 0.0),
+            sa.func.count(score),
+            sa.func.max(reviews.c.created_at)
+        ).group_by(reviews.c.product_id)
+    ))
+
+def downgrade():
+    op.drop_table("product_sentiment_stats")
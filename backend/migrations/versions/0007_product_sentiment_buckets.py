@@ -0,0 +1,91 @@
+"""Per-product hourly and daily sentiment buckets (see sentiment_stats.py)
+
+The buckets are filled from existing reviews, in id-keyed chunks, so
+trends cover history from the start. Reviews saved by an older app version
+while this runs are not counted; `manage.py rebuild-stats` fixes that.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 10:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+CHUNK_SIZE = 10000
+# The sentiment enum is stored by name
+SENTIMENT_COLUMNS = {"POSITIVE": 1, "NEGATIVE": 2, "NEUTRAL": 3}
+
+def _bucket_start(moment, granularity):
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table("product_sentiment_buckets"):
+        return
+    buckets = op.create_table(
+        "product_sentiment_buckets",
+        sa.Column("product_id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("granularity", sa.String(length=8), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(), nullable=False),
+        sa.Column("review_count", sa.Integer(), nullable=False),
+        sa.Column("positive_count", sa.Integer(), nullable=False),
+        sa.Column("negative_count", sa.Integer(), nullable=False),
+        sa.Column("neutral_count", sa.Integer(), nullable=False),
+        sa.Column("score_sum", sa.Float(), nullable=False),
+        sa.Column("scored_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("product_id", "granularity", "bucket_start")
+    )
+
+    reviews = sa.table(
+        "reviews",
+        sa.column("id", sa.Integer()),
+        sa.column("product_id", sa.Integer()),
+        sa.column("sentiment", sa.String()),
+        sa.column("sentiment_score", sa.Float()),
+        sa.column("created_at", sa.DateTime())
+    )
+    query = (
+        sa.select(reviews.c.id, reviews.c.product_id, reviews.c.sentiment, reviews.c.sentiment_score, reviews.c.created_at)
+        .where(reviews.c.created_at.isnot(None))
+        .order_by(reviews.c.id)
+        .limit(CHUNK_SIZE)
+    )
+    # (product_id, granularity, bucket_start) -> [reviews, positive, negative, neutral, score sum, scored]
+    counters = {}
+    last_id = 0
+    while True:
+        rows = op.get_bind().execute(query.where(reviews.c.id > last_id)).all()
+        if not rows:
+            break
+        for _, product_id, sentiment, score, created_at in rows:
+            for granularity in ("hour", "day"):
+                bucket = counters.setdefault((product_id, granularity, _bucket_start(created_at, granularity)), [0, 0, 0, 0, 0.0, 0])
+                bucket[0] += 1
+                if sentiment in SENTIMENT_COLUMNS:
+                    bucket[SENTIMENT_COLUMNS[sentiment]] += 1
+                # Zero scores never counted toward the average
+                if score:
+                    bucket[4] += score
+                    bucket[5] += 1
+        last_id = rows[-1][0]
+
+    rows = [
+        {
+            "product_id": product_id, "granularity": granularity, "bucket_start": start,
+            "review_count": c[0], "positive_count": c[1], "negative_count": c[2], "neutral_count": c[3],
+            "score_sum": c[4], "scored_count": c[5],
+        }
+        for (product_id, granularity, start), c in counters.items()
+    ]
+    for start in range(0, len(rows), CHUNK_SIZE):
+        op.bulk_insert(buckets, rows[start:start + CHUNK_SIZE])
+
+def downgrade():
+    op.drop_table("product_sentiment_buckets")
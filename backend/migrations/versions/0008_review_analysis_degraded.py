@@ -0,0 +1,42 @@
+"""Flag reviews saved with a degraded analysis (see analysis.analyze_review)
+
+Near-duplicate lookups skip flagged reviews, so a provider outage doesn't
+keep handing its fallback answer to every later near-duplicate. Existing
+reviews with the fallback sentiment (neutral, 0.5) are flagged; fallback
+key points can't be told apart after the fact.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 12:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("reviews")}
+    if "analysis_degraded" in columns:
+        return
+    with op.batch_alter_table("reviews") as batch:
+        batch.add_column(sa.Column("analysis_degraded", sa.Boolean(), server_default=sa.false(), nullable=False))
+
+    reviews = sa.table(
+        "reviews",
+        sa.column("sentiment", sa.String()),
+        sa.column("sentiment_score", sa.Float()),
+        sa.column("analysis_degraded", sa.Boolean())
+    )
+    # The sentiment enum is stored by name
+    op.execute(
+        reviews.update()
+        .where(reviews.c.sentiment == "NEUTRAL", reviews.c.sentiment_score == 0.5)
+        .values(analysis_degraded=True)
+    )
+
+def downgrade():
+    with op.batch_alter_table("reviews") as batch:
+        batch.drop_column("analysis_degraded")
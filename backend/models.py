@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Enum, LargeBinary, Index, UniqueConstraint, JSON, Boolean, false
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
 import enum
-import json
+
+# List-valued JSON column: JSONB on PostgreSQL, JSON (text) elsewhere; None is SQL NULL
+JSONList = JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")
 
 class SentimentEnum(str, enum.Enum):
     POSITIVE = "positive"
@@ -28,28 +31,92 @@ class Review(Base):
     review_text = Column(Text, nullable=False)
     sentiment = Column(Enum(SentimentEnum), nullable=True)
     sentiment_score = Column(Float, nullable=True)  # 0-1 confidence score
-    key_points = Column(Text, nullable=True)  # JSON string or comma-separated
+    key_points = Column(JSONList, nullable=True)  # List of strings
     created_at = Column(DateTime, default=datetime.utcnow)
     analyzed_at = Column(DateTime, nullable=True)
+    # Fallback sentiment or key points: never reused for near-duplicates
+    analysis_degraded = Column(Boolean, nullable=False, default=False, server_default=false())
     
     product = relationship("Product", back_populates="reviews")
+    fingerprint = relationship("ReviewFingerprint", uselist=False, cascade="all, delete-orphan")
+    embedding = relationship("ReviewEmbedding", uselist=False, cascade="all, delete-orphan")
     
     def get_key_points(self) -> list:
-        """Parse key_points from storage format to list"""
-        if not self.key_points:
-            return []
-        # Try JSON first
-        try:
-            return json.loads(self.key_points)
-        except:
-            # Fallback to comma-separated
-            return [p.strip() for p in self.key_points.split(",") if p.strip()]
+        """Key points as a list (empty if none)"""
+        return list(self.key_points or [])
+
+# Review listings filter on product or sentiment, newest first; stats filter on product
+Index("ix_reviews_product_created", Review.product_id, Review.created_at.desc(), Review.id.desc())
+Index("ix_reviews_sentiment_created", Review.sentiment, Review.created_at.desc(), Review.id.desc())
+Index("ix_reviews_created", Review.created_at.desc(), Review.id.desc())
+
+class ReviewFingerprint(Base):
+    """MinHash signature of a review's text, for near-duplicate lookups (see dedup.py)"""
+    __tablename__ = "review_fingerprints"
+    
+    review_id = Column(Integer, ForeignKey("reviews.id", ondelete="CASCADE"), primary_key=True)
+    minhash = Column(LargeBinary, nullable=False)  # 64 packed uint32 values
+
+class ReviewEmbedding(Base):
+    """Sentence embedding of a review's text, for similarity search (see embeddings.py)"""
+    __tablename__ = "review_embeddings"
+    
+    review_id = Column(Integer, ForeignKey("reviews.id", ondelete="CASCADE"), primary_key=True)
+    vector = Column(LargeBinary, nullable=False)  # Unit-length float16 values
+
+class ProductTopic(Base):
+    """Mentions of a normalized key point topic across a product's reviews (see topics.py)"""
+    __tablename__ = "product_topics"
+    __table_args__ = (
+        UniqueConstraint("product_id", "topic_key", name="uq_product_topics_product_topic"),
+        Index("ix_product_topics_product_mentions", "product_id", "mention_count"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    topic_key = Column(String(255), nullable=False)  # Normalized, order-independent words
+    label = Column(String(255), nullable=False)  # Display form, from the first mention
+    mention_count = Column(Integer, nullable=False, default=0)
+    positive_count = Column(Integer, nullable=False, default=0)
+    negative_count = Column(Integer, nullable=False, default=0)
+    neutral_count = Column(Integer, nullable=False, default=0)
+    last_mentioned_at = Column(DateTime, nullable=True)
+
+class ProductSentimentStats(Base):
+    """Review and sentiment counters of a product, behind /api/stats (see sentiment_stats.py)"""
+    __tablename__ = "product_sentiment_stats"
+    
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    review_count = Column(Integer, nullable=False, default=0)
+    positive_count = Column(Integer, nullable=False, default=0)
+    negative_count = Column(Integer, nullable=False, default=0)
+    neutral_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0)  # Sum of the non-zero sentiment scores
+    scored_count = Column(Integer, nullable=False, default=0)  # Reviews counted in score_sum
+    last_review_at = Column(DateTime, nullable=True)
+
+class ProductSentimentBucket(Base):
+    """Review and sentiment counters of a product per UTC hour or day (see sentiment_stats.py)"""
+    __tablename__ = "product_sentiment_buckets"
+    
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    granularity = Column(String(8), primary_key=True)  # "hour" or "day"
+    bucket_start = Column(DateTime, primary_key=True)
+    review_count = Column(Integer, nullable=False, default=0)
+    positive_count = Column(Integer, nullable=False, default=0)
+    negative_count = Column(Integer, nullable=False, default=0)
+    neutral_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0)  # Sum of the non-zero sentiment scores
+    scored_count = Column(Integer, nullable=False, default=0)  # Reviews counted in score_sum
 
 class AnalysisResult(Base):
+    """Persistent tier of the analysis cache, keyed by normalized-text hash"""
     __tablename__ = "analysis_results"
     
     id = Column(Integer, primary_key=True, index=True)
-    review_id = Column(Integer, ForeignKey("reviews.id"), nullable=False, unique=True)
+    review_id = Column(Integer, ForeignKey("reviews.id"), nullable=True, unique=True)
+    content_hash = Column(String(64), unique=True, index=True, nullable=True)  # sha256 of version + normalized text
+    analysis_version = Column(String(255), nullable=True)
     sentiment = Column(Enum(SentimentEnum), nullable=False)
     sentiment_score = Column(Float, nullable=False)
     key_points = Column(Text, nullable=False)  # JSON string
@@ -0,0 +1,180 @@
+"""
+ONNX Runtime backend for the local DistilBERT sentiment model
+"""
+import inspect
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FP32_FILENAME = "model.onnx"
+INT8_FILENAME = "model.int8.onnx"
+
+def export_quantized_model(model_name: str, output_dir: Union[str, Path]) -> Path:
+    """
+    Export a sequence-classification model to ONNX and apply dynamic int8
+    quantization. The tokenizer and config are saved alongside so the
+    exported directory is self-contained.
+    Returns: path of the quantized model
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    output_dir = Path(output_dir).expanduser()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    fp32_path = output_dir / FP32_FILENAME
+    int8_path = output_dir / INT8_FILENAME
+
+    logger.info(f"🔄 Exporting {model_name} to ONNX in {output_dir}...")
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.eval()
+
+    sample = tokenizer(["an example review"], return_tensors="pt")
+    export_kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        # Newer torch defaults to the dynamo exporter; keep the TorchScript one
+        export_kwargs["dynamo"] = False
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"]),
+            str(fp32_path),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "logits": {0: "batch"},
+            },
+            opset_version=14,
+            **export_kwargs,
+        )
+
+    # Quantize to a temporary name and rename, so concurrent workers never load a partial file
+    tmp_path = output_dir / f"{INT8_FILENAME}.{os.getpid()}.tmp"
+    quantize_dynamic(str(fp32_path), str(tmp_path), weight_type=QuantType.QInt8)
+    os.replace(tmp_path, int8_path)
+
+    tokenizer.save_pretrained(output_dir)
+    model.config.save_pretrained(output_dir)
+    logger.info(f"✅ Quantized ONNX model written to {int8_path}")
+    return int8_path
+
+class FastTokenizer:
+    """
+    Minimal HF-tokenizer-compatible wrapper over the `tokenizers` library, so
+    serving the ONNX model never imports torch/transformers.
+
+    A `tokenizers.Tokenizer` carries its truncation and padding settings, and
+    this wrapper is called from several threads at once (length checks on the
+    event loop, padded batches on the inference executor). Each combination
+    of settings therefore gets its own instance, configured once and never
+    changed afterwards.
+    """
+
+    def __init__(self, model_dir: Path, max_length: int = 512):
+        self._definition = (model_dir / "tokenizer.json").read_text()
+        self._encoders: Dict[Tuple[Optional[int], bool], object] = {}
+        self._encoders_lock = threading.Lock()
+        self.max_length = max_length
+        pad_token = "[PAD]"
+        config_path = model_dir / "tokenizer_config.json"
+        if config_path.exists():
+            pad_token = json.loads(config_path.read_text()).get("pad_token") or pad_token
+        self.pad_token_id = self._encoder(None, False).token_to_id(pad_token) or 0
+
+    def _encoder(self, max_length: Optional[int], padding: bool):
+        """Tokenizer instance that truncates to max_length (None: no truncation) and pads or not"""
+        key = (max_length, padding)
+        encoder = self._encoders.get(key)
+        if encoder is None:
+            from tokenizers import Tokenizer
+
+            with self._encoders_lock:
+                encoder = self._encoders.get(key)
+                if encoder is None:
+                    encoder = Tokenizer.from_str(self._definition)
+                    if max_length:
+                        encoder.enable_truncation(max_length)
+                    else:
+                        encoder.no_truncation()
+                    if padding:
+                        encoder.enable_padding(pad_id=self.pad_token_id)
+                    else:
+                        encoder.no_padding()
+                    self._encoders[key] = encoder
+        return encoder
+
+    def __call__(self, texts: Union[str, List[str]], truncation: bool = True, max_length: int = None, padding: bool = False, **kwargs) -> Dict:
+        single = isinstance(texts, str)
+        encoder = self._encoder((max_length or self.max_length) if truncation else None, bool(padding))
+        encodings = encoder.encode_batch([texts] if single else list(texts))
+        encoded = {
+            "input_ids": [e.ids for e in encodings],
+            "attention_mask": [e.attention_mask for e in encodings],
+        }
+        if single:
+            return {key: value[0] for key, value in encoded.items()}
+        if kwargs.get("return_tensors") == "np":
+            return {key: np.array(value, dtype=np.int64) for key, value in encoded.items()}
+        return encoded
+
+class OnnxSentimentPipeline:
+    """
+    Stand-in for the transformers "sentiment-analysis" pipeline served by
+    ONNX Runtime: same call signature and [{"label", "score"}] output.
+    """
+
+    def __init__(self, model_dir: Union[str, Path], num_threads: int = 0):
+        import onnxruntime as ort
+
+        model_dir = Path(model_dir).expanduser()
+        self.tokenizer = FastTokenizer(model_dir)
+        config = json.loads((model_dir / "config.json").read_text())
+        self.id2label: Dict[int, str] = {int(k): v for k, v in config["id2label"].items()}
+
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            str(model_dir / INT8_FILENAME),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+
+    def __call__(self, texts: Union[str, List[str]], truncation: bool = True, batch_size: int = None, **kwargs) -> List[Dict]:
+        if isinstance(texts, str):
+            texts = [texts]
+        batch_size = batch_size or len(texts) or 1
+
+        results = []
+        for start in range(0, len(texts), batch_size):
+            encoded = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=truncation,
+                return_tensors="np",
+            )
+            (logits,) = self.session.run(["logits"], encoded)
+            # Softmax over labels, as the pipeline reports it
+            exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+            probs = exp / exp.sum(axis=1, keepdims=True)
+            for row in probs:
+                label_id = int(row.argmax())
+                results.append({"label": self.id2label[label_id], "score": float(row[label_id])})
+        return results
+
+def load_onnx_pipeline(model_name: str, model_dir: Union[str, Path], num_threads: int = 0) -> OnnxSentimentPipeline:
+    """Load the quantized ONNX model, exporting it first if it isn't there yet"""
+    model_dir = Path(model_dir).expanduser()
+    if not (model_dir / INT8_FILENAME).exists():
+        export_quantized_model(model_name, model_dir)
+    return OnnxSentimentPipeline(model_dir, num_threads=num_threads)
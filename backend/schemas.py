@@ -22,6 +22,32 @@ class ProductResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class SentimentDistribution(BaseModel):
+    positive: int
+    negative: int
+    neutral: int
+
+class ProductTopicResponse(BaseModel):
+    topic: str
+    mentions: int  # Reviews mentioning the topic
+    sentiment_distribution: SentimentDistribution
+    last_mentioned_at: Optional[datetime]
+
+class ProductTopicsResponse(BaseModel):
+    product_id: int
+    topics: List[ProductTopicResponse]
+
+class TrendBucketResponse(BaseModel):
+    start: datetime  # UTC
+    total_reviews: int
+    sentiment_distribution: SentimentDistribution
+    average_sentiment_score: float  # 0 when no review in the bucket has a score
+
+class ProductTrendResponse(BaseModel):
+    product_id: int
+    granularity: str
+    buckets: List[TrendBucketResponse]
+
 # Review Request/Response Schemas
 class ReviewAnalyzeRequest(BaseModel):
     product_id: int
@@ -31,6 +57,7 @@ class ReviewAnalysisResult(BaseModel):
     sentiment: SentimentEnum
     sentiment_score: float = Field(..., ge=0, le=1)
     key_points: List[str]
+    partial: bool = False  # True when key points missed their deadline
 
 class ReviewResponse(BaseModel):
     id: int
@@ -45,22 +72,8 @@ class ReviewResponse(BaseModel):
     @field_validator('key_points', mode='before')
     @classmethod
     def parse_key_points(cls, v):
-        """Convert key_points from string to list"""
-        if v is None:
-            return []
-        if isinstance(v, list):
-            return v
-        if isinstance(v, str):
-            if not v:
-                return []
-            # Try JSON first
-            try:
-                import json
-                return json.loads(v)
-            except:
-                # Fallback to comma-separated
-                return [p.strip() for p in v.split(",") if p.strip()]
-        return v
+        """Reviews without key points have NULL; return an empty list"""
+        return [] if v is None else v
     
     class Config:
         from_attributes = True
@@ -68,6 +81,10 @@ class ReviewResponse(BaseModel):
 class ReviewWithProductResponse(ReviewResponse):
     product: ProductResponse
 
+class SimilarReviewResponse(BaseModel):
+    review: ReviewWithProductResponse
+    similarity: float  # Cosine similarity of the review embeddings
+
 # Analysis Schemas
 class AnalysisResponse(BaseModel):
     review_id: int
@@ -79,20 +96,8 @@ class AnalysisResponse(BaseModel):
     @field_validator('key_points', mode='before')
     @classmethod
     def parse_key_points(cls, v):
-        """Convert key_points from string to list"""
-        if v is None:
-            return []
-        if isinstance(v, list):
-            return v
-        if isinstance(v, str):
-            if not v:
-                return []
-            try:
-                import json
-                return json.loads(v)
-            except:
-                return [p.strip() for p in v.split(",") if p.strip()]
-        return v
+        """Reviews without key points have NULL; return an empty list"""
+        return [] if v is None else v
     
     class Config:
         from_attributes = True
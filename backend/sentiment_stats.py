@@ -0,0 +1,212 @@
+"""
+Per-product sentiment rollup and trend buckets behind GET /api/stats and
+GET /api/products/{id}/trend
+
+product_sentiment_stats holds, for each product, the number of reviews,
+the count per sentiment, the sum and count of the scores that make up the
+average sentiment score, and the time of the latest review.
+product_sentiment_buckets holds the same counters per product and UTC hour
+and day. Both are incremented with upserts in the same transaction that
+saves a review, so stats and trends are read from a handful of rows
+instead of scanning reviews. Weekly trends are rolled up from the day
+buckets when read, so a year of them takes 365 rows.
+
+Like the average /api/stats has always reported, zero and missing scores
+are left out of score_sum and scored_count. `manage.py rebuild-stats`
+recomputes everything from reviews, for drift repair (reviews written or
+deleted outside the API).
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, func, insert
+from sqlalchemy.orm import Session
+
+from db_utils import enum_value, increment_counters
+import models
+
+SENTIMENTS = ("positive", "negative", "neutral")
+COUNTERS = ("review_count", "positive_count", "negative_count", "neutral_count", "score_sum", "scored_count")
+
+# Trend granularities and their bucket lengths; weeks start on Monday
+BUCKET_STEPS = {"hour": timedelta(hours=1), "day": timedelta(days=1), "week": timedelta(weeks=1)}
+# Granularities stored in product_sentiment_buckets, finest first
+STORED_GRANULARITIES = ("hour", "day")
+
+def _review_row(product_id: int, sentiment, score: Optional[float], reviewed_at: datetime) -> Dict:
+    sentiment = enum_value(sentiment)
+    return {
+        "product_id": product_id,
+        "review_count": 1,
+        "positive_count": int(sentiment == "positive"),
+        "negative_count": int(sentiment == "negative"),
+        "neutral_count": int(sentiment == "neutral"),
+        "score_sum": score or 0.0,
+        "scored_count": int(bool(score)),
+        "last_review_at": reviewed_at,
+    }
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    """Start of the hour, day or week (Monday) that moment falls in"""
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return day
+    return day - timedelta(days=day.weekday())
+
+def record_review_sentiment(
+    db: Session,
+    product_id: int,
+    sentiment,
+    score: Optional[float],
+    reviewed_at: datetime
+) -> None:
+    """Count a new review toward its product's rollup and trend buckets (caller commits)"""
+    row = _review_row(product_id, sentiment, score, reviewed_at)
+    increment_counters(db, models.ProductSentimentStats, [row], ["product_id"], COUNTERS, ["last_review_at"])
+
+    counters = {column: row[column] for column in COUNTERS}
+    # Always in the same order (hour, then day), so concurrent saves lock rows alike
+    buckets = [
+        {"product_id": product_id, "granularity": granularity,
+         "bucket_start": bucket_start(reviewed_at, granularity), **counters}
+        for granularity in STORED_GRANULARITIES
+    ]
+    increment_counters(db, models.ProductSentimentBucket, buckets, ["product_id", "granularity", "bucket_start"], COUNTERS)
+
+def aggregate_query(db: Session, product_id: Optional[int] = None):
+    """Rollup rows computed from reviews, one per product that has reviews"""
+    review = models.Review
+    score = func.nullif(review.sentiment_score, 0)
+    query = db.query(
+        review.product_id,
+        func.count(),
+        *[func.count(case((review.sentiment == models.SentimentEnum(s), 1))) for s in SENTIMENTS],
+        func.coalesce(func.sum(score), 0.0),
+        func.count(score),
+        func.max(review.created_at),
+    )
+    if product_id:
+        query = query.filter(review.product_id == product_id)
+    return query.group_by(review.product_id)
+
+def aggregate_buckets(reviews: Iterable[Tuple[int, object, Optional[float], datetime]]) -> List[Dict]:
+    """
+    product_sentiment_buckets rows computed from scratch out of (product_id,
+    sentiment, sentiment_score, created_at) tuples: hour buckets from the
+    reviews, each coarser granularity rolled up from the one before it
+    """
+    finest, coarser = STORED_GRANULARITIES[0], STORED_GRANULARITIES[1:]
+    buckets: Dict[Tuple[int, str, datetime], Dict] = {}
+
+    def add(product_id: int, granularity: str, start: datetime, counters: Dict) -> None:
+        bucket = buckets.get((product_id, granularity, start))
+        if bucket is None:
+            buckets[(product_id, granularity, start)] = {
+                "product_id": product_id, "granularity": granularity, "bucket_start": start, **counters
+            }
+            return
+        for column in COUNTERS:
+            bucket[column] += counters[column]
+
+    for product_id, sentiment, score, created_at in reviews:
+        if created_at is None:
+            continue
+        row = _review_row(product_id, sentiment, score, created_at)
+        add(product_id, finest, bucket_start(created_at, finest), {column: row[column] for column in COUNTERS})
+
+    for previous, granularity in zip(STORED_GRANULARITIES, coarser):
+        for bucket in [b for b in buckets.values() if b["granularity"] == previous]:
+            add(bucket["product_id"], granularity, bucket_start(bucket["bucket_start"], granularity),
+                {column: bucket[column] for column in COUNTERS})
+    return list(buckets.values())
+
+def rebuild_stats(db: Session, product_id: Optional[int] = None, chunk_size: int = 10000) -> Tuple[int, int]:
+    """
+    Replace the rollup and trend buckets (or one product's) with ones
+    computed from reviews (caller commits). Returns (rollup rows, buckets).
+    """
+    for model in (models.ProductSentimentStats, models.ProductSentimentBucket):
+        deleted = db.query(model)
+        if product_id:
+            deleted = deleted.filter(model.product_id == product_id)
+        deleted.delete(synchronize_session=False)
+
+    columns = ["product_id", *COUNTERS, "last_review_at"]
+    result = db.execute(
+        insert(models.ProductSentimentStats.__table__).from_select(columns, aggregate_query(db, product_id).statement)
+    )
+
+    review = models.Review
+    query = db.query(review.id, review.product_id, review.sentiment, review.sentiment_score, review.created_at)
+    if product_id:
+        query = query.filter(review.product_id == product_id)
+    query = query.order_by(review.id)
+
+    def reviews():
+        last_id = 0
+        while True:
+            chunk = query.filter(review.id > last_id).limit(chunk_size).all()
+            if not chunk:
+                return
+            for row in chunk:
+                yield row[1:]
+            last_id = chunk[-1][0]
+
+    buckets = aggregate_buckets(reviews())
+    for start in range(0, len(buckets), chunk_size):
+        db.execute(insert(models.ProductSentimentBucket.__table__), buckets[start:start + chunk_size])
+    return result.rowcount, len(buckets)
+
+def read_stats(db: Session, product_id: Optional[int] = None) -> Dict:
+    """
+    Counters of one product, or summed over all products, as a dict with
+    the COUNTERS and last_review_at. Zero when there are no reviews.
+    """
+    stats = models.ProductSentimentStats
+    if product_id:
+        row = db.get(stats, product_id)
+        values = [getattr(row, column) if row else None for column in (*COUNTERS, "last_review_at")]
+    else:
+        # One row per product, so this stays cheap however many reviews there are
+        values = db.query(
+            *[func.sum(getattr(stats, column)) for column in COUNTERS], func.max(stats.last_review_at)
+        ).one()
+    result = {column: value or 0 for column, value in zip(COUNTERS, values)}
+    result["last_review_at"] = values[-1]
+    return result
+
+def read_trend(db: Session, product_id: int, granularity: str, since: datetime, until: datetime) -> List[Dict]:
+    """
+    Counters of every bucket of a product from the one containing since up
+    to until, oldest first, as dicts with bucket_start and the COUNTERS
+    (zero for buckets without reviews)
+    """
+    stored = granularity if granularity in STORED_GRANULARITIES else STORED_GRANULARITIES[-1]
+    first = bucket_start(since, granularity)
+    bucket = models.ProductSentimentBucket
+    rows = (
+        db.query(bucket)
+        .filter(
+            bucket.product_id == product_id,
+            bucket.granularity == stored,
+            bucket.bucket_start >= first,
+            bucket.bucket_start < until
+        )
+        .order_by(bucket.bucket_start)
+        .all()
+    )
+
+    counters: Dict[datetime, Dict] = {}
+    for row in rows:
+        totals = counters.setdefault(bucket_start(row.bucket_start, granularity), dict.fromkeys(COUNTERS, 0))
+        for column in COUNTERS:
+            totals[column] += getattr(row, column)
+
+    trend = []
+    start = first
+    while start < until:
+        trend.append({"bucket_start": start, **counters.get(start, dict.fromkeys(COUNTERS, 0))})
+        start += BUCKET_STEPS[granularity]
+    return trend
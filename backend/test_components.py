@@ -0,0 +1,575 @@
+#!/usr/bin/env python
+"""
+Behaviour tests for the analysis pipeline's building blocks, run without
+calling a provider or loading a model
+Run from the backend directory: python test_components.py (or pytest test_components.py)
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND_DIR)
+
+@contextlib.contextmanager
+def _patched(target, **attributes):
+    """Temporarily replace attributes of a module or object"""
+    saved = {name: getattr(target, name) for name in attributes}
+    for name, value in attributes.items():
+        setattr(target, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(target, name, value)
+
+@contextlib.contextmanager
+def _scratch_engine():
+    """Engine on a temporary SQLite database with the app's tables"""
+    from sqlalchemy import create_engine
+    from database import Base
+    import models  # registers the tables on Base
+
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        engine = create_engine(f"sqlite:///{os.path.join(scratch_dir, 'components.db')}")
+        try:
+            Base.metadata.create_all(engine)
+            yield engine
+        finally:
+            engine.dispose()
+
+def test_analysis_cache_tiers():
+    """Results are served from memory, then from the database across processes, keyed by version"""
+    print("\n" + "="*60)
+    print("Testing the two-tier analysis cache...")
+    print("="*60)
+
+    from sqlalchemy.orm import sessionmaker
+    import analysis_cache
+    from analysis_cache import AnalysisCache
+
+    result = {"sentiment": "positive", "sentiment_score": 0.9, "key_points": ["battery life"], "cached": False}
+    stored = {"sentiment": "positive", "sentiment_score": 0.9, "key_points": ["battery life"]}
+
+    async def scenario():
+        cache = AnalysisCache("v1", max_entries=1)
+        key = cache.key_for("Great   battery LIFE!")
+        assert key == cache.key_for("great battery life!"), "keys depend on case or whitespace"
+        assert await cache.get(key) is None
+        await cache.set(key, result)
+
+        hit = await cache.get(key)
+        assert hit == stored
+        hit["cached"] = True
+        assert await cache.get(key) == stored, "fields added by a caller leaked into the cache"
+        assert cache.metrics()["memory_hits"] == 2
+
+        # Another worker (empty memory tier) finds it in the database, then in memory
+        other = AnalysisCache("v1")
+        assert await other.get(key) == stored
+        assert await other.get(key) == stored
+        assert (other.metrics()["db_hits"], other.metrics()["memory_hits"]) == (1, 1)
+
+        # Evicted from the LRU tier, still in the database
+        await cache.set(cache.key_for("another review"), result)
+        assert await cache.get(key) == stored
+        assert cache.metrics()["db_hits"] == 1
+
+        # A new analysis version misses; a memory-only cache never writes to the database
+        assert await AnalysisCache("v2").get(AnalysisCache("v2").key_for("great battery life!")) is None
+        memory_only = AnalysisCache("v3", persist=False)
+        await memory_only.set(memory_only.key_for("x"), result)
+        assert await AnalysisCache("v3").get(memory_only.key_for("x")) is None
+
+    with _scratch_engine() as engine:
+        with _patched(analysis_cache, SessionLocal=sessionmaker(bind=engine)):
+            asyncio.run(scenario())
+    print("✅ Memory tier, database tier and versioned keys behave")
+
+def test_gemini_batch_recovery():
+    """A garbled batch is bisected down to the item that broke it; missing items are retried once"""
+    print("\n" + "="*60)
+    print("Testing batched key point recovery...")
+    print("="*60)
+
+    import httpx
+    import analysis
+
+    items = {i: f"review {i}" for i in range(8)}
+    requests = []
+    flaky_dropped = []
+
+    async def request_batch(batch, max_points):
+        requests.append(sorted(batch))
+        if 5 in batch:
+            # Review 5 garbles every response it's part of
+            return None
+        results = {i: [f"point of {i}"] for i in batch}
+        if 1 in batch and not flaky_dropped:
+            flaky_dropped.append(1)
+            del results[1]
+        return results
+
+    async def rate_limited(batch, max_points):
+        requests.append(sorted(batch))
+        request = httpx.Request("POST", "https://example.invalid")
+        raise httpx.HTTPStatusError("quota", request=request, response=httpx.Response(429, request=request))
+
+    with _patched(analysis, _request_key_points_batch=request_batch):
+        results = asyncio.run(analysis._extract_batch_with_recovery(items, 3))
+    assert results == {i: [f"point of {i}"] for i in items if i != 5}, results
+    assert requests == [
+        list(range(8)), [0, 1, 2, 3], [1], [4, 5, 6, 7], [4, 5], [4], [5], [6, 7]
+    ], requests
+
+    requests.clear()
+    with _patched(analysis, _request_key_points_batch=rate_limited):
+        assert asyncio.run(analysis._extract_batch_with_recovery(items, 3)) == {}
+    assert len(requests) == 1, "an HTTP error was retried"
+    print("✅ Only the broken review is lost; HTTP errors aren't multiplied")
+
+def test_aggregate_windows():
+    """Long-review windows combine into a token-weighted P(positive); failed windows are ignored"""
+    print("\n" + "="*60)
+    print("Testing window aggregation...")
+    print("="*60)
+
+    from analysis import FALLBACK_SENTIMENT, _aggregate_windows
+
+    def close(actual, expected):
+        return actual[0] == expected[0] and abs(actual[1] - expected[1]) < 1e-9
+
+    assert _aggregate_windows([("negative", 0.7)], [30]) == ("negative", 0.7)
+    assert _aggregate_windows([FALLBACK_SENTIMENT, FALLBACK_SENTIMENT], [10, 10]) == FALLBACK_SENTIMENT
+    # A failed window neither votes nor dilutes the others
+    assert _aggregate_windows([FALLBACK_SENTIMENT, ("positive", 0.9)], [500, 10]) == ("positive", 0.9)
+    # 0.75 * 0.9 + 0.25 * (1 - 0.8)
+    assert close(_aggregate_windows([("positive", 0.9), ("negative", 0.8)], [300, 100]), ("positive", 0.725))
+    # 0.1 * 0.6 + 0.9 * (1 - 0.9) = 0.15 positive
+    assert close(_aggregate_windows([("positive", 0.6), ("negative", 0.9)], [10, 90]), ("negative", 0.85))
+    print("✅ Windows aggregate by token weight")
+
+def test_circuit_breaker_transitions():
+    """Closed -> open on errors or slow calls, one half-open probe, then closed or open again"""
+    print("\n" + "="*60)
+    print("Testing circuit breaker transitions...")
+    print("="*60)
+
+    from circuit_breaker import CircuitBreaker, CircuitState
+
+    async def scenario():
+        probe_results = [False, True]
+        probes = []
+        async def probe():
+            probes.append(time.monotonic())
+            return probe_results.pop(0)
+
+        breaker = CircuitBreaker("test", probe, min_requests=4, error_rate_threshold=0.5,
+                                 slow_call_seconds=1.0, open_seconds=0.05)
+        for success in (True, False, True):
+            breaker.record(success, 0.01)
+        assert breaker.state == CircuitState.CLOSED, "opened before min_requests calls"
+        breaker.record(False, 0.01)
+        assert breaker.state == CircuitState.OPEN, "2 errors in 4 calls didn't open the breaker"
+        assert not breaker.allow_request()
+        assert not probes, "probed before open_seconds"
+
+        # Half-open: the first caller after open_seconds schedules one probe and still gets the fallback
+        await asyncio.sleep(0.06)
+        assert not breaker.allow_request()
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert not breaker.allow_request(), "half-open breaker let a call through"
+        await asyncio.sleep(0.01)
+        assert len(probes) == 1, f"{len(probes)} probes while half-open"
+        assert breaker.state == CircuitState.OPEN, "failed probe didn't re-open the breaker"
+
+        await asyncio.sleep(0.06)
+        assert not breaker.allow_request()
+        await asyncio.sleep(0.01)
+        assert len(probes) == 2
+        assert breaker.state == CircuitState.CLOSED, "successful probe didn't close the breaker"
+        assert breaker.snapshot()["window_calls"] == 0, "closed breaker kept the unhealthy window"
+        assert breaker.allow_request()
+
+        # Slow calls open it too, even when they succeed
+        for _ in range(4):
+            breaker.record(True, 1.5)
+        assert breaker.state == CircuitState.OPEN, "p95 latency over slow_call_seconds didn't open the breaker"
+
+        # Abandoned calls count as failures, and their elapsed time as latency
+        breaker = CircuitBreaker("test", probe, min_requests=4, slow_call_seconds=10.0)
+        breaker.record(True, 0.01)
+        breaker.record(True, 0.01)
+        breaker.record(True, 0.3, abandoned=True)
+        assert breaker.latency_percentile(100) == 0.3
+        breaker.record(True, 0.3, abandoned=True)
+        snapshot = breaker.snapshot()
+        assert snapshot["window_abandoned_calls"] == 2
+        assert breaker.state == CircuitState.OPEN, "abandoned calls weren't counted as failures"
+
+    asyncio.run(scenario())
+    print("✅ Breaker opens, probes once per open period, and recovers")
+
+def test_hedged_sentiment():
+    """A slow API call is hedged with local inference, and the loser is cancelled and recorded"""
+    print("\n" + "="*60)
+    print("Testing hedged sentiment requests...")
+    print("="*60)
+
+    import analysis
+    from circuit_breaker import CircuitBreaker
+
+    remote_delay = {"seconds": 0.0}
+    local_calls = []
+
+    async def remote(text):
+        await asyncio.sleep(remote_delay["seconds"])
+        return "positive", 0.99
+
+    async def local(text):
+        local_calls.append(text)
+        return "negative", 0.8
+
+    async def scenario():
+        async def probe():
+            return True
+        breaker = CircuitBreaker("HuggingFace API", probe, min_requests=100)
+        with _patched(analysis, hf_breaker=breaker, analyze_sentiment_via_hf_api=remote,
+                      analyze_sentiment_locally=local), \
+             _patched(analysis.settings, SENTIMENT_HEDGE_MIN_DELAY_MS=10, SENTIMENT_HEDGE_MAX_DELAY_MS=50):
+            fired = analysis.hedge_stats["hedges_fired"]
+
+            # Fast API: no hedge, local inference never starts
+            assert await analysis._hedged_sentiment("fast") == ("positive", 0.99)
+            assert analysis.hedge_stats["hedges_fired"] == fired
+            assert not local_calls
+
+            # Slow API: local inference wins and the API call is abandoned
+            remote_delay["seconds"] = 5.0
+            start = time.monotonic()
+            assert await analysis._hedged_sentiment("slow") == ("negative", 0.8)
+            assert time.monotonic() - start < 1, "hedge waited for the slow API"
+            assert analysis.hedge_stats["hedges_fired"] == fired + 1
+            assert local_calls == ["slow"]
+            await asyncio.sleep(0.01)
+            snapshot = breaker.snapshot()
+            assert snapshot["window_calls"] == 2
+            assert snapshot["window_abandoned_calls"] == 1, "cancelled API call wasn't recorded"
+
+    asyncio.run(scenario())
+    print("✅ Slow API calls are hedged and the cancelled call reaches the breaker")
+
+def test_json_stream_parser_chunk_splits():
+    """Streamed key points parse the same wherever the chunks split, even inside strings and escapes"""
+    print("\n" + "="*60)
+    print("Testing streamed JSON array parsing...")
+    print("="*60)
+
+    from analysis import JSONArrayStreamParser
+
+    array = '["Battery \\"easily\\" lasts", "Path C:\\\\temp, café \\u00e9", "Closes with ] and [", "Tab\\there"]'
+    document = f"```json\n{array}\n```"
+    expected = json.loads(array)
+
+    def parse(chunks):
+        parser = JSONArrayStreamParser()
+        items = []
+        for chunk in chunks:
+            items.extend(parser.feed(chunk))
+        return items
+
+    assert parse([document]) == expected
+    assert parse(list(document)) == expected, "one character per chunk"
+    for first in range(len(document)):
+        for second in range(first, len(document)):
+            chunks = [document[:first], document[first:second], document[second:]]
+            assert parse(chunks) == expected, f"split at {first} and {second}: {chunks!r}"
+    # Elements come out as soon as their closing quote arrives
+    parser = JSONArrayStreamParser()
+    assert parser.feed('["first", "sec') == ["first"]
+    assert parser.feed('ond"') == ["second"]
+    assert parser.feed('] "ignored"') == []
+    print(f"✅ Every split of a {len(document)}-character stream parses the same")
+
+def test_near_duplicate_thresholds():
+    """Light edits of a stored review are found, unrelated and short texts are not"""
+    print("\n" + "="*60)
+    print("Testing near-duplicate detection...")
+    print("="*60)
+
+    from dedup import ESTIMATE_MARGIN, NearDuplicateIndex, estimated_similarity, jaccard, signature
+
+    stored = "The battery easily lasts two full days of heavy use but the charger is painfully slow and gets hot"
+    edited = stored.replace("painfully", "really")
+    rewritten = stored.replace("painfully slow", "not slow at all")
+    unrelated = "Shipping took three weeks and the box arrived crushed with a missing manual and no cable"
+
+    assert jaccard(stored, edited) >= 0.7 > jaccard(stored, rewritten)
+    assert jaccard(stored, unrelated) == 0.0
+    assert signature("Too short to compare") is None
+    assert estimated_similarity(signature(stored), signature(stored.upper())) == 1.0
+    for text in (edited, rewritten, unrelated):
+        estimate = estimated_similarity(signature(stored), signature(text))
+        assert abs(estimate - jaccard(stored, text)) < ESTIMATE_MARGIN, f"estimate {estimate} for {text!r}"
+
+    index = NearDuplicateIndex(threshold=0.7)
+    assert index.find(signature(edited)) is None, "lookups hit before the index was loaded"
+    index.load([(1, signature(stored)), (2, signature(unrelated))])
+    index.add(3, signature("Too short"))
+    found = index.find(signature(edited))
+    assert found and found[0] == 1, found
+    assert index.find(signature("Completely different words here about a blender that leaks water everywhere daily")) is None
+    assert index.find(None) is None
+    assert index.metrics()["indexed_reviews"] == 2
+    print("✅ MinHash/LSH finds near-duplicates at the configured threshold")
+
+def test_record_review_topics():
+    """Topic counters accumulate per product with the review's sentiment, matching a rebuild"""
+    print("\n" + "="*60)
+    print("Testing topic counting...")
+    print("="*60)
+
+    from sqlalchemy.orm import Session
+    import models
+    from topics import aggregate_topics, record_review_topics
+
+    reviews = [
+        (["Great battery life", "Painfully slow charging"], models.SentimentEnum.POSITIVE, datetime(2024, 1, 1)),
+        (["Battery life is poor", "poor battery life", "Cable frays fast"], "negative", datetime(2024, 1, 3)),
+        (["Cables fray"], models.SentimentEnum.NEGATIVE, datetime(2024, 1, 2)),
+    ]
+    with _scratch_engine() as engine, Session(engine) as session:
+        session.add_all([models.Product(id=1, name="Phone"), models.Product(id=2, name="Cable")])
+        session.flush()
+        for key_points, sentiment, created_at in reviews:
+            record_review_topics(session, 1, key_points, sentiment, created_at)
+        record_review_topics(session, 2, ["Cable frays fast"], "positive", datetime(2024, 1, 4))
+        session.commit()
+
+        rows = {
+            (topic.product_id, topic.topic_key): (
+                topic.label, topic.mention_count, topic.positive_count, topic.negative_count,
+                topic.neutral_count, topic.last_mentioned_at
+            )
+            for topic in session.query(models.ProductTopic)
+        }
+    assert rows == {
+        # Mentioned twice in one review, counted once; labelled by its first mention
+        (1, "battery life"): ("battery life", 2, 1, 1, 0, datetime(2024, 1, 3)),
+        # Opinion and degree words aren't topics
+        (1, "charging"): ("charging", 1, 1, 0, 0, datetime(2024, 1, 1)),
+        # "fast" is an opinion word, but the mention takes the review's sentiment
+        (1, "cable fray"): ("cable frays", 2, 0, 2, 0, datetime(2024, 1, 2)),
+        (2, "cable fray"): ("cable frays", 1, 1, 0, 0, datetime(2024, 1, 4)),
+    }, rows
+
+    # A rebuild counts the same; it dates topics by their latest review rather than the latest saved
+    rebuilt = aggregate_topics(
+        [(1, *review) for review in reviews] + [(2, ["Cable frays fast"], "positive", datetime(2024, 1, 4))]
+    )
+    assert {
+        (row["product_id"], row["topic_key"]): (
+            row["label"], row["mention_count"], row["positive_count"], row["negative_count"], row["neutral_count"]
+        )
+        for row in rebuilt
+    } == {key: value[:5] for key, value in rows.items()}
+    print("✅ Topic counters match a rebuild from the same reviews")
+
+def test_single_review_key_points_cleaned():
+    """Gemini's single-review answers are trimmed to non-empty strings before anything stores them"""
+    print("\n" + "="*60)
+    print("Testing single-review key point parsing...")
+    print("="*60)
+
+    import httpx
+    import analysis
+
+    answer = json.dumps(["  Battery life ", 42, None, {"point": "x"}, "", "Screen glare"])
+
+    class Clients:
+        async def post(self, url, **kwargs):
+            body = {"candidates": [{"content": {"parts": [{"text": self.text}]}}]}
+            return httpx.Response(200, json=body, request=httpx.Request("POST", url))
+
+    class Model:
+        def generate_content(self, prompt):
+            return type("Response", (), {"text": f"```json\n{clients.text}\n```"})()
+
+    clients = Clients()
+    with _patched(analysis, provider_clients=clients, gemini_api_key="test-key", _get_gemini_model=lambda: Model()):
+        for extract in (analysis.extract_key_points_via_rest_api, analysis.extract_key_points_via_sdk):
+            clients.text = answer
+            assert asyncio.run(extract("review", 5)) == ["Battery life", "Screen glare"], extract.__name__
+            assert asyncio.run(extract("review", 1)) == ["Battery life"], extract.__name__
+            clients.text = json.dumps([1, 2, None])
+            assert asyncio.run(extract("review", 5)) == [], extract.__name__
+            clients.text = json.dumps({"key_points": ["a"]})
+            assert asyncio.run(extract("review", 5)) == [], extract.__name__
+    print("✅ Non-string and blank key points are dropped on every Gemini path")
+
+def test_tokenizer_shared_by_batcher_threads():
+    """Length checks on the event loop don't disturb padded batches encoded on executor threads"""
+    print("\n" + "="*60)
+    print("Testing concurrent tokenizer use...")
+    print("="*60)
+
+    from tokenizers import Tokenizer, models, pre_tokenizers
+    from batching import MicroBatcher
+    from onnx_sentiment import FastTokenizer
+
+    vocab = {"[PAD]": 0, "[UNK]": 1, **{f"w{i}": i + 2 for i in range(50)}}
+    word_level = Tokenizer(models.WordLevel(vocab, unk_token="[UNK]"))
+    word_level.pre_tokenizer = pre_tokenizers.Whitespace()
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        word_level.save(os.path.join(model_dir, "tokenizer.json"))
+        tokenizer = FastTokenizer(Path(model_dir))
+
+    def token_length(text):
+        return len(tokenizer(text, truncation=True, max_length=512)["input_ids"])
+
+    def predict_batch(texts):
+        encoded = tokenizer(texts, padding=True, truncation=True, return_tensors="np")
+        return [int(row.sum()) for row in encoded["attention_mask"]]
+
+    texts = [" ".join(f"w{j % 50}" for j in range(n)) for n in (1, 5, 20, 40, 300, 600)] * 300
+    stop = threading.Event()
+    def check_lengths():
+        while not stop.is_set():
+            token_length("w1 w2 w3")
+
+    async def scenario():
+        with ThreadPoolExecutor(3) as executor:
+            batcher = MicroBatcher(
+                predict_batch, executor, max_batch_size=6, max_wait_ms=1,
+                max_concurrent_batches=3, length_fn=token_length
+            )
+            return await asyncio.gather(*(batcher.submit(text) for text in texts))
+
+    # Switch threads as often as possible so interleavings actually happen
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    checkers = [threading.Thread(target=check_lengths) for _ in range(2)]
+    for thread in checkers:
+        thread.start()
+    try:
+        lengths = asyncio.run(scenario())
+    finally:
+        stop.set()
+        for thread in checkers:
+            thread.join()
+        sys.setswitchinterval(switch_interval)
+
+    assert lengths == [min(len(text.split()), 512) for text in texts]
+    print(f"✅ {len(texts)} texts encoded while lengths were checked concurrently")
+
+def test_micro_batcher_flushes():
+    """Full batches run at once, partial ones after max_wait, each length bucket as one pass"""
+    print("\n" + "="*60)
+    print("Testing micro-batcher flushing...")
+    print("="*60)
+
+    from batching import MicroBatcher
+
+    calls = []
+    def predict_batch(texts):
+        calls.append(list(texts))
+        return [f"result of {text}" for text in texts]
+
+    async def scenario():
+        with ThreadPoolExecutor(1) as executor:
+            # A full batch doesn't wait out max_wait
+            batcher = MicroBatcher(predict_batch, executor, max_batch_size=4, max_wait_ms=10_000)
+            start = time.monotonic()
+            results = await asyncio.gather(*(batcher.submit(f"text {i}") for i in range(8)))
+            assert time.monotonic() - start < 5, "full batches waited for max_wait"
+            assert results == [f"result of text {i}" for i in range(8)]
+            assert sorted(len(batch) for batch in calls) == [4, 4], calls
+            assert batcher.metrics()["batches"] == 2
+
+            # A partial batch goes out once max_wait has passed
+            calls.clear()
+            batcher = MicroBatcher(predict_batch, executor, max_batch_size=16, max_wait_ms=100)
+            start = time.monotonic()
+            results = await asyncio.gather(*(batcher.submit(f"text {i}") for i in range(3)))
+            elapsed = time.monotonic() - start
+            assert 0.09 <= elapsed < 5, f"partial batch flushed after {elapsed:.3f}s"
+            assert results == [f"result of text {i}" for i in range(3)]
+            assert [len(batch) for batch in calls] == [3], calls
+
+            # Short and long texts of one batch run as separate passes, shortest first
+            calls.clear()
+            short, long = " ".join(["word"] * 10), " ".join(["word"] * 100)
+            batcher = MicroBatcher(predict_batch, executor, max_batch_size=4, max_wait_ms=50)
+            await asyncio.gather(batcher.submit(long), batcher.submit(short), batcher.submit(long))
+            assert calls == [[short], [long, long]], calls
+            assert batcher.metrics()["forward_passes"] == 2
+
+            # A failed pass fails every request in it
+            def broken(texts):
+                raise RuntimeError("model crashed")
+            batcher = MicroBatcher(broken, executor, max_batch_size=2, max_wait_ms=10)
+            outcomes = await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+            assert all(isinstance(outcome, RuntimeError) for outcome in outcomes), outcomes
+
+    asyncio.run(scenario())
+    print("✅ Batches flush on size and on timeout, bucketed by length")
+
+def main():
+    """Run all tests"""
+    print("\n" + "="*60)
+    print("Product Review Analyzer - Component Tests")
+    print("="*60)
+
+    tests = [
+        ("Two-tier Analysis Cache", test_analysis_cache_tiers),
+        ("Batched Key Point Recovery", test_gemini_batch_recovery),
+        ("Window Aggregation", test_aggregate_windows),
+        ("Circuit Breaker Transitions", test_circuit_breaker_transitions),
+        ("Hedged Sentiment", test_hedged_sentiment),
+        ("Streamed JSON Parsing", test_json_stream_parser_chunk_splits),
+        ("Near-duplicate Thresholds", test_near_duplicate_thresholds),
+        ("Topic Counting", test_record_review_topics),
+        ("Single-review Key Points", test_single_review_key_points_cleaned),
+        ("Concurrent Tokenizer Use", test_tokenizer_shared_by_batcher_threads),
+        ("Micro-batcher Flushing", test_micro_batcher_flushes),
+    ]
+
+    results = {}
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results[test_name] = True
+        except AssertionError as e:
+            print(f"❌ {e}")
+            results[test_name] = False
+        except Exception as e:
+            print(f"\n❌ Unexpected error in {test_name}: {e}")
+            results[test_name] = False
+
+    # Summary
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+
+    for test_name, passed in results.items():
+        status = "✅ PASS" if passed else "❌ FAIL"
+        print(f"{status} - {test_name}")
+
+    total = len(results)
+    passed = sum(1 for v in results.values() if v)
+    print(f"\nTotal: {passed}/{total} tests passed")
+
+    return 0 if passed == total else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,453 @@
+#!/usr/bin/env python
+"""
+Performance regression tests for the backend
+Run from the backend directory: python test_performance.py (or pytest test_performance.py)
+"""
+
+import contextlib
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Wall-clock budget for `import app` in a fresh interpreter (best of 3)
+IMPORT_TIME_BUDGET_SECONDS = float(os.getenv("IMPORT_TIME_BUDGET_SECONDS", "2.0"))
+
+# Provider SDKs and model libraries that must only be imported on first use
+DEFERRED_MODULES = ["google.generativeai", "transformers", "torch", "onnxruntime", "tokenizers"]
+
+# Scratch database for the EXPLAIN tests, migrated, seeded and emptied again.
+# Must not contain tables; default: a temporary SQLite file
+EXPLAIN_DATABASE_URL = os.getenv("EXPLAIN_DATABASE_URL")
+EXPLAIN_SEED_REVIEWS = int(os.getenv("EXPLAIN_SEED_REVIEWS", "50000"))
+EXPLAIN_SEED_PRODUCTS = 200
+
+def _measure_app_import():
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        "import app\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {DEFERRED_MODULES!r} if m in sys.modules]}}))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_import_time_budget():
+    """`import app` stays within the startup time budget"""
+    print("\n" + "="*60)
+    print("Testing import time of app...")
+    print("="*60)
+
+    seconds = min(_measure_app_import()["seconds"] for _ in range(3))
+    print(f"   import app: {seconds * 1000:.0f}ms (budget {IMPORT_TIME_BUDGET_SECONDS * 1000:.0f}ms)")
+    assert seconds <= IMPORT_TIME_BUDGET_SECONDS, (
+        f"import app took {seconds:.2f}s, budget is {IMPORT_TIME_BUDGET_SECONDS:.2f}s "
+        "(profile with: python benchmarks/import_time.py)"
+    )
+    print("✅ Import time within budget")
+
+def test_heavy_imports_deferred():
+    """Provider SDKs and model libraries aren't imported by `import app`"""
+    print("\n" + "="*60)
+    print("Testing deferred imports...")
+    print("="*60)
+
+    loaded = _measure_app_import()["loaded"]
+    assert not loaded, f"imported at startup: {', '.join(loaded)}"
+    print(f"✅ None of {', '.join(DEFERRED_MODULES)} imported at startup")
+
+@contextlib.contextmanager
+def _seeded_database():
+    """Session on a migrated scratch database holding EXPLAIN_SEED_REVIEWS reviews"""
+    sys.path.insert(0, BACKEND_DIR)
+    from sqlalchemy import create_engine, inspect, insert, text
+    from sqlalchemy.orm import Session
+    from database import Base
+    from db_utils import upgrade_database
+    from sentiment_stats import rebuild_stats
+    import models
+
+    scratch_dir = None
+    url = EXPLAIN_DATABASE_URL
+    if not url:
+        scratch_dir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(scratch_dir.name, 'explain.db')}"
+    engine = create_engine(url)
+    assert not inspect(engine).get_table_names(), "EXPLAIN_DATABASE_URL must point at an empty scratch database"
+
+    try:
+        # Alembic runs its own transaction (0005 builds indexes outside one on PostgreSQL)
+        with engine.connect() as connection:
+            upgrade_database(connection)
+            connection.commit()
+
+        rng = random.Random(0)
+        start = datetime(2024, 1, 1)
+        with engine.begin() as connection:
+            connection.execute(insert(models.Product), [
+                {"id": i, "name": f"Product {i}", "created_at": start} for i in range(1, EXPLAIN_SEED_PRODUCTS + 1)
+            ])
+            sentiments = [models.SentimentEnum.POSITIVE] * 6 + [models.SentimentEnum.NEGATIVE] * 3 + [models.SentimentEnum.NEUTRAL]
+            for chunk_start in range(0, EXPLAIN_SEED_REVIEWS, 10000):
+                connection.execute(insert(models.Review), [
+                    {
+                        "product_id": rng.randint(1, EXPLAIN_SEED_PRODUCTS),
+                        "review_text": "The battery easily lasts two days, but the charger is painfully slow.",
+                        "sentiment": rng.choice(sentiments),
+                        "sentiment_score": rng.random(),
+                        "key_points": ["battery lasts", "slow charger"],
+                        "created_at": start + timedelta(seconds=rng.randint(0, 365 * 86400)),
+                    }
+                    for _ in range(chunk_start, min(chunk_start + 10000, EXPLAIN_SEED_REVIEWS))
+                ])
+        # Reviews inserted in bulk bypass the API, which maintains the stats rollup
+        with Session(engine) as session:
+            rebuild_stats(session)
+            session.commit()
+        with engine.begin() as connection:
+            # Planner statistics for the freshly loaded tables
+            connection.execute(text("ANALYZE"))
+
+        with Session(engine) as session:
+            yield session
+    finally:
+        Base.metadata.drop_all(engine)
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
+        engine.dispose()
+        if scratch_dir:
+            scratch_dir.cleanup()
+
+def _explain(session, query) -> str:
+    """Query plan text of an ORM query, on SQLite or PostgreSQL"""
+    from sqlalchemy import text
+
+    bind = session.get_bind()
+    sql = str(query.statement.compile(bind, compile_kwargs={"literal_binds": True}))
+    if bind.dialect.name == "sqlite":
+        return "\n".join(row[-1] for row in session.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+    return "\n".join(row[0] for row in session.execute(text(f"EXPLAIN {sql}")))
+
+def _assert_index_scan(plan: str, index: str, sorted_output: bool = True) -> None:
+    assert index in plan, f"expected a scan of {index}, got:\n{plan}"
+    if sorted_output:
+        sort = re.search(r"USE TEMP B-TREE FOR ORDER BY|^\s*(->\s*)?(Incremental )?Sort\b", plan, re.MULTILINE)
+        assert not sort, f"expected rows in index order without a sort, got:\n{plan}"
+
+def test_review_queries_use_indexes():
+    """Review listing pages are served by the composite indexes, without sorting"""
+    print("\n" + "="*60)
+    print("Testing query plans of review queries...")
+    print("="*60)
+
+    sys.path.insert(0, BACKEND_DIR)
+    from app import _reviews_page_query
+
+    with _seeded_database() as session:
+        print(f"   {session.get_bind().dialect.name}, {EXPLAIN_SEED_REVIEWS} reviews")
+        # A page deep into the listing seeks to the cursor instead of scanning up to it
+        after = (datetime(2024, 7, 1), 0)
+        cases = [
+            ("first page", _reviews_page_query(session), "ix_reviews_created", True),
+            ("later page", _reviews_page_query(session, after=after), "ix_reviews_created", True),
+            ("first page of a product", _reviews_page_query(session, product_id=7), "ix_reviews_product_created", True),
+            ("later page of a product", _reviews_page_query(session, product_id=7, after=after),
+             "ix_reviews_product_created", True),
+            ("first page of a sentiment", _reviews_page_query(session, sentiment="neutral"),
+             "ix_reviews_sentiment_created", True),
+            ("later page of a sentiment", _reviews_page_query(session, sentiment="neutral", after=after),
+             "ix_reviews_sentiment_created", True),
+        ]
+        for name, query, index, sorted_output in cases:
+            _assert_index_scan(_explain(session, query), index, sorted_output)
+            print(f"   ✓ {name}: {index}")
+
+    print("✅ Review queries use the composite indexes")
+
+@contextlib.contextmanager
+def _recorded_statements(engine):
+    """List that collects the SQL statements executed on engine inside the block"""
+    from sqlalchemy import event
+
+    statements = []
+    def record(connection, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+def test_review_reads_query_count():
+    """Review endpoints load reviews and their products in one query, whatever the page size"""
+    print("\n" + "="*60)
+    print("Testing queries per review request...")
+    print("="*60)
+
+    sys.path.insert(0, BACKEND_DIR)
+    from fastapi.testclient import TestClient
+    from app import app, NEXT_CURSOR_HEADER
+    from database import get_db
+
+    with _seeded_database() as session:
+        app.dependency_overrides[get_db] = lambda: session
+        client = TestClient(app)
+        try:
+            def check(path):
+                # Loaded products would otherwise come from the identity map
+                session.expunge_all()
+                with _recorded_statements(session.get_bind()) as statements:
+                    response = client.get(path)
+                assert response.status_code == 200, f"GET {path}: {response.status_code}"
+                body = response.json()
+                returned = len(body) if isinstance(body, list) else 1
+                print(f"   GET {path[:60]}: {returned} reviews, {len(statements)} queries")
+                assert len(statements) == 1, f"GET {path} issued {len(statements)} queries for {returned} reviews"
+                return response
+
+            for path in ["/api/reviews?limit=1", "/api/reviews?limit=50", "/api/reviews?product_id=7&limit=200",
+                         "/api/reviews?sentiment=neutral&limit=200", "/api/reviews/1"]:
+                check(path)
+            first_page = check("/api/reviews?limit=200")
+            check(f"/api/reviews?limit=200&cursor={first_page.headers[NEXT_CURSOR_HEADER]}")
+        finally:
+            app.dependency_overrides.pop(get_db)
+
+    print("✅ Review reads issue a constant number of queries")
+
+def test_statistics_from_rollup():
+    """GET /api/stats reads the sentiment rollup, which matches the reviews it counts"""
+    print("\n" + "="*60)
+    print("Testing review statistics rollup...")
+    print("="*60)
+
+    sys.path.insert(0, BACKEND_DIR)
+    import math
+    from fastapi.testclient import TestClient
+    from app import app, STATS_PERCENTILES, _save_review
+    from database import get_db
+    from sentiment_stats import read_stats, rebuild_stats
+    import models
+    import schemas
+
+    with _seeded_database() as session:
+        # Saved through the API path, which updates the rollup; unscored
+        # reviews count toward the distribution but not the average
+        for sentiment, score in [("positive", 0.91), (None, None), ("neutral", 0), ("negative", 0.3)]:
+            request = schemas.ReviewAnalyzeRequest(product_id=7, review_text=f"Review scored {score}")
+            _save_review(session, request, {"sentiment": sentiment, "sentiment_score": score, "key_points": []})
+        app.dependency_overrides[get_db] = lambda: session
+        client = TestClient(app)
+        try:
+            for product_id in (None, 7):
+                rows = session.query(models.Review.sentiment, models.Review.sentiment_score)
+                if product_id:
+                    rows = rows.filter(models.Review.product_id == product_id)
+                rows = rows.all()
+                distribution = {"positive": 0, "negative": 0, "neutral": 0}
+                for sentiment, _ in rows:
+                    if sentiment:
+                        distribution[sentiment.value] += 1
+                scores = sorted(score for _, score in rows if score)
+                percentiles = {f"p{p}": scores[max(math.ceil(p / 100 * len(scores)) - 1, 0)] for p in STATS_PERCENTILES}
+
+                path = "/api/stats" + (f"?product_id={product_id}" if product_id else "")
+                with _recorded_statements(session.get_bind()) as statements:
+                    stats = client.get(path).json()
+                assert len(statements) == 1, f"GET {path} issued {len(statements)} queries"
+                assert not re.search(r"\breviews\b", statements[0]), f"GET {path} read reviews: {statements[0]}"
+                assert stats["total_reviews"] == len(rows)
+                assert stats["sentiment_distribution"] == distribution
+                assert math.isclose(stats["average_sentiment_score"], sum(scores) / len(scores))
+                assert "sentiment_score_percentiles" not in stats
+
+                stats = client.get(path + ("&" if product_id else "?") + "percentiles=true").json()
+                assert stats["sentiment_score_percentiles"] == percentiles, stats["sentiment_score_percentiles"]
+                print(f"   ✓ {path}: {len(rows)} reviews from 1 rollup query")
+
+            stats = client.get("/api/stats?product_id=999999&percentiles=true").json()
+            assert stats == {
+                "total_reviews": 0, "sentiment_distribution": {}, "average_sentiment_score": 0,
+                "sentiment_score_percentiles": {}
+            }, stats
+        finally:
+            app.dependency_overrides.pop(get_db)
+
+        # Incremental updates leave nothing for a rebuild to repair
+        incremental = read_stats(session, 7)
+        rebuild_stats(session, 7)
+        rebuilt = read_stats(session, 7)
+        assert math.isclose(incremental.pop("score_sum"), rebuilt.pop("score_sum"))
+        assert incremental == rebuilt, (incremental, rebuilt)
+        print("   ✓ incremental counters match a rebuild")
+
+    print("✅ Statistics are served from the rollup")
+
+def test_trend_from_buckets():
+    """GET /api/products/{id}/trend reads pre-aggregated buckets matching the reviews in them"""
+    print("\n" + "="*60)
+    print("Testing sentiment trend buckets...")
+    print("="*60)
+
+    sys.path.insert(0, BACKEND_DIR)
+    import math
+    from fastapi.testclient import TestClient
+    from fastapi import HTTPException
+    from app import app, _save_review, get_product_trend
+    from database import get_db
+    from sentiment_stats import bucket_start, rebuild_stats
+    import models
+    import schemas
+
+    with _seeded_database() as session:
+        # Recent reviews land in buckets through the API path
+        for sentiment, score in [("positive", 0.8), ("negative", 0.4), (None, None), ("neutral", 0)]:
+            request = schemas.ReviewAnalyzeRequest(product_id=7, review_text=f"Review scored {score}")
+            _save_review(session, request, {"sentiment": sentiment, "sentiment_score": score, "key_points": []})
+        reviews = (
+            session.query(models.Review.sentiment, models.Review.sentiment_score, models.Review.created_at)
+            .filter(models.Review.product_id == 7)
+            .all()
+        )
+        now = datetime.utcnow()
+        app.dependency_overrides[get_db] = lambda: session
+        client = TestClient(app)
+        try:
+            cases = [
+                ("week", datetime(2024, 1, 1), datetime(2025, 1, 1)),
+                ("day", datetime(2024, 1, 1), datetime(2025, 1, 1)),
+                ("hour", datetime(2024, 3, 1), datetime(2024, 3, 11)),
+                ("hour", now - timedelta(hours=3), now + timedelta(hours=1)),
+            ]
+            for granularity, since, until in cases:
+                expected = {}
+                for sentiment, score, created_at in reviews:
+                    if since <= created_at < until or bucket_start(since, granularity) <= created_at < since:
+                        bucket = expected.setdefault(bucket_start(created_at, granularity), [0, {"positive": 0, "negative": 0, "neutral": 0}, []])
+                        bucket[0] += 1
+                        if sentiment:
+                            bucket[1][sentiment.value] += 1
+                        if score:
+                            bucket[2].append(score)
+
+                path = f"/api/products/7/trend?granularity={granularity}&since={since.isoformat()}&until={until.isoformat()}"
+                with _recorded_statements(session.get_bind()) as statements:
+                    response = client.get(path)
+                assert response.status_code == 200, response.text
+                assert not any(re.search(r"\bFROM reviews\b", s) for s in statements), statements
+                buckets = response.json()["buckets"]
+                for bucket in buckets:
+                    total, distribution, scores = expected.get(datetime.fromisoformat(bucket["start"]), [0, {"positive": 0, "negative": 0, "neutral": 0}, []])
+                    assert bucket["total_reviews"] == total, (bucket, total)
+                    assert bucket["sentiment_distribution"] == distribution, (bucket, distribution)
+                    assert math.isclose(bucket["average_sentiment_score"], sum(scores) / len(scores) if scores else 0)
+                assert sum(b["total_reviews"] for b in buckets) == sum(t for t, _, _ in expected.values())
+                print(f"   ✓ {granularity:>4} {since:%Y-%m-%d %H:%M}: {len(buckets)} buckets, "
+                      f"{sum(b['total_reviews'] for b in buckets)} reviews, {len(statements)} queries")
+
+            for product_id, kwargs, status in [
+                (7, {"granularity": "month"}, 400),
+                (7, {"granularity": "hour", "since": datetime(2024, 1, 1), "until": datetime(2025, 1, 1)}, 400),
+                (7, {"since": datetime(2024, 2, 1), "until": datetime(2024, 1, 1)}, 400),
+                (999999, {}, 404),
+            ]:
+                try:
+                    get_product_trend(product_id, db=session, **kwargs)
+                except HTTPException as e:
+                    assert e.status_code == status, (kwargs, e.detail)
+                else:
+                    raise AssertionError(f"trend of {product_id} with {kwargs} should fail with {status}")
+        finally:
+            app.dependency_overrides.pop(get_db)
+
+        # Incremental updates leave nothing for a rebuild to repair
+        def stored_buckets():
+            rows = session.query(models.ProductSentimentBucket).filter(models.ProductSentimentBucket.product_id == 7)
+            return {
+                (row.granularity, row.bucket_start): (row.review_count, row.positive_count, row.negative_count,
+                                                      row.neutral_count, round(row.score_sum, 9), row.scored_count)
+                for row in rows
+            }
+        incremental = stored_buckets()
+        rebuild_stats(session, 7)
+        session.expire_all()
+        assert stored_buckets() == incremental
+        print(f"   ✓ {len(incremental)} incremental buckets match a rebuild")
+
+    print("✅ Trends are served from pre-aggregated buckets")
+
+def test_migrations_match_models():
+    """Migrating an empty database yields exactly the schema in models.py"""
+    print("\n" + "="*60)
+    print("Testing migrations against models...")
+    print("="*60)
+
+    from alembic.autogenerate import compare_metadata
+    from alembic.migration import MigrationContext
+    from database import Base
+
+    with _seeded_database() as session:
+        context = MigrationContext.configure(session.connection(), opts={"compare_type": True})
+        differences = compare_metadata(context, Base.metadata)
+    assert not differences, f"models.py and migrations differ (add a revision): {differences}"
+    print("✅ Migrated schema matches models.py")
+
+def main():
+    """Run all tests"""
+    print("\n" + "="*60)
+    print("Product Review Analyzer - Performance Tests")
+    print("="*60)
+
+    tests = [
+        ("Import Time Budget", test_import_time_budget),
+        ("Deferred Imports", test_heavy_imports_deferred),
+        ("Review Query Plans", test_review_queries_use_indexes),
+        ("Review Query Count", test_review_reads_query_count),
+        ("Statistics Rollup", test_statistics_from_rollup),
+        ("Trend Buckets", test_trend_from_buckets),
+        ("Migrations Match Models", test_migrations_match_models),
+    ]
+
+    results = {}
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            results[test_name] = True
+        except AssertionError as e:
+            print(f"❌ {e}")
+            results[test_name] = False
+        except Exception as e:
+            print(f"\n❌ Unexpected error in {test_name}: {e}")
+            results[test_name] = False
+
+    # Summary
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+
+    for test_name, passed in results.items():
+        status = "✅ PASS" if passed else "❌ FAIL"
+        print(f"{status} - {test_name}")
+
+    total = len(results)
+    passed = sum(1 for v in results.values() if v)
+    print(f"\nTotal: {passed}/{total} tests passed")
+
+    return 0 if passed == total else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
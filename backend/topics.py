@@ -0,0 +1,121 @@
+"""
+Per-product topic aggregation of review key points
+
+Key points are normalized into topic keys: lowercased, stopwords and
+opinion words (the lexicon's sentiment words, negations, intensifiers and
+degree adverbs like "painfully") dropped, plurals folded, remaining words
+sorted. "Great battery life", "battery life is poor" and "poor battery
+life" all count toward "battery life", and the topic's sentiment mix shows
+how opinion on it splits. Each mention takes the sentiment of the whole
+review: scoring a few words of key point with the lexicon goes wrong too
+often ("cable frays fast" reads as positive).
+
+Counts live in the product_topics table and are incremented in the same
+transaction that saves a review, with upserts, so concurrent workers never
+lose a mention. Reading a product's topics never touches reviews.
+"""
+import re
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from db_utils import enum_value, increment_counters
+from keyphrases import STOPWORDS
+import lexicon
+import models
+
+MAX_TOPIC_LENGTH = 255
+
+_WORD_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+# Degree adverbs the lexicon doesn't score ("painfully slow" is about "slow")
+_DEGREE_WORDS = frozenset({
+    "painfully", "ridiculously", "insanely", "crazy", "surprisingly", "unbelievably", "remarkably",
+    "exceptionally", "terribly", "awfully", "horribly", "amazingly", "impressively", "noticeably",
+    "reasonably", "relatively", "decently", "exceedingly", "excessively", "annoyingly",
+    "frustratingly", "shockingly", "dreadfully", "unusually", "overly", "rather", "quite", "pretty",
+})
+_MODIFIERS = frozenset(lexicon.INTENSIFIERS) | _DEGREE_WORDS
+_OPINION_WORDS = frozenset(lexicon.LEXICON) | lexicon.NEGATIONS | _MODIFIERS
+COUNTERS = ("mention_count", "positive_count", "negative_count", "neutral_count")
+
+SENTIMENTS = ("positive", "negative", "neutral")
+
+def _singular(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+def topic_of(key_point: str) -> Optional[Tuple[str, str]]:
+    """(topic key, display label) of a key point, or None if it has no words"""
+    words = [w.replace("'", "") for w in _WORD_RE.findall(key_point.lower())]
+    content = [w for w in words if w not in STOPWORDS and w not in _OPINION_WORDS]
+    # Nothing but opinion words ("too expensive"): the opinion is the topic
+    content = content or [w for w in words if w not in STOPWORDS and w not in _MODIFIERS] or words
+    if not content:
+        return None
+    key = " ".join(sorted(set(_singular(w) for w in content)))[:MAX_TOPIC_LENGTH]
+    return key, " ".join(content)[:MAX_TOPIC_LENGTH]
+
+def review_topics(key_points: Iterable[str], review_sentiment: Optional[str]) -> Dict[str, Tuple[str, str]]:
+    """Topic key -> (label, sentiment) for one review; a topic counts once per review"""
+    sentiment = review_sentiment if review_sentiment in SENTIMENTS else "neutral"
+    topics: Dict[str, Tuple[str, str]] = {}
+    for point in key_points:
+        topic = topic_of(point)
+        if topic and topic[0] not in topics:
+            topics[topic[0]] = (topic[1], sentiment)
+    return topics
+
+def _topic_row(product_id: int, key: str, label: str, sentiment: str, mentioned_at: datetime) -> Dict:
+    return {
+        "product_id": product_id,
+        "topic_key": key,
+        "label": label,
+        "mention_count": 1,
+        "positive_count": int(sentiment == "positive"),
+        "negative_count": int(sentiment == "negative"),
+        "neutral_count": int(sentiment == "neutral"),
+        "last_mentioned_at": mentioned_at,
+    }
+
+def record_review_topics(
+    db: Session,
+    product_id: int,
+    key_points: List[str],
+    review_sentiment,
+    mentioned_at: datetime
+) -> None:
+    """Count a new review's key points toward its product's topics (caller commits)"""
+    topics = review_topics(key_points, enum_value(review_sentiment))
+    if not topics:
+        return
+    # Sorted, so concurrent transactions lock topic rows in the same order
+    rows = [
+        _topic_row(product_id, key, label, sentiment, mentioned_at)
+        for key, (label, sentiment) in sorted(topics.items())
+    ]
+    increment_counters(
+        db, models.ProductTopic, rows, ["product_id", "topic_key"], COUNTERS, ["last_mentioned_at"]
+    )
+
+def aggregate_topics(reviews: Iterable[Tuple[int, List[str], object, datetime]]) -> List[Dict]:
+    """
+    product_topics rows computed from scratch out of (product_id, key_points,
+    sentiment, created_at) tuples, for rebuilds. Labels come from each
+    topic's first mention in iteration order.
+    """
+    aggregated: Dict[Tuple[int, str], Dict] = {}
+    for product_id, key_points, sentiment, created_at in reviews:
+        for key, (label, mention_sentiment) in review_topics(key_points, enum_value(sentiment)).items():
+            row = aggregated.get((product_id, key))
+            if row is None:
+                aggregated[(product_id, key)] = _topic_row(product_id, key, label, mention_sentiment, created_at)
+                continue
+            row["mention_count"] += 1
+            row[f"{mention_sentiment}_count"] += 1
+            if created_at and (row["last_mentioned_at"] is None or created_at > row["last_mentioned_at"]):
+                row["last_mentioned_at"] = created_at
+    return list(aggregated.values())
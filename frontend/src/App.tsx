@@ -17,12 +17,14 @@ function App() {
   const [selectedProductId, setSelectedProductId] = useState<number | null>(null)
   const [analysisResult, setAnalysisResult] = useState<ReviewAnalysisResult | null>(null)
   const [reviews, setReviews] = useState<Review[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
   const [stats, setStats] = useState<Stats | null>(null)
 
   // Loading and error states
   const [loadingProducts, setLoadingProducts] = useState(true)
   const [loadingAnalysis, setLoadingAnalysis] = useState(false)
   const [loadingReviews, setLoadingReviews] = useState(false)
+  const [loadingMoreReviews, setLoadingMoreReviews] = useState(false)
   const [loadingStats, setLoadingStats] = useState(false)
   const [error, setError] = useState<string | null>(null)
   const [showCreateProduct, setShowCreateProduct] = useState(false)
@@ -32,11 +34,12 @@ function App() {
     setLoadingReviews(true)
     setLoadingStats(true)
     try {
-      const [reviewsData, statsData] = await Promise.all([
+      const [reviewsPage, statsData] = await Promise.all([
         reviewService.getProductReviews(productId),
         reviewService.getStats(productId),
       ])
-      setReviews(reviewsData)
+      setReviews(reviewsPage.reviews)
+      setNextCursor(reviewsPage.nextCursor)
       setStats(statsData)
     } catch (err) {
       setError(`Failed to load reviews: ${err instanceof Error ? err.message : 'Unknown error'}`)
@@ -46,6 +49,21 @@ function App() {
     }
   }, [])
 
+  // Load the next page of the selected product's reviews
+  const loadMoreReviews = async () => {
+    if (!selectedProductId || !nextCursor) return
+    setLoadingMoreReviews(true)
+    try {
+      const reviewsPage = await reviewService.getProductReviews(selectedProductId, nextCursor)
+      setReviews([...reviews, ...reviewsPage.reviews])
+      setNextCursor(reviewsPage.nextCursor)
+    } catch (err) {
+      setError(`Failed to load reviews: ${err instanceof Error ? err.message : 'Unknown error'}`)
+    } finally {
+      setLoadingMoreReviews(false)
+    }
+  }
+
   // Load products
   const loadProducts = useCallback(async () => {
     try {
@@ -201,7 +219,11 @@ function App() {
               {loadingReviews ? (
                 <LoadingState message="Loading reviews..." />
               ) : (
-                <ReviewsList reviews={reviews} />
+                <ReviewsList
+                  reviews={reviews}
+                  onLoadMore={nextCursor ? loadMoreReviews : undefined}
+                  loading={loadingMoreReviews}
+                />
               )}
             </div>
           ) : (
@@ -11,6 +11,12 @@ export interface ReviewAnalysisResult {
   sentiment: 'positive' | 'negative' | 'neutral';
   sentiment_score: number;
   key_points: string[];
+  partial?: boolean;
+}
+
+export interface AnalysisStreamHandlers {
+  onSentiment?: (sentiment: ReviewAnalysisResult['sentiment'], score: number) => void;
+  onKeyPoint?: (keyPoint: string) => void;
 }
 
 export interface Review {
@@ -25,6 +31,40 @@ export interface Review {
   product: Product;
 }
 
+export interface ReviewPage {
+  reviews: Review[];
+  nextCursor: string | null;
+}
+
+export interface SimilarReview {
+  review: Review;
+  similarity: number;
+}
+
+export interface ProductTopic {
+  topic: string;
+  mentions: number;
+  sentiment_distribution: {
+    positive: number;
+    negative: number;
+    neutral: number;
+  };
+  last_mentioned_at?: string;
+}
+
+export type TrendGranularity = 'hour' | 'day' | 'week';
+
+export interface TrendBucket {
+  start: string;
+  total_reviews: number;
+  sentiment_distribution: {
+    positive: number;
+    negative: number;
+    neutral: number;
+  };
+  average_sentiment_score: number;
+}
+
 export interface Stats {
   total_reviews: number;
   sentiment_distribution: {
@@ -33,6 +73,8 @@ export interface Stats {
     neutral: number;
   };
   average_sentiment_score: number;
+  last_review_at?: string;
+  sentiment_score_percentiles?: Record<string, number>;
 }
 
 class ReviewService {
@@ -81,23 +123,133 @@ class ReviewService {
   }
 
   /**
-   * Get all reviews with optional filtering
+   * Analyze a review, receiving results progressively over Server-Sent Events
+   * (sentiment first, then each key point). Resolves with the saved result.
+   */
+  async analyzeReviewStream(
+    productId: number,
+    reviewText: string,
+    handlers: AnalysisStreamHandlers = {}
+  ): Promise<ReviewAnalysisResult & { review_id: number }> {
+    const response = await fetch(`${API_URL}/api/analyze-review/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        product_id: productId,
+        review_text: reviewText,
+      }),
+    });
+    if (!response.ok || !response.body) {
+      const error = await response.json().catch(() => ({}));
+      throw new Error(error.detail || 'Failed to analyze review');
+    }
+
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = '';
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += value;
+
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const block = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+
+        let event = 'message';
+        let data = '';
+        for (const line of block.split('\n')) {
+          if (line.startsWith('event:')) event = line.slice(6).trim();
+          else if (line.startsWith('data:')) data += line.slice(5).trim();
+        }
+        const payload = data ? JSON.parse(data) : {};
+
+        if (event === 'sentiment') {
+          handlers.onSentiment?.(payload.sentiment, payload.sentiment_score);
+        } else if (event === 'key_point') {
+          handlers.onKeyPoint?.(payload.key_point);
+        } else if (event === 'saved') {
+          return payload;
+        } else if (event === 'error') {
+          throw new Error(payload.detail || 'Failed to analyze review');
+        }
+      }
+    }
+    throw new Error('Analysis stream ended unexpectedly');
+  }
+
+  /**
+   * Get a page of reviews, newest first, with optional filtering.
+   * Pass the previous page's nextCursor to get the page after it.
    */
-  async getReviews(productId?: number, sentiment?: string): Promise<Review[]> {
+  async getReviews(productId?: number, sentiment?: string, cursor?: string | null): Promise<ReviewPage> {
     const params = new URLSearchParams();
     if (productId) params.append('product_id', productId.toString());
     if (sentiment) params.append('sentiment', sentiment);
+    if (cursor) params.append('cursor', cursor);
 
     const response = await fetch(`${API_URL}/api/reviews?${params}`);
     if (!response.ok) throw new Error('Failed to fetch reviews');
+    return {
+      reviews: await response.json(),
+      nextCursor: response.headers.get('X-Next-Cursor'),
+    };
+  }
+
+  /**
+   * Get a page of reviews for a specific product
+   */
+  async getProductReviews(productId: number, cursor?: string | null): Promise<ReviewPage> {
+    return this.getReviews(productId, undefined, cursor);
+  }
+
+  /**
+   * Get a product's most mentioned topics
+   */
+  async getProductTopics(productId: number, limit = 20): Promise<ProductTopic[]> {
+    const response = await fetch(`${API_URL}/api/products/${productId}/topics?limit=${limit}`);
+    if (!response.ok) throw new Error('Failed to fetch product topics');
+    const data = await response.json();
+    return data.topics;
+  }
+
+  /**
+   * Get a product's review count and sentiment per hour, day or week (UTC)
+   */
+  async getProductTrend(
+    productId: number,
+    granularity: TrendGranularity = 'day',
+    since?: string,
+    until?: string
+  ): Promise<TrendBucket[]> {
+    const params = new URLSearchParams({ granularity });
+    if (since) params.append('since', since);
+    if (until) params.append('until', until);
+
+    const response = await fetch(`${API_URL}/api/products/${productId}/trend?${params}`);
+    if (!response.ok) throw new Error('Failed to fetch product trend');
+    const data = await response.json();
+    return data.buckets;
+  }
+
+  /**
+   * Get the reviews most similar to a review
+   */
+  async getSimilarReviews(reviewId: number, limit = 10): Promise<SimilarReview[]> {
+    const response = await fetch(`${API_URL}/api/reviews/${reviewId}/similar?limit=${limit}`);
+    if (!response.ok) throw new Error('Failed to fetch similar reviews');
     return response.json();
   }
 
   /**
-   * Get reviews for a specific product
+   * Search reviews by meaning
    */
-  async getProductReviews(productId: number): Promise<Review[]> {
-    return this.getReviews(productId);
+  async searchReviews(query: string, limit = 10): Promise<SimilarReview[]> {
+    const params = new URLSearchParams({ q: query, limit: limit.toString() });
+
+    const response = await fetch(`${API_URL}/api/reviews/search?${params}`);
+    if (!response.ok) throw new Error('Failed to search reviews');
+    return response.json();
   }
 
   /**